@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the number and the size of the wire records with and without record
+aggregation, and the throughput of packing and unpacking small records.
+
+Usage::
+
+    python benchmarks/aggregation.py
+"""
+
+import time
+import dataclasses
+
+from unistream.api import DataClassRecord
+from unistream.aggregation import aggregate, deaggregate, AggregatedRecord
+
+n_records = 1000
+n_rounds = 100
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    value: int = dataclasses.field(default=0)
+
+
+def run(name: str, func):
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        func()
+    elapsed = time.perf_counter() - start
+    rate = n_records * n_rounds / elapsed
+    print(f"{name:<40} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+records = [MyRecord(id=str(i), value=i) for i in range(n_records)]
+data_list = MyRecord.serialize_many(records)
+for max_records in [10, 50, 100]:
+    aggregated_records = aggregate(records, max_records=max_records, max_bytes=900_000)
+    wire_data_list = AggregatedRecord.serialize_many(aggregated_records)
+    print(
+        f"max_records={max_records:<4} "
+        f"{len(data_list)} -> {len(wire_data_list)} wire records, "
+        f"{sum(map(len, data_list)):,} -> {sum(map(len, wire_data_list)):,} bytes"
+    )
+
+run("plain encode + decode", lambda: MyRecord.deserialize_many(MyRecord.serialize_many(records)))
+
+
+def aggregated_round_trip():
+    wire_data_list = AggregatedRecord.serialize_many(
+        aggregate(records, max_records=100, max_bytes=900_000)
+    )
+    deaggregate(AggregatedRecord.deserialize_many(wire_data_list), MyRecord)
+
+
+run("aggregated encode + decode", aggregated_round_trip)
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare reading and decoding a 1000-record WAL segment through ``str``
+(``read_data_list`` + ``deserialize_many``) and through bytes
+(``read_data_bytes_list`` + ``deserialize_many_bytes``), for the text and
+the framing formats, with the ``json`` and ``orjson`` codecs.
+
+Usage::
+
+    python benchmarks/bytes_decode.py
+"""
+
+import typing as T
+import time
+import dataclasses
+from pathlib import Path
+
+from unistream.api import DataClassRecord
+from unistream.framing import FrameWriter, read_data_list, read_data_bytes_list
+
+dir_here = Path(__file__).absolute().parent
+path_segment = dir_here.joinpath("bytes_decode.log")
+
+n_records = 1000
+n_rounds = 200
+
+
+@dataclasses.dataclass(frozen=True)
+class JsonRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+@dataclasses.dataclass(frozen=True)
+class OrjsonRecord(JsonRecord):
+    codec: T.ClassVar[str] = "orjson"
+
+
+def run(name: str, func):
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        records = func()
+    elapsed = time.perf_counter() - start
+    assert len(records) == n_records
+    rate = n_records * n_rounds / elapsed
+    print(f"{name:<40} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+try:
+    for record_class in [JsonRecord, OrjsonRecord]:
+        try:
+            record_class.get_codec()
+        except ImportError:
+            print(f"{record_class.codec} is not installed")
+            continue
+        records = [record_class(id=str(i), value=i) for i in range(n_records)]
+        data_list = record_class.serialize_many(records)
+        for framed in [False, True]:
+            if framed:
+                with path_segment.open("wb") as f:
+                    FrameWriter(f).write_many([data.encode("utf-8") for data in data_list])
+            else:
+                path_segment.write_text("".join([data + "\n" for data in data_list]))
+            label = f"{record_class.codec} {'framed' if framed else 'text'}"
+            run(
+                f"{label} str",
+                lambda: record_class.deserialize_many(read_data_list(path_segment)),
+            )
+            run(
+                f"{label} bytes",
+                lambda: record_class.deserialize_many_bytes(
+                    read_data_bytes_list(path_segment)
+                ),
+            )
+finally:
+    path_segment.unlink(missing_ok=True)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the encode / decode throughput of the JSON codecs registered in
+:mod:`unistream.codec` that are installed in the current environment.
+Use it to pick the ``DataClassRecord.codec`` for your deployment.
+
+Usage::
+
+    python benchmarks/codec.py
+"""
+
+import time
+import dataclasses
+
+from unistream.api import DataClassRecord
+from unistream.codec import get_codec
+
+n_records = 1000
+n_rounds = 200
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+def run(name: str, func, arg):
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        func(arg)
+    elapsed = time.perf_counter() - start
+    rate = n_records * n_rounds / elapsed
+    print(f"{name:<30} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+objs = [dataclasses.asdict(MyRecord(id=str(i), value=i)) for i in range(n_records)]
+for codec_name in ["json", "orjson", "msgspec"]:
+    try:
+        codec = get_codec(codec_name)
+    except ImportError:
+        print(f"{codec_name:<30} not installed")
+        continue
+    data_list = [codec.dumps(obj) for obj in objs]
+    run(f"{codec_name}.dumps", lambda objs: [codec.dumps(obj) for obj in objs], objs)
+    run(f"{codec_name}.loads", lambda lines: [codec.loads(line) for line in lines], data_list)
+    run(f"{codec_name}.loads_many", codec.loads_many, data_list)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the compression ratio and the compress / decompress throughput of the
+compressions registered in :mod:`unistream.compression` on a WAL segment of
+``DataClassRecord``. Use it to pick the ``compression`` and ``compression_level``
+of ``FileBuffer`` and ``SimpleProducer``: if reading the segment from the disk
+takes longer than decompressing it, compression is a win.
+
+Usage::
+
+    python benchmarks/compression.py
+"""
+
+import time
+import dataclasses
+
+from unistream.api import DataClassRecord
+from unistream.compression import get_compression
+
+n_records = 1000
+n_rounds = 20
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+def timeit(func, arg) -> float:
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        func(arg)
+    return (time.perf_counter() - start) / n_rounds
+
+
+records = [MyRecord(id=str(i), value=i) for i in range(n_records)]
+segment = "".join([record.serialize() + "\n" for record in records]).encode("utf-8")
+mb = len(segment) / 1000000
+print(f"segment: {n_records} records, {len(segment):,} bytes")
+for name, levels in [
+    ("zlib", [1, 6, 9]),
+    ("bz2", [1, 9]),
+    ("lzma", [0, 6]),
+    ("zstd", [1, 3, 19]),
+    ("dict", [None]),
+]:
+    try:
+        compression = get_compression(name)
+    except ImportError:
+        print(f"{name:<10} not installed")
+        continue
+    for level in levels:
+        block = compression.compress(segment, level=level)
+        compress_time = timeit(lambda data: compression.compress(data, level=level), segment)
+        decompress_time = timeit(compression.decompress, block)
+        print(
+            f"{name:<6} level={str(level):<4} "
+            f"ratio {len(segment) / len(block):5.1f}x, "
+            f"compress {mb / compress_time:8.1f} MB/s, "
+            f"decompress {mb / decompress_time:8.1f} MB/s"
+        )
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the throughput of :class:`~unistream.buffers.file_buffer.FileBuffer`
+``put`` with the fsync policies, from never fsync to fsync every record.
+
+Usage::
+
+    python benchmarks/fsync.py
+"""
+
+import time
+import dataclasses
+from pathlib import Path
+
+from unistream.api import DataClassRecord, FileBuffer
+
+dir_here = Path(__file__).absolute().parent
+path_wal = dir_here.joinpath("fsync_buffer.log")
+
+n_records = 5000
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    value: int = dataclasses.field(default=0)
+
+
+def run(name: str, **kwargs):
+    buffer = FileBuffer.new(
+        record_class=MyRecord,
+        path_wal=path_wal,
+        max_records=1000,
+        **kwargs,
+    )
+    buffer.clear_wal()
+    start = time.perf_counter()
+    for record in records:
+        buffer.put(record)
+    buffer.close()
+    elapsed = time.perf_counter() - start
+    buffer.clear_wal()
+    rate = n_records / elapsed
+    print(f"{name:<40} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+records = [MyRecord(id=str(i), value=i) for i in range(n_records)]
+run("warm up")
+run("never fsync")
+run("fsync every 100 records", fsync_every_records=100)
+run("fsync every 10 ms", fsync_every_ms=10)
+run("fsync every record", fsync_every_records=1)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the default ``id`` / ``create_at`` factories of ``DataClassRecord``
+(``uuid4`` plus a separate clock read) with :func:`unistream.ulid.new_ulid`
+and ``UlidRecord`` (one clock read for both).
+
+Usage::
+
+    python benchmarks/id_factory.py
+"""
+
+import time
+
+from unistream.api import DataClassRecord, UlidRecord
+from unistream.records.dataclass import id_factory, create_at_factory
+from unistream.ulid import new_ulid
+
+n_records = 200000
+
+
+def run(name: str, func):
+    start = time.perf_counter()
+    for _ in range(n_records):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<40} {n_records / elapsed:12,.0f} per sec")
+
+
+run("uuid4 id + create_at", lambda: (id_factory(), create_at_factory()))
+run("new_ulid", new_ulid)
+run("DataClassRecord()", DataClassRecord)
+run("UlidRecord()", UlidRecord)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the startup time of :class:`~unistream.buffers.file_buffer.FileBuffer`
+with many full WAL files, loading the storage queue from the manifest, and
+rebuilding the manifest from the WAL directory. Listing the directory alone
+is also shown, it was the lower bound of the startup before the manifest.
+
+Usage::
+
+    python benchmarks/manifest.py
+"""
+
+import time
+import shutil
+from pathlib import Path
+
+from unistream.api import DataClassRecord, FileBuffer
+
+dir_here = Path(__file__).absolute().parent
+dir_wal = dir_here.joinpath("manifest_buffer")
+path_wal = dir_wal.joinpath("buffer.log")
+
+n_files = 10_000
+n_rounds = 5
+
+
+def new_buffer() -> FileBuffer:
+    return FileBuffer.new(
+        record_class=DataClassRecord,
+        path_wal=path_wal,
+        max_records=10,
+    )
+
+
+def run(name: str, func):
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / n_rounds
+    print(f"{name:<40} {elapsed * 1000:.1f} ms per startup")
+
+
+shutil.rmtree(dir_wal, ignore_errors=True)
+dir_wal.mkdir()
+try:
+    buffer = new_buffer()
+    buffer.put_many(DataClassRecord() for _ in range(n_files * 10))
+    assert len(new_buffer().storage_queue) == n_files
+    print(f"{n_files} full WAL files")
+
+    run("startup with the manifest", new_buffer)
+    run("list the WAL directory", buffer._get_old_log_files)
+
+    def rebuild():
+        buffer.manifest.path.unlink()
+        new_buffer()
+
+    run("startup without the manifest", rebuild)
+finally:
+    shutil.rmtree(dir_wal, ignore_errors=True)
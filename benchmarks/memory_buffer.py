@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the cost of durability: compare the throughput of putting and
+sending records with :class:`~unistream.buffers.memory_buffer.MemoryBuffer`,
+which keeps the batches in memory only, and
+:class:`~unistream.buffers.file_buffer.FileBuffer` with the fsync policies.
+
+Usage::
+
+    python benchmarks/memory_buffer.py
+"""
+
+import time
+import dataclasses
+from pathlib import Path
+
+from unistream.api import DataClassRecord, FileBuffer, MemoryBuffer
+
+dir_here = Path(__file__).absolute().parent
+path_wal = dir_here.joinpath("memory_buffer_buffer.log")
+
+n_records = 5000
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    value: int = dataclasses.field(default=0)
+
+
+def put_and_send(buffer):
+    for record in records:
+        buffer.put(record)
+        if buffer.should_i_emit():
+            buffer.emit()
+            buffer.commit()
+
+
+def run(name: str, new_buffer):
+    buffer = new_buffer()
+    start = time.perf_counter()
+    put_and_send(buffer)
+    elapsed = time.perf_counter() - start
+    if isinstance(buffer, FileBuffer):
+        buffer.clear_wal()
+    rate = n_records / elapsed
+    print(f"{name:<40} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+def new_file_buffer(**kwargs):
+    def new_buffer() -> FileBuffer:
+        buffer = FileBuffer.new(
+            record_class=MyRecord,
+            path_wal=path_wal,
+            max_records=1000,
+            **kwargs,
+        )
+        buffer.clear_wal()
+        return buffer
+
+    return new_buffer
+
+
+records = [MyRecord(id=str(i), value=i) for i in range(n_records)]
+run("warm up", new_file_buffer())
+run("MemoryBuffer", lambda: MemoryBuffer.new(max_records=1000))
+run("FileBuffer, never fsync", new_file_buffer())
+run("FileBuffer, fsync every 100 records", new_file_buffer(fsync_every_records=100))
+run("FileBuffer, fsync every 10 ms", new_file_buffer(fsync_every_ms=10))
+run("FileBuffer, fsync every record", new_file_buffer(fsync_every_records=1))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare putting a burst of records to
+:class:`~unistream.buffers.file_buffer.FileBuffer` with a per-record ``put``
+loop and with a single ``put_many`` call, which writes each WAL file with
+one ``write`` call, for the text and the framing formats.
+
+Usage::
+
+    python benchmarks/put_many.py
+"""
+
+import time
+import dataclasses
+from pathlib import Path
+
+from unistream.api import DataClassRecord, FileBuffer
+
+dir_here = Path(__file__).absolute().parent
+path_wal = dir_here.joinpath("put_many_buffer.log")
+
+n_records = 10_000
+n_rounds = 5
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    value: int = dataclasses.field(default=0)
+
+
+def run(name: str, framed: bool, func):
+    elapsed = 0
+    for _ in range(n_rounds):
+        buffer = FileBuffer.new(
+            record_class=MyRecord,
+            path_wal=path_wal,
+            max_records=1000,
+            framed=framed,
+        )
+        buffer.clear_wal()
+        start = time.perf_counter()
+        func(buffer)
+        elapsed += time.perf_counter() - start
+        assert len(buffer.storage_queue) == n_records // 1000
+        buffer.clear_wal()
+    rate = n_records * n_rounds / elapsed
+    print(f"{name:<40} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+def put_loop(buffer: FileBuffer):
+    for record in records:
+        buffer.put(record)
+
+
+def put_many(buffer: FileBuffer):
+    buffer.put_many(records)
+
+
+records = [MyRecord(id=str(i), value=i) for i in range(n_records)]
+for framed in [False, True]:
+    label = "framed" if framed else "text"
+    run(f"{label} put loop", framed, put_loop)
+    run(f"{label} put_many", framed, put_many)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure the restart time of :class:`~unistream.buffers.file_buffer.FileBuffer`
+with a large backlog: 100,000 full WAL files of 100 KB each, 10 GB in total,
+and a current WAL file with a torn tail left by a crash.
+
+The backlog is written once to ``benchmarks/restart_buffer/`` and deleted
+at the end, make sure there is enough free disk space. Lower ``n_segments``
+for a quick run.
+
+Usage::
+
+    python benchmarks/restart.py
+"""
+
+import time
+import shutil
+import dataclasses
+from pathlib import Path
+
+from unistream.api import DataClassRecord, FileBuffer
+from unistream.buffers.manifest import Segment
+
+dir_here = Path(__file__).absolute().parent
+dir_wal = dir_here.joinpath("restart_buffer")
+path_wal = dir_wal.joinpath("buffer.log")
+
+n_segments = 100_000
+n_records = 100  # per segment
+n_rounds = 3
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    value: str = dataclasses.field(default="x" * 960)
+
+
+def new_buffer() -> FileBuffer:
+    return FileBuffer.new(
+        record_class=MyRecord,
+        path_wal=path_wal,
+        max_records=n_records,
+    )
+
+
+def run(name: str, func):
+    elapsed = 0
+    for _ in range(n_rounds):
+        path_wal.write_bytes(current_wal + current_wal[:100])  # torn tail
+        start = time.perf_counter()
+        func()
+        elapsed += time.perf_counter() - start
+    elapsed = elapsed / n_rounds
+    print(f"{name:<40} {elapsed * 1000:.1f} ms per restart")
+
+
+shutil.rmtree(dir_wal, ignore_errors=True)
+dir_wal.mkdir()
+try:
+    # write the backlog, all segments have the same content
+    start = time.perf_counter()
+    records = [MyRecord() for _ in range(n_records)]
+    data_list = MyRecord.serialize_many(records)
+    content = "".join([data + "\n" for data in data_list]).encode("utf-8")
+    buffer = new_buffer()
+    for seq in range(1, 1 + n_segments):
+        name = f"buffer.{seq:016d}.log"
+        dir_wal.joinpath(name).write_bytes(content)
+        buffer.manifest.segments[name] = Segment(
+            seq=seq,
+            name=name,
+            n_records=n_records,
+            n_bytes=len(content) - n_records,
+            create_at=records[0].create_at,
+        )
+    buffer.manifest.compact()
+    # the current WAL file is one record short of full
+    current_wal = content[: content.rfind(b"\n", 0, -1) + 1]
+    elapsed = time.perf_counter() - start
+    total = n_segments * len(content) / 1_000_000_000
+    print(f"{n_segments} WAL files, {total:.1f} GB, written in {elapsed:.1f} sec")
+
+    def restart():
+        buffer = new_buffer()
+        assert len(buffer.storage_queue) == n_segments
+        assert 0 < buffer.n_records < n_records
+
+    run("restart", restart)
+    run("list the WAL directory", buffer._get_old_log_files)
+finally:
+    shutil.rmtree(dir_wal, ignore_errors=True)
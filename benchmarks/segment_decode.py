@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the throughput of decoding a 1000-record WAL segment with the
+per-record ``deserialize()`` loop and the batch ``deserialize_many()`` API.
+
+Usage::
+
+    python benchmarks/segment_decode.py
+"""
+
+import time
+import dataclasses
+from pathlib import Path
+
+from unistream.api import DataClassRecord
+
+dir_here = Path(__file__).absolute().parent
+path_segment = dir_here.joinpath("segment_decode.log")
+
+n_records = 1000
+n_rounds = 200
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+def per_record(lines: list[str]) -> list[MyRecord]:
+    return [MyRecord.deserialize(line) for line in lines]
+
+
+def batch(lines: list[str]) -> list[MyRecord]:
+    return MyRecord.deserialize_many(lines)
+
+
+def run(name: str, func):
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        records = func(path_segment.read_text().splitlines())
+    elapsed = time.perf_counter() - start
+    assert len(records) == n_records
+    rate = n_records * n_rounds / elapsed
+    print(f"{name:<20} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+records = [MyRecord(id=str(i), value=i) for i in range(n_records)]
+path_segment.write_text("".join([line + "\n" for line in MyRecord.serialize_many(records)]))
+try:
+    run("deserialize()", per_record)
+    run("deserialize_many()", batch)
+finally:
+    path_segment.unlink()
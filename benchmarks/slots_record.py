@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the memory per record and the decode / encode throughput of
+``SlotsRecord`` and ``DataClassRecord`` for a backlog of 1M records.
+
+Usage::
+
+    python benchmarks/slots_record.py
+"""
+
+import gc
+import time
+import tracemalloc
+import dataclasses
+
+from unistream.api import DataClassRecord, SlotsRecord
+
+n_records = 1000000
+
+
+@dataclasses.dataclass(frozen=True)
+class MyDataClassRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MySlotsRecord(SlotsRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+def run(record_class):
+    name = record_class.__name__
+    records = [record_class(id=str(i), value=i) for i in range(n_records)]
+
+    start = time.perf_counter()
+    data_list = record_class.serialize_many(records)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<20} encode {n_records / elapsed:,.0f} records/sec")
+    del records
+    gc.collect()
+
+    start = time.perf_counter()
+    records = record_class.deserialize_many(data_list)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<20} decode {n_records / elapsed:,.0f} records/sec")
+    del records
+    gc.collect()
+
+    # the memory includes the cached serialized string of each record
+    tracemalloc.start()
+    records = record_class.deserialize_many(data_list)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<20} {size / n_records:.0f} bytes/record after decode")
+
+
+run(MyDataClassRecord)
+run(MySlotsRecord)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compare the decode throughput of ``deserialize_many_bytes()`` with full
+validation (user code) and in the trusted mode used by the internal readers
+(``FileBuffer``, ``SimpleConsumer``, ``SimpleCheckpoint``), for a record
+without and with a user defined ``__post_init__``.
+
+Usage::
+
+    python benchmarks/trusted_decode.py
+"""
+
+import time
+import dataclasses
+
+from unistream.api import DataClassRecord
+
+n_records = 1000
+n_rounds = 200
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    tenant: str = dataclasses.field(default="tenant-1")
+    event: str = dataclasses.field(default="page_view")
+    value: int = dataclasses.field(default=0)
+
+
+@dataclasses.dataclass(frozen=True)
+class ValidatedRecord(MyRecord):
+    def __post_init__(self):
+        if self.value < 0:
+            raise ValueError("value must not be negative")
+
+
+def run(name: str, func, data_list):
+    start = time.perf_counter()
+    for _ in range(n_rounds):
+        records = func(data_list)
+    elapsed = time.perf_counter() - start
+    assert len(records) == n_records
+    rate = n_records * n_rounds / elapsed
+    print(f"{name:<40} {elapsed:.3f} sec, {rate:,.0f} records/sec")
+
+
+for record_class in [MyRecord, ValidatedRecord]:
+    records = [record_class(id=str(i), value=i) for i in range(n_records)]
+    data_list = [data.encode("utf-8") for data in record_class.serialize_many(records)]
+    name = record_class.__name__
+    run(f"{name} validated", record_class.deserialize_many_bytes, data_list)
+    run(
+        f"{name} trusted",
+        lambda data_list: record_class.deserialize_many_bytes(data_list, trusted=True),
+        data_list,
+    )
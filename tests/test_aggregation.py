@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from unistream.records.dataclass import DataClassRecord
+from unistream.batch import RecordBatch
+from unistream.aggregation import (
+    pack,
+    unpack,
+    AggregatedRecord,
+    aggregate,
+    deaggregate,
+    AggregationConfig,
+)
+from unistream.buffers.file_buffer import FileBuffer
+from unistream.producer import RetryConfig
+from unistream.producers.simple import SimpleProducer
+from unistream.checkpoints.simple import SimpleCheckpoint
+from unistream.consumers.simple import SimpleConsumer
+from unistream.tests import prepare_temp_dir
+
+dir_here = Path(__file__).absolute().parent
+dir_data = dir_here / "test_aggregation"
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    value: str = dataclasses.field(default="")
+
+
+processed: list[str] = list()
+
+
+@dataclasses.dataclass
+class MyConsumer(SimpleConsumer):
+    def process_record(self, record: MyRecord):
+        assert isinstance(record, MyRecord)
+        processed.append(record.id)
+
+
+def test_pack_and_unpack():
+    data_list = ["", "a", "1:2", "中文", '{"id": "1"}']
+    payload = pack(data_list)
+    assert payload.startswith("0:1:a3:1:2")
+    assert unpack(payload) == data_list
+    assert unpack("") == []
+    with pytest.raises(ValueError):
+        unpack(payload[:-1])
+    with pytest.raises(ValueError):
+        unpack("x")
+
+
+def test_aggregated_record():
+    records = [MyRecord(id=str(i), value="v" * i) for i in range(5)]
+    aggregated_record = AggregatedRecord.from_records(records)
+    assert aggregated_record.n_records == 5
+    assert aggregated_record.create_at == records[0].create_at
+
+    # round trip through the wire format
+    aggregated_record = AggregatedRecord.deserialize(aggregated_record.serialize())
+    assert aggregated_record.to_records(MyRecord) == records
+
+    corrupted = dataclasses.replace(aggregated_record, n_records=4)
+    with pytest.raises(ValueError):
+        corrupted.get_data_list()
+
+
+def test_aggregate():
+    records = [MyRecord(id=str(i), value="v" * i) for i in range(10)]
+    assert aggregate([], max_records=3, max_bytes=1000) == []
+
+    # split by max_records
+    aggregated_records = aggregate(records, max_records=3, max_bytes=1000000)
+    assert [r.n_records for r in aggregated_records] == [3, 3, 3, 1]
+    assert [r.create_at for r in aggregated_records] == [
+        records[i].create_at for i in [0, 3, 6, 9]
+    ]
+    assert deaggregate(aggregated_records, MyRecord) == records
+
+    # split by max_bytes, a record larger than max_bytes is packed on its own
+    max_bytes = len(pack([records[0].serialize()])) * 2 + 1
+    aggregated_records = aggregate(records, max_records=100, max_bytes=max_bytes)
+    assert [r.n_records for r in aggregated_records][:1] == [2]
+    assert all(r.n_records >= 1 for r in aggregated_records)
+    assert deaggregate(aggregated_records, MyRecord) == records
+    aggregated_records = aggregate(records, max_records=100, max_bytes=1)
+    assert [r.n_records for r in aggregated_records] == [1] * 10
+
+    # RecordBatch reuses its serialized records
+    batch = RecordBatch.from_records(records)
+    config = AggregationConfig(max_records=4)
+    aggregated_records = config.aggregate(batch)
+    assert [r.n_records for r in aggregated_records] == [4, 4, 2]
+    assert deaggregate(aggregated_records, MyRecord) == records
+
+
+@dataclasses.dataclass
+class MyBatchProducer(SimpleProducer):
+    use_record_batch = True
+
+
+def test_producer_and_consumer():
+    for producer_class in [SimpleProducer, MyBatchProducer]:
+        prepare_temp_dir(dir_data)
+        processed.clear()
+        path_sink = dir_data / "sink.log"
+        producer = producer_class.new(
+            buffer=FileBuffer.new(
+                record_class=MyRecord,
+                path_wal=dir_data / "buffer.log",
+                max_records=10,
+            ),
+            retry_config=RetryConfig(exp_backoff=[1]),
+            path_sink=path_sink,
+            aggregation_config=AggregationConfig(max_records=4),
+        )
+        records = [MyRecord(id=str(i)) for i in range(20)]
+        for record in records:
+            producer.put(record)
+        # 2 batches of 10 records, each is sent as 3 wire records
+        lines = path_sink.read_text().splitlines()
+        assert len(lines) == 6
+        assert sum(AggregatedRecord.deserialize(line).n_records for line in lines) == 20
+
+        checkpoint = SimpleCheckpoint(
+            lock_expire=60,
+            max_attempts=3,
+            initial_pointer=0,
+            start_pointer=0,
+            next_pointer=None,
+            batch_sequence=0,
+            batch=dict(),
+            checkpoint_file=str(dir_data / "checkpoint.json"),
+            records_file=str(dir_data / "records.json"),
+        )
+        consumer = MyConsumer.new(
+            record_class=MyRecord,
+            path_source=path_sink,
+            path_dlq=dir_data / "dlq.log",
+            checkpoint=checkpoint,
+            limit=4,
+            aggregated=True,
+        )
+        assert consumer.wire_record_class is AggregatedRecord
+        consumer.process_batch()
+        # the pointer counts wire records, the checkpoint tracks inner records
+        assert consumer.checkpoint.start_pointer == 4
+        assert list(consumer.checkpoint.batch) == [str(i) for i in range(14)]
+        assert consumer.checkpoint.load_records(MyRecord) == records[:14]
+        consumer.process_batch()
+        assert consumer.checkpoint.start_pointer == 6
+        assert processed == [record.id for record in records]
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.aggregation", preview=False)
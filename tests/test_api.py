@@ -5,13 +5,29 @@ from unistream import api
 
 def test():
     _ = api
+    _ = api.BufferIsFullError
+    _ = api.FrameError
     _ = api.logger
     _ = api.T_RECORD
     _ = api.T_BUFFER
     _ = api.T_PRODUCER
     _ = api.T_CHECK_POINT
     _ = api.T_CONSUMER
+    _ = api.BaseCodec
+    _ = api.register_codec
+    _ = api.get_codec
+    _ = api.BaseCompression
+    _ = api.register_compression
+    _ = api.get_compression
+    _ = api.new_ulid
     _ = api.BaseRecord
+    _ = api.RecordBatch
+    _ = api.AggregatedRecord
+    _ = api.AggregationConfig
+    _ = api.ClaimCheck
+    _ = api.ClaimCheckConfig
+    _ = api.ChunkRecord
+    _ = api.ChunkingConfig
     _ = api.BaseBuffer
     _ = api.RetryConfig
     _ = api.BaseProducer
@@ -22,8 +38,13 @@ def test():
     _ = api.BaseCheckPoint
     _ = api.BaseConsumer
     _ = api.DataClassRecord
+    _ = api.UlidRecord
     _ = api.T_DATA_CLASS_RECORD
+    _ = api.LazyRecord
+    _ = api.SlotsRecord
+    _ = api.T_SLOTS_RECORD
     _ = api.FileBuffer
+    _ = api.MemoryBuffer
     _ = api.SimpleProducer
     _ = api.SimpleCheckpoint
     _ = api.SimpleConsumer
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+import array
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from unistream.records.dataclass import DataClassRecord
+from unistream.claim_check import ClaimCheck
+from unistream.batch import np, RecordBatch
+from unistream.buffers.file_buffer import FileBuffer
+from unistream.producer import RetryConfig
+from unistream.producers.simple import SimpleProducer
+
+dir_here = Path(__file__).absolute().parent
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    value: int = dataclasses.field(default=0)
+
+
+@dataclasses.dataclass
+class MyProducer(SimpleProducer):
+    use_record_batch = True
+
+    def send(self, records: RecordBatch):
+        assert isinstance(records, RecordBatch)
+        super().send(records)
+
+
+class TestRecordBatch:
+    def test_from_records(self):
+        records = [MyRecord(id=str(i), value=i) for i in range(1, 1 + 3)]
+        batch = RecordBatch.from_records(records)
+        assert batch.record_class is MyRecord
+        assert len(batch) == 3
+        assert batch[0] is records[0]
+        assert list(batch) == records
+        assert batch.column("id") == ["1", "2", "3"]
+        assert batch.to_array("value") == array.array("q", [1, 2, 3])
+        assert batch.to_array("value", typecode="d") == array.array("d", [1, 2, 3])
+        assert batch.serialize_many() == [record.serialize() for record in records]
+        assert list(batch.get_sizes()) == [
+            len(record.serialize()) for record in records
+        ]
+        assert batch.n_bytes == sum(batch.get_sizes())
+        assert "n_records=3" in repr(batch)
+        if np is None:
+            with pytest.raises(ImportError):
+                batch.to_numpy("value")
+
+        batch = RecordBatch.from_records([], record_class=MyRecord)
+        assert len(batch) == 0
+        assert batch.column("value") == []
+        with pytest.raises(ValueError):
+            RecordBatch.from_records([])
+
+        # the claim check reference is not materialized
+        reference = ClaimCheck.new(
+            record_class=MyRecord,
+            id="4",
+            create_at=records[0].create_at,
+            path=str(dir_here.joinpath("not_exists")),
+            n_bytes=100,
+        )
+        batch = RecordBatch.from_records([records[0], reference])
+        assert batch.column("id") == ["1", "4"]
+        assert batch.column("create_at") == [records[0].create_at] * 2
+        assert batch.column("value") == [1, None]
+        assert batch.serialize_many() == [records[0].serialize(), reference.serialize()]
+
+    def test_file_buffer_emit_batch(self):
+        path_wal = dir_here.joinpath("record_batch_file_buffer.log")
+        path_sink = dir_here.joinpath("record_batch_sink.log")
+        path_sink.unlink(missing_ok=True)
+        producer = MyProducer.new(
+            buffer=FileBuffer.new(
+                record_class=MyRecord,
+                path_wal=path_wal,
+                max_records=2,
+            ),
+            retry_config=RetryConfig(exp_backoff=[0]),
+            path_sink=path_sink,
+        )
+        buffer = producer.buffer
+        buffer.clear_wal()
+
+        # the batch is built from the WAL file
+        buffer.put(MyRecord(id="1", value=1))
+        buffer.put(MyRecord(id="2", value=2))
+        batch = buffer.emit_batch()
+        assert batch.column("value") == [1, 2]
+        # the records keep the serialized bytes read from the file
+        raw = batch.records[0].__dict__["_serialized"]
+        assert raw.__class__ is bytes
+        assert batch.serialize_many()[0] == raw.decode("utf-8")
+        assert buffer.emit_batch() is batch
+        assert buffer.emit() is batch.records
+        buffer.commit()
+        assert buffer.emitted_batch is None
+
+        # the batch is built from the memory queue
+        buffer.put(MyRecord(id="3", value=3))
+        assert buffer.emit_batch().column("id") == ["3"]
+        buffer.commit()
+
+        # the producer sends a batch
+        for i in range(4, 4 + 2):
+            producer.put(MyRecord(id=str(i), value=i))
+        records = buffer._read_log_file(path_sink)
+        assert [record.value for record in records] == [4, 5]
+
+        buffer.clear_wal()
+        path_sink.unlink()
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.batch", preview=False)
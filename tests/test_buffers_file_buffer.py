@@ -4,7 +4,10 @@ import pytest
 
 import time
 from pathlib import Path
+from unittest.mock import patch
 
+from unistream.compression import detect_compression
+from unistream.framing import read_data_bytes_list
 from unistream.records.dataclass import DataClassRecord
 from unistream.buffers.file_buffer import FileBuffer, BufferIsEmptyError
 
@@ -13,6 +16,8 @@ dir_here = Path(__file__).absolute().parent
 
 class TestFileBuffer:
     path_wal = dir_here.joinpath("file_buffer.log")
+    framed = False
+    compression = None
 
     def _new_buffer(self) -> FileBuffer:
         return FileBuffer.new(
@@ -20,6 +25,8 @@ class TestFileBuffer:
             path_wal=self.path_wal,
             max_records=2,
             max_bytes=1000000,
+            framed=self.framed,
+            compression=self.compression,
         )
 
     def _test_happy_path(self):
@@ -56,12 +63,16 @@ class TestFileBuffer:
             time.sleep(0.001)
             buffer.put(record)
         assert len(buffer.storage_queue) == 1
+        if self.compression is not None:
+            content = buffer.storage_queue[0].read_bytes()
+            assert detect_compression(content).name == self.compression
 
         # recover the buffer from persistence
         buffer = self._new_buffer()
         assert len(buffer.memory_queue) == 1
         assert len(buffer.storage_queue) == 1
         assert buffer.memory_queue[0].id == "5"
+        assert buffer.n_bytes == len(buffer.memory_queue[0].serialize().encode())
 
         # put records 6, 7, 8, 9
         new_record_list = [DataClassRecord(id=str(i)) for i in [6, 7, 8, 9]]
@@ -100,9 +111,290 @@ class TestFileBuffer:
         with pytest.raises(BufferIsEmptyError):
             buffer.commit()
 
+    def _test_put_many(self):
+        buffer = self._new_buffer()
+        buffer.clear_wal()
+        record_list = [
+            DataClassRecord(id=str(i), create_at=f"2024-01-01T00:00:0{i}+00:00")
+            for i in range(1, 10)
+        ]
+        buffer.put_many([])
+        assert buffer.path_wal.exists() is False
+        buffer.put(record_list[0])
+        # the burst crosses the max_records boundary three times
+        buffer.put_many(record_list[1:7])
+        assert len(buffer.storage_queue) == 3
+        assert buffer.n_records == 1
+        assert buffer.memory_queue[0].id == "7"
+        assert buffer.n_bytes == len(record_list[6].serialize().encode())
+
+        # the WAL files are the same as the ones written by put
+        buffer = self._new_buffer()
+        assert [record.id for record in buffer.memory_queue] == ["7"]
+        assert len(buffer.storage_queue) == 3
+
+        # the burst crosses the max_bytes boundary
+        buffer.max_records = 100
+        buffer.max_bytes = 100
+        buffer.put_many(record_list[7:])
+        assert len(buffer.storage_queue) == 4
+        assert [record.id for record in buffer.memory_queue] == ["9"]
+
+        ids = list()
+        while buffer.should_i_emit():
+            ids.append([record.id for record in buffer.emit()])
+            buffer.commit()
+        assert ids == [["1", "2"], ["3", "4"], ["5", "6"], ["7", "8"]]
+        assert [record.id for record in buffer.emit()] == ["9"]
+        buffer.commit()
+
+    def _test_fsync(self):
+        record_list = [DataClassRecord(id=str(i)) for i in range(1, 10)]
+
+        buffer = self._new_buffer()
+        buffer.clear_wal()
+        with patch("os.fsync") as fsync:
+            buffer.put(record_list[0])
+            wal = buffer._wal
+            buffer.put(record_list[1])
+            assert buffer._wal is None  # closed on rotation
+            buffer.put(record_list[2])
+            assert buffer._wal is not wal
+            buffer.close()
+            assert fsync.call_count == 0  # never fsync by default
+        buffer.clear_wal()
+
+        buffer = FileBuffer.new(
+            record_class=DataClassRecord,
+            path_wal=self.path_wal,
+            max_records=10,
+            framed=self.framed,
+            fsync_every_records=3,
+        )
+        buffer.clear_wal()
+        with patch("os.fsync") as fsync:
+            buffer.put_many(record_list[:2])
+            assert fsync.call_count == 0
+            buffer.put(record_list[2])
+            assert fsync.call_count == 1
+            buffer.put(record_list[3])
+            assert fsync.call_count == 1
+            buffer.close()
+            assert fsync.call_count == 2
+            buffer.close()
+            assert fsync.call_count == 2
+        # the WAL file is opened again
+        buffer.put(record_list[4])
+        records = buffer._read_log_file(self.path_wal)
+        assert [record.id for record in records] == ["1", "2", "3", "4", "5"]
+
+        buffer = FileBuffer.new(
+            record_class=DataClassRecord,
+            path_wal=self.path_wal,
+            max_records=10,
+            framed=self.framed,
+            fsync_every_ms=50,
+        )
+        buffer.clear_wal()
+        with patch("os.fsync") as fsync:
+            buffer.put(record_list[0])
+            buffer.put(record_list[1])
+            assert fsync.call_count == 0
+            time.sleep(0.06)
+            buffer.put(record_list[2])
+            assert fsync.call_count == 1
+            # the tail of a burst is fsynced by tick once it is due
+            buffer.put(record_list[3])
+            assert buffer.tick() is False
+            assert fsync.call_count == 1
+            time.sleep(0.06)
+            assert buffer.tick() is False
+            assert fsync.call_count == 2
+            assert buffer.tick() is False
+            assert fsync.call_count == 2
+        buffer.clear_wal()
+
+    def _test_max_age(self):
+        record_list = [DataClassRecord(id=str(i)) for i in range(1, 10)]
+
+        def new_buffer() -> FileBuffer:
+            return FileBuffer.new(
+                record_class=DataClassRecord,
+                path_wal=self.path_wal,
+                max_records=10,
+                framed=self.framed,
+                compression=self.compression,
+                max_age=0.05,
+            )
+
+        buffer = new_buffer()
+        buffer.clear_wal()
+        assert buffer.tick() is False
+        buffer.put_many(record_list[:2])
+        assert buffer.tick() is False
+        time.sleep(0.06)
+        # the old records are moved by tick
+        assert buffer.tick() is True
+        assert buffer.tick() is False
+        assert buffer.should_i_emit() is True
+        assert buffer.n_records == 0
+
+        # the old records are moved by put
+        buffer.put(record_list[2])
+        time.sleep(0.06)
+        buffer.put(record_list[3])
+        assert len(buffer.storage_queue) == 2
+
+        # the age of the recovered records counts from the recovery
+        buffer.put_many(record_list[4:6])
+        buffer = new_buffer()
+        assert buffer.n_records == 2
+        assert buffer.tick() is False
+        time.sleep(0.06)
+        buffer.put_many(record_list[6:])
+        assert len(buffer.storage_queue) == 3
+
+        ids = list()
+        while buffer.should_i_emit():
+            ids.append([record.id for record in buffer.emit()])
+            buffer.commit()
+        assert ids == [["1", "2"], ["3", "4"], ["5", "6", "7", "8", "9"]]
+
+    def _test_emit_many(self):
+        buffer = self._new_buffer()
+        buffer.clear_wal()
+        record_list = [DataClassRecord(id=str(i)) for i in range(1, 10)]
+        buffer.put_many(record_list)
+        assert len(buffer.storage_queue) == 4
+
+        # default to one full buffer
+        assert [record.id for record in buffer.emit_many()] == ["1", "2"]
+        # the emitted records are returned until commit
+        assert len(buffer.emit_many(max_records=100)) == 2
+        buffer.commit()
+        assert len(buffer.storage_queue) == 3
+
+        # the files are picked by the manifest, only the emitted ones are read
+        with patch(
+            "unistream.buffers.file_buffer.read_data_bytes_list",
+            wraps=read_data_bytes_list,
+        ) as mock_read:
+            records = buffer.emit_many(max_records=5)
+        assert mock_read.call_count == 2
+        assert [record.id for record in records] == ["3", "4", "5", "6"]
+        assert buffer.emit() is records
+        assert [record.id for record in buffer.emit_batch().records] == ["3", "4", "5", "6"]
+        buffer.commit()
+        assert len(buffer.storage_queue) == 1
+
+        # at least one WAL file
+        assert len(buffer.emit_many(max_records=100, max_bytes=1)) == 2
+        buffer.commit()
+        assert [record.id for record in buffer.emit_many()] == ["9"]
+        buffer.commit()
+        assert buffer.path_wal.exists() is False
+        buffer.clear_wal()
+        assert buffer.manifest.path.exists() is False
+
+    def _test_torn_write(self):
+        record_list = [DataClassRecord(id=str(i)) for i in range(1, 10)]
+
+        def new_buffer(max_records: int = 10) -> FileBuffer:
+            return FileBuffer.new(
+                record_class=DataClassRecord,
+                path_wal=self.path_wal,
+                max_records=max_records,
+                framed=self.framed,
+                compression=self.compression,
+            )
+
+        buffer = new_buffer()
+        buffer.clear_wal()
+        buffer.put_many(record_list[:3])
+        buffer.close()
+        content = self.path_wal.read_bytes()
+
+        # a half written record is truncated
+        self.path_wal.write_bytes(content + content[-20:-5])
+        with patch("unistream.buffers.file_buffer.logger.warning") as warning:
+            buffer = new_buffer()
+        assert "drop 15 bytes at offset" in warning.call_args.args[0]
+        assert [record.id for record in buffer.memory_queue] == ["3", "2", "1"]
+        assert self.path_wal.read_bytes() == content
+        buffer.put(record_list[3])
+        records = buffer._read_log_file(self.path_wal)
+        assert [record.id for record in records] == ["1", "2", "3", "4"]
+        buffer.close()
+
+        # a crc32 mismatch in the middle drops all the records after it
+        if self.framed:
+            full_content = self.path_wal.read_bytes()
+            corrupted = bytearray(content)
+            corrupted[20] ^= 0xFF  # in the payload of the first frame
+            self.path_wal.write_bytes(bytes(corrupted))
+            with patch("unistream.buffers.file_buffer.logger.warning") as warning:
+                buffer = new_buffer()
+            message = warning.call_args.args[0]
+            assert f"drop {len(content) - 4} bytes at offset 4 " in message
+            assert buffer.n_records == 0
+            self.path_wal.write_bytes(full_content)
+
+        # a full WAL file that is not moved yet is moved on startup
+        buffer = new_buffer(max_records=4)
+        assert buffer.n_records == 0
+        assert len(buffer.storage_queue) == 1
+        assert [record.id for record in buffer.emit()] == ["1", "2", "3", "4"]
+        buffer.clear_wal()
+
+        # the WAL file is cut in the middle of the first record
+        self.path_wal.write_bytes(content[:3])
+        buffer = new_buffer()
+        assert buffer.n_records == 0
+        buffer.put(record_list[0])
+        records = buffer._read_log_file(self.path_wal)
+        assert [record.id for record in records] == ["1"]
+        buffer.clear_wal()
+
+        # the footer is written, but the WAL file is not moved yet
+        if self.framed:
+            buffer.put_many(record_list[:2])
+            buffer._frame_writer.write_footer(2)
+            buffer.close()
+            buffer = new_buffer()
+            assert buffer.n_records == 0
+            assert len(buffer.storage_queue) == 1
+            buffer.clear_wal()
+
     def test(self):
         print("")
         self._test_happy_path()
+        self._test_put_many()
+        self._test_fsync()
+        self._test_max_age()
+        self._test_emit_many()
+        self._test_torn_write()
+
+
+class TestFramedFileBuffer(TestFileBuffer):
+    path_wal = dir_here.joinpath("framed_file_buffer.log")
+    framed = True
+
+
+class TestCompressedFileBuffer(TestFileBuffer):
+    path_wal = dir_here.joinpath("compressed_file_buffer.log")
+    compression = "zlib"
+
+
+class TestCompressedFramedFileBuffer(TestFileBuffer):
+    path_wal = dir_here.joinpath("compressed_framed_file_buffer.log")
+    framed = True
+    compression = "lzma"
+
+
+class TestDictCompressedFramedFileBuffer(TestFileBuffer):
+    path_wal = dir_here.joinpath("dict_compressed_framed_file_buffer.log")
+    framed = True
+    compression = "dict"
 
 
 if __name__ == "__main__":
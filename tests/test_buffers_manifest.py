@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import dataclasses
+from pathlib import Path
+
+from unistream.records.dataclass import DataClassRecord
+from unistream.buffers.manifest import Segment, Manifest
+from unistream.buffers.file_buffer import FileBuffer
+from unistream.tests import prepare_temp_dir
+
+dir_here = Path(__file__).absolute().parent
+dir_data = dir_here / "test_buffers_manifest"
+
+
+def new_segment(seq: int) -> Segment:
+    return Segment(
+        seq=seq,
+        name=f"buffer.{seq}.log",
+        n_records=10,
+        n_bytes=100,
+        create_at="2024-01-01T00:00:00+00:00",
+    )
+
+
+def test_manifest():
+    prepare_temp_dir(dir_data)
+    path = dir_data / "buffer.log.manifest"
+    manifest = Manifest(path=path, compact_threshold=4)
+    assert manifest.next_seq == 1
+    for seq in [1, 2, 3]:
+        manifest.add(new_segment(seq))
+    assert manifest.next_seq == 4
+    manifest.remove("buffer.1.log")
+    assert manifest.n_garbage == 2
+    assert len(path.read_text().splitlines()) == 4
+
+    manifest = Manifest(path=path, compact_threshold=4)
+    manifest.load()
+    assert list(manifest.segments) == ["buffer.2.log", "buffer.3.log"]
+    assert manifest.segments["buffer.2.log"] == new_segment(2)
+    assert manifest.n_garbage == 2
+
+    # compact once the garbage exceeds the live segments
+    manifest.remove("buffer.2.log")
+    assert manifest.n_garbage == 0
+    assert len(path.read_text().splitlines()) == 1
+
+    # a torn last line is ignored
+    with path.open("a") as f:
+        f.write('{"del": "buffer')
+    manifest = Manifest(path=path)
+    manifest.load()
+    assert list(manifest.segments) == ["buffer.3.log"]
+    manifest.add(new_segment(4))
+    manifest.load()
+    assert list(manifest.segments) == ["buffer.3.log", "buffer.4.log"]
+
+    manifest.clear()
+    assert path.exists() is False
+    assert manifest.next_seq == 1
+
+
+def test_file_buffer():
+    prepare_temp_dir(dir_data)
+    path_wal = dir_data / "buffer.log"
+
+    def new_buffer() -> FileBuffer:
+        return FileBuffer.new(
+            record_class=DataClassRecord,
+            path_wal=path_wal,
+            max_records=2,
+        )
+
+    buffer = new_buffer()
+    buffer.put_many([DataClassRecord(id=str(i)) for i in range(1, 8)])
+    segments = list(buffer.manifest.segments.values())
+    assert [segment.seq for segment in segments] == [1, 2, 3]
+    assert [segment.n_records for segment in segments] == [2, 2, 2]
+    assert segments[0].create_at == buffer._read_log_file(buffer.storage_queue[-1])[0].create_at
+    buffer.commit()
+    assert len(buffer.manifest.segments) == 2
+
+    # the storage queue is loaded from the manifest
+    buffer = new_buffer()
+    assert len(buffer.storage_queue) == 2
+    assert buffer.storage_queue[-1].name == segments[1].name
+
+    # the manifest is rebuilt if missing
+    buffer.manifest.path.unlink()
+    buffer = new_buffer()
+    assert len(buffer.storage_queue) == 2
+    assert buffer.manifest.path.exists()
+    assert [
+        dataclasses.replace(segment, seq=0)
+        for segment in buffer.manifest.segments.values()
+    ] == [dataclasses.replace(segment, seq=0) for segment in segments[1:]]
+
+    # crash after the full WAL file is added to the manifest, before rename
+    buffer.put(DataClassRecord(id="8"))
+    path = buffer.storage_queue[0]
+    path.rename(path_wal)
+    buffer = new_buffer()
+    assert len(buffer.storage_queue) == 3
+    assert buffer.n_records == 0
+    assert [record.id for record in buffer._read_log_file(path)] == ["7", "8"]
+
+    # crash after the WAL file is deleted, before it is removed from the manifest
+    buffer.storage_queue[-1].unlink()
+    buffer = new_buffer()
+    assert len(buffer.storage_queue) == 2
+    assert len(buffer.manifest.segments) == 2
+    ids = list()
+    while buffer.should_i_emit():
+        ids.extend([record.id for record in buffer.emit()])
+        buffer.commit()
+    assert ids == ["5", "6", "7", "8"]
+
+    buffer.clear_wal()
+    assert list(dir_data.iterdir()) == []
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.buffers.manifest", preview=False)
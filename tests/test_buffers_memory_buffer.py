@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+import shutil
+from pathlib import Path
+
+from unistream.exc import BufferIsFullError
+from unistream.records.dataclass import DataClassRecord
+from unistream.buffers.memory_buffer import MemoryBuffer, BufferIsEmptyError
+from unistream.producer import RetryConfig
+from unistream.producers.simple import SimpleProducer
+from unistream.logger import logger
+
+dir_here = Path(__file__).absolute().parent
+dir_folder = dir_here.joinpath("test_memory_buffer")
+
+
+def ids(records) -> list[str]:
+    return [record.id for record in records]
+
+
+def make_records(start: int, end: int) -> list[DataClassRecord]:
+    return [DataClassRecord(id=str(i)) for i in range(start, end)]
+
+
+class TestMemoryBuffer:
+    def _test_happy_path(self):
+        buffer = MemoryBuffer.new(max_records=2)
+        assert buffer.should_i_emit() is False
+        with pytest.raises(BufferIsEmptyError):
+            buffer.emit()
+        with pytest.raises(BufferIsEmptyError):
+            buffer.commit()
+
+        buffer.put_many(make_records(1, 4))
+        assert buffer.should_i_emit() is True
+        assert len(buffer.storage_queue) == 1
+        assert ids(buffer.memory_queue) == ["3"]
+        assert buffer.n_records == 1
+        assert buffer.n_bytes == len(buffer.memory_queue[0].serialize())
+
+        # emit is cached until commit
+        assert ids(buffer.emit()) == ["1", "2"]
+        buffer.put(DataClassRecord(id="4"))
+        assert ids(buffer.emit()) == ["1", "2"]
+        buffer.commit()
+        assert ids(buffer.emit()) == ["3", "4"]
+        assert ids(buffer.emit_batch()) == ["3", "4"]
+        buffer.commit()
+        assert buffer.should_i_emit() is False
+
+        # emit the current batch, records put before commit are kept
+        buffer.put(DataClassRecord(id="5"))
+        assert ids(buffer.emit()) == ["5"]
+        buffer.put(DataClassRecord(id="6"))
+        buffer.commit()
+        assert ids(buffer.emit()) == ["6"]
+        buffer.commit()
+        with pytest.raises(BufferIsEmptyError):
+            buffer.emit()
+
+        # max_bytes
+        buffer = MemoryBuffer.new(max_records=1000, max_bytes=1)
+        buffer.put(DataClassRecord(id="1"))
+        assert len(buffer.storage_queue) == 1
+
+        with pytest.raises(ValueError):
+            MemoryBuffer.new(overflow="block")
+
+    def _test_overflow(self):
+        # drop the oldest batch, keep the emitted one
+        buffer = MemoryBuffer.new(max_records=2, max_batches=2)
+        buffer.put_many(make_records(1, 5))
+        assert ids(buffer.emit()) == ["1", "2"]
+        buffer.put_many(make_records(5, 9))
+        assert [ids(batch) for batch in buffer.storage_queue] == [["7", "8"], ["1", "2"]]
+        assert buffer.n_dropped_records == 4
+        buffer.commit()
+        assert ids(buffer.emit()) == ["7", "8"]
+
+        buffer = MemoryBuffer.new(max_records=2, max_batches=2)
+        buffer.put_many(make_records(1, 7))
+        assert [ids(batch) for batch in buffer.storage_queue] == [["5", "6"], ["3", "4"]]
+        assert buffer.n_dropped_records == 2
+
+        # drop the new batch
+        buffer = MemoryBuffer.new(max_records=2, max_batches=2, overflow="drop_newest")
+        buffer.put_many(make_records(1, 7))
+        assert [ids(batch) for batch in buffer.storage_queue] == [["3", "4"], ["1", "2"]]
+        assert buffer.n_dropped_records == 2
+
+        # raise, the record is not put
+        buffer = MemoryBuffer.new(max_records=2, max_batches=2, overflow="raise")
+        buffer.put_many(make_records(1, 6))
+        with pytest.raises(BufferIsFullError):
+            buffer.put(DataClassRecord(id="6"))
+        assert ids(buffer.memory_queue) == ["5"]
+        buffer.emit()
+        buffer.commit()
+        buffer.put(DataClassRecord(id="6"))
+        assert len(buffer.storage_queue) == 2
+        assert buffer.n_dropped_records == 0
+
+    def _test_producer(self):
+        """
+        MemoryBuffer drops into the producer unchanged.
+        """
+        shutil.rmtree(dir_folder, ignore_errors=True)
+        dir_folder.mkdir(exist_ok=True)
+        path_sink = dir_folder.joinpath("sink.log")
+        producer = SimpleProducer.new(
+            buffer=MemoryBuffer.new(max_records=3),
+            retry_config=RetryConfig(exp_backoff=[0]),
+            path_sink=path_sink,
+        )
+        for record in make_records(1, 5):
+            producer.put(record)
+        producer.put_many(make_records(5, 11))
+        producer.drain()
+        lines = path_sink.read_text().splitlines()
+        assert [DataClassRecord.deserialize(line).id for line in lines] == [
+            str(i) for i in range(1, 10)
+        ]
+        assert ids(producer.buffer.memory_queue) == ["10"]
+        shutil.rmtree(dir_folder, ignore_errors=True)
+
+    def test(self):
+        with logger.disabled(disable=True):
+            self._test_happy_path()
+            self._test_overflow()
+            self._test_producer()
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.buffers.memory_buffer", preview=False)
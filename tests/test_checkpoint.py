@@ -6,7 +6,7 @@ from pathlib import Path
 
 from unistream.records.dataclass import DataClassRecord
 from unistream.checkpoint import Tracker, BaseCheckPoint, StatusEnum
-from unistream.utils import EPOCH_STR, get_utc_now
+from unistream.utils import EPOCH_STR, get_utc_now, to_epoch_us
 
 dir_here = Path(__file__).absolute().parent
 
@@ -41,6 +41,11 @@ class TestTracker:
         assert isinstance(tracker.lock_expire_datetime, datetime)
         assert tracker.lock_expire_datetime > tracker.lock_datetime
 
+        # the epoch is cached until the lock_expire_time changes
+        assert tracker.lock_expire_epoch_us == to_epoch_us(tracker.lock_expire_datetime)
+        tracker.lock_expire_time = EPOCH_STR
+        assert tracker.lock_expire_epoch_us == 0
+
 
 class TestBaseCheckPoint:
     path_wal = dir_here.joinpath("file_buffer.log")
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import typing as T
+import dataclasses
 from pathlib import Path
 
+from unistream.compression import detect_compression
 from unistream.records.dataclass import DataClassRecord
 from unistream.checkpoints.simple import SimpleCheckpoint
 
@@ -15,6 +18,13 @@ path_records_file = dir_data / "records.json"
 prepare_temp_dir(dir_data)
 
 
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    codec: T.ClassVar[str] = "auto"
+
+    msg: str = dataclasses.field(default="")
+
+
 class TestSimpleCheckPoint:
     def _new_checkpoint(self) -> SimpleCheckpoint:
         return SimpleCheckpoint(
@@ -68,8 +78,44 @@ class TestSimpleCheckPoint:
         checkpoint.mark_as_succeeded(record)
         checkpoint.dump_as_succeeded(record)
 
+    def _test_framed(self):
+        checkpoint = self._new_checkpoint()
+        checkpoint.framed = True
+        records = [DataClassRecord(id="id-1"), DataClassRecord(id="id-2")]
+        checkpoint.dump_records(records)
+        assert checkpoint.load_records(DataClassRecord) == records
+
+    def _test_compression(self):
+        for framed in [False, True]:
+            checkpoint = self._new_checkpoint()
+            checkpoint.framed = framed
+            checkpoint.compression = "dict"
+            records = [DataClassRecord(id=f"id-{i}") for i in range(10)]
+            checkpoint.dump_records(records)
+            assert detect_compression(path_records_file.read_bytes()).name == "dict"
+            assert checkpoint.load_records(DataClassRecord) == records
+            assert [
+                record.materialize()
+                for record in checkpoint.load_records(DataClassRecord, lazy=True)
+            ] == records
+
+    def _test_unicode_line_boundary(self):
+        # orjson doesn't escape U+2028, the lazy path must not split on it
+        checkpoint = self._new_checkpoint()
+        records = [MyRecord(id="id-1", msg="a\u2028b"), MyRecord(id="id-2")]
+        checkpoint.update_for_new_batch(records=records, next_pointer=2)
+        checkpoint.dump_records(records)
+        assert checkpoint.load_records(MyRecord) == records
+        lazy_records = checkpoint.load_records(MyRecord, lazy=True)
+        assert [record.materialize() for record in lazy_records] == records
+        checkpoint.mark_as_succeeded(records[1])
+        assert checkpoint.get_not_succeeded_records(MyRecord) == records[:1]
+
     def test(self):
         self._test()
+        self._test_framed()
+        self._test_compression()
+        self._test_unicode_line_boundary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from unistream.records.dataclass import DataClassRecord
+from unistream.batch import RecordBatch
+from unistream.chunking import (
+    is_chunk,
+    split_text,
+    ChunkRecord,
+    split,
+    reassemble,
+    deserialize_many_bytes,
+    ChunkingConfig,
+)
+from unistream.aggregation import AggregationConfig
+from unistream.buffers.file_buffer import FileBuffer
+from unistream.producer import RetryConfig
+from unistream.producers.simple import SimpleProducer
+from unistream.checkpoints.simple import SimpleCheckpoint
+from unistream.consumers.simple import SimpleConsumer
+from unistream.tests import prepare_temp_dir
+
+dir_here = Path(__file__).absolute().parent
+dir_data = dir_here / "test_chunking"
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    value: str = dataclasses.field(default="")
+
+
+processed: list[MyRecord] = list()
+
+
+@dataclasses.dataclass
+class MyConsumer(SimpleConsumer):
+    def process_record(self, record: MyRecord):
+        processed.append(record)
+
+
+def test_split_text():
+    assert split_text("abcdefg", 3) == ["abc", "def", "g"]
+    data = "a中文b🙂c" * 10
+    pieces = split_text(data, 5)
+    assert "".join(pieces) == data
+    assert all(len(piece.encode("utf-8")) <= 5 for piece in pieces)
+
+
+def test_split_and_reassemble():
+    small = MyRecord(id="small")
+    large = MyRecord(id="large", value='中"x\\' * 300)
+    with pytest.raises(ValueError):
+        split(large, max_bytes=100)
+    chunks = split(large, max_bytes=500)
+    assert len(chunks) > 1
+    assert [chunk.id for chunk in chunks][:2] == ["large.0", "large.1"]
+    for chunk in chunks:
+        data = chunk.serialize()
+        assert is_chunk(data)
+        assert is_chunk(memoryview(data.encode("utf-8")))
+        assert len(data.encode("utf-8")) <= 500
+        assert ChunkRecord.deserialize(data + "\n") == chunk
+    assert is_chunk(small.serialize()) is False
+
+    records, n_pending = reassemble([small, *chunks, small], MyRecord)
+    assert records == [small, large, small]
+    assert n_pending == 0
+
+    # the trailing incomplete group is pending
+    records, n_pending = reassemble([small, *chunks[:2]], MyRecord)
+    assert records == [small]
+    assert n_pending == 2
+
+    # an incomplete group followed by a retry is dropped
+    records, n_pending = reassemble([*chunks[:2], *chunks, chunks[1]], MyRecord)
+    assert records == [large]
+    assert n_pending == 0
+
+    data_list = [record.serialize().encode("utf-8") for record in [small, *chunks]]
+    records = deserialize_many_bytes(MyRecord, data_list, trusted=True)
+    assert records == [small, *chunks]
+
+
+def test_chunking_config():
+    config = ChunkingConfig(max_bytes=500)
+    records = [MyRecord(id=str(i)) for i in range(3)]
+    assert config.split([]) == []
+    assert config.split(records) is records
+    batch = RecordBatch.from_records(records)
+    assert config.split(batch) is batch
+    records.append(MyRecord(id="large", value="x" * 1000))
+    results = config.split(RecordBatch.from_records(records))
+    assert results[:3] == records[:3]
+    assert len(results) > 4
+    assert {record.group_id for record in results[3:]} == {"large"}
+
+
+def test_producer_and_consumer():
+    for aggregation_config in [None, AggregationConfig(max_records=2)]:
+        prepare_temp_dir(dir_data)
+        processed.clear()
+        path_sink = dir_data / "sink.log"
+        producer = SimpleProducer.new(
+            buffer=FileBuffer.new(
+                record_class=MyRecord,
+                path_wal=dir_data / "buffer.log",
+                max_records=3,
+                max_bytes=1_000_000,
+            ),
+            retry_config=RetryConfig(exp_backoff=[1]),
+            path_sink=path_sink,
+            aggregation_config=aggregation_config,
+            chunking_config=ChunkingConfig(max_bytes=1000),
+        )
+        records = [
+            MyRecord(id=str(i), value="x" * (3000 if i % 3 == 1 else 10))
+            for i in range(6)
+        ]
+        for record in records:
+            producer.put(record)
+        lines = path_sink.read_text().splitlines()
+        assert max(len(line) for line in lines) <= 1000
+
+        checkpoint = SimpleCheckpoint(
+            lock_expire=60,
+            max_attempts=3,
+            initial_pointer=0,
+            start_pointer=0,
+            next_pointer=None,
+            batch_sequence=0,
+            batch=dict(),
+            checkpoint_file=str(dir_data / "checkpoint.json"),
+            records_file=str(dir_data / "records.json"),
+        )
+        consumer = MyConsumer.new(
+            record_class=MyRecord,
+            path_source=path_sink,
+            path_dlq=dir_data / "dlq.log",
+            checkpoint=checkpoint,
+            limit=2,  # smaller than a group
+            aggregated=aggregation_config is not None,
+            chunked=True,
+        )
+        for _ in range(len(lines)):
+            consumer.process_batch()
+            # the checkpoint tracks the logical records
+            assert all(
+                "." not in record_id for record_id in consumer.checkpoint.batch
+            )
+        assert processed == records
+        assert consumer.checkpoint.start_pointer == len(lines)
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.chunking", preview=False)
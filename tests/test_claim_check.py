@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import dataclasses
+from pathlib import Path
+
+from unistream.records.dataclass import DataClassRecord
+from unistream.records.lazy import LazyRecord
+from unistream.claim_check import (
+    is_claim_check,
+    ClaimCheck,
+    deserialize_many,
+    deserialize_many_bytes,
+    to_lazy_records,
+    ClaimCheckConfig,
+    get_blob_paths,
+    delete_blobs,
+)
+from unistream.buffers.file_buffer import FileBuffer
+from unistream.producer import RetryConfig
+from unistream.producers.simple import SimpleProducer
+from unistream.checkpoints.simple import SimpleCheckpoint
+from unistream.consumers.simple import SimpleConsumer
+from unistream.tests import prepare_temp_dir
+
+dir_here = Path(__file__).absolute().parent
+dir_data = dir_here / "test_claim_check"
+dir_blob = dir_data / "blobs"
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    value: str = dataclasses.field(default="")
+
+
+processed: list[MyRecord] = list()
+
+
+@dataclasses.dataclass
+class MyConsumer(SimpleConsumer):
+    def process_record(self, record: MyRecord):
+        if record.value.startswith("fail"):
+            raise ValueError("failed to process")
+        processed.append(record)
+
+
+def get_blobs() -> list[Path]:
+    return [p for p in dir_blob.glob("*/*") if p.is_file()]
+
+
+def test_claim_check():
+    prepare_temp_dir(dir_data)
+    config = ClaimCheckConfig(dir_blob=dir_blob, threshold=100)
+    small = MyRecord(id="small", value="x")
+    large = MyRecord(id="large", value="x" * 1000)
+    assert config.offload(small) is small
+    claim_check = config.offload(large)
+    assert isinstance(claim_check, ClaimCheck)
+    assert claim_check.id == "large"
+    assert claim_check.n_bytes == len(large.serialize())
+    assert len(get_blobs()) == 1
+    # the same content is stored once
+    assert config.offload(large).path == claim_check.path
+    assert len(get_blobs()) == 1
+
+    data = claim_check.serialize()
+    assert len(data) < claim_check.n_bytes
+    assert is_claim_check(data)
+    assert is_claim_check(data.encode("utf-8"))
+    assert is_claim_check(memoryview(data.encode("utf-8")))
+    assert is_claim_check(small.serialize()) is False
+
+    data_list = [small.serialize(), data, small.serialize()]
+    for records in [
+        deserialize_many(MyRecord, data_list),
+        deserialize_many_bytes(
+            MyRecord, [data.encode("utf-8") for data in data_list], trusted=True
+        ),
+    ]:
+        assert records[0] == small
+        assert records[1].is_materialized is False
+        assert records[1].id == "large"
+        assert records[1].value == large.value
+        assert records[1].materialize() == large
+        assert records[2] == small
+
+    records = to_lazy_records(MyRecord, data_list)
+    assert type(records[0]) is LazyRecord
+    assert type(records[1]) is ClaimCheck
+    assert records[1].serialize() == data
+
+    assert get_blob_paths(records) == {claim_check.path}
+
+    # the retention sweep deletes the blobs not written for a while
+    os.utime(claim_check.path, (time.time() - 100, time.time() - 100))
+    assert config.delete_expired_blobs(retention=1000) == 0
+    config.offload(large)  # writing it again restarts the retention
+    assert config.delete_expired_blobs(retention=50) == 0
+    os.utime(claim_check.path, (time.time() - 100, time.time() - 100))
+    assert config.delete_expired_blobs(retention=50) == 1
+    assert len(get_blobs()) == 0
+
+    config.offload(large)
+    claim_check.delete_blob()
+    claim_check.delete_blob()
+    assert len(get_blobs()) == 0
+
+
+def new_checkpoint() -> SimpleCheckpoint:
+    return SimpleCheckpoint(
+        lock_expire=60,
+        max_attempts=3,
+        initial_pointer=0,
+        start_pointer=0,
+        next_pointer=None,
+        batch_sequence=0,
+        batch=dict(),
+        checkpoint_file=str(dir_data / "checkpoint.json"),
+        records_file=str(dir_data / "records.json"),
+    )
+
+
+def new_consumer(path_sink: Path, **kwargs) -> MyConsumer:
+    return MyConsumer.new(
+        record_class=MyRecord,
+        path_source=path_sink,
+        path_dlq=dir_data / "dlq.log",
+        checkpoint=new_checkpoint(),
+        limit=3,
+        exp_backoff_min=0,
+        exp_backoff_max=0,
+        **kwargs,
+    )
+
+
+def test_producer_and_consumer():
+    prepare_temp_dir(dir_data)
+    processed.clear()
+    path_sink = dir_data / "sink.log"
+    path_wal = dir_data / "buffer.log"
+    producer = SimpleProducer.new(
+        buffer=FileBuffer.new(
+            record_class=MyRecord,
+            path_wal=path_wal,
+            max_records=3,
+            max_bytes=1000,
+        ),
+        retry_config=RetryConfig(exp_backoff=[1]),
+        path_sink=path_sink,
+        claim_check_config=ClaimCheckConfig(dir_blob=dir_blob, threshold=500),
+    )
+    records = [
+        MyRecord(id=str(i), value="x" * (10000 if i % 2 else 10)) for i in range(6)
+    ]
+    for record in records[:4]:
+        producer.put(record)
+    # the large records don't fill the buffer by themselves
+    assert path_sink.stat().st_size < 1000
+    assert len(path_wal.read_text().splitlines()) == 1
+    assert len(get_blobs()) == 2
+
+    # the buffer is recovered from the WAL with the references
+    producer.buffer = FileBuffer.new(
+        record_class=MyRecord,
+        path_wal=path_wal,
+        max_records=3,
+        max_bytes=1000,
+    )
+    for record in records[4:]:
+        producer.put(record)
+    assert len(get_blobs()) == 3
+
+    consumer = new_consumer(path_sink)
+    consumer.process_batch()
+    assert consumer.checkpoint.path_records.stat().st_size < 1000
+    # the records file still points to the blob of the committed batch
+    assert len(get_blobs()) == 3
+    # it is deleted at the start of the next batch
+    consumer.process_batch()
+    assert len(get_blobs()) == 2
+    consumer.process_batch()
+    assert len(get_blobs()) == 0
+    assert processed == records
+
+
+def test_failed_and_duplicate_records():
+    prepare_temp_dir(dir_data)
+    processed.clear()
+    config = ClaimCheckConfig(dir_blob=dir_blob, threshold=500)
+    path_sink = dir_data / "sink.log"
+    failed = MyRecord(id="failed", value="fail" + "x" * 1000)
+    large = MyRecord(id="large", value="x" * 1000)
+    duplicate = MyRecord(id="duplicate", value="x" * 1000)
+    records = [
+        # batch 1
+        failed,
+        large,
+        MyRecord(id="1"),
+        # batch 2, the same content as ``large`` is resent
+        large,
+        MyRecord(id="2"),
+        MyRecord(id="3"),
+        # batch 3
+        duplicate,
+    ]
+    path_sink.write_text(
+        "".join([config.offload(record).serialize() + "\n" for record in records])
+    )
+    assert len(get_blobs()) == 3
+
+    consumer = new_consumer(path_sink)
+    consumer.process_batch()
+    # the failed record can still be read for the DLQ
+    not_succeeded = consumer.checkpoint.get_not_succeeded_records(MyRecord)
+    assert not_succeeded == [failed]
+    assert len(get_blobs()) == 3
+
+    # the blob of ``large`` is referenced again, the failed record blob is kept
+    consumer.process_batch()
+    assert len(get_blobs()) == 3
+    # the consumer restarts, the blob of the last batch is found in the checkpoint
+    checkpoint = consumer.checkpoint
+    consumer = new_consumer(path_sink)
+    consumer.checkpoint = SimpleCheckpoint.load(
+        checkpoint_file=checkpoint.checkpoint_file,
+        records_file=checkpoint.records_file,
+    )
+    consumer.process_batch()
+    assert len(get_blobs()) == 2
+    assert [record.id for record in processed] == [
+        "large",
+        "1",
+        "large",
+        "2",
+        "3",
+        "duplicate",
+    ]
+    consumer.process_batch()
+    assert len(get_blobs()) == 1
+
+    # the failed record blob is deleted after it is sent to the DLQ
+    delete_blobs([config.offload(failed)])
+    assert len(get_blobs()) == 0
+
+    # the consumer never deletes the blobs with keep_blobs
+    prepare_temp_dir(dir_data)
+    path_sink.write_text(config.offload(large).serialize() + "\n")
+    consumer = new_consumer(path_sink, keep_blobs=True)
+    consumer.process_batch()
+    consumer.process_batch()
+    assert len(get_blobs()) == 1
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.claim_check", preview=False)
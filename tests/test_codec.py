@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import typing as T
+import dataclasses
+
+import pytest
+
+from unistream.codec import (
+    BaseCodec,
+    JsonCodec,
+    register_codec,
+    get_codec,
+)
+from unistream.records.dataclass import DataClassRecord
+
+
+@dataclasses.dataclass(frozen=True)
+class AutoRecord(DataClassRecord):
+    codec: T.ClassVar[str] = "auto"
+
+    name: str = dataclasses.field(default="héllo")
+
+
+class NotInstalledCodec(JsonCodec):
+    name = "not_installed"
+
+    def is_available(self) -> bool:
+        return False
+
+
+def _is_available(name: str) -> bool:
+    try:
+        get_codec(name)
+        return True
+    except ImportError:
+        return False
+
+
+def test_get_codec():
+    assert get_codec("json").name == "json"
+    assert get_codec("auto").is_available() is True
+    with pytest.raises(KeyError):
+        get_codec("unknown")
+
+    register_codec(NotInstalledCodec())
+    with pytest.raises(ImportError):
+        get_codec("not_installed")
+
+    with pytest.raises(NotImplementedError):
+        BaseCodec().dumps({})
+    with pytest.raises(NotImplementedError):
+        BaseCodec().loads("{}")
+
+
+def test_codec_compatibility():
+    """
+    Data written by any available codec can be read back by any other codec.
+    """
+    obj = {"id": "1", "name": "héllo", "value": [1, 2.5, None, True]}
+    codecs = [
+        get_codec(name)
+        for name in ["json", "orjson", "msgspec"]
+        if _is_available(name)
+    ]
+    for codec1 in codecs:
+        data = codec1.dumps(obj)
+        assert isinstance(data, str)
+        for codec2 in codecs:
+            assert codec2.loads(data) == obj
+            assert codec2.loads_many([data, data]) == [obj, obj]
+            b = data.encode("utf-8")
+            assert codec2.loads_bytes(b) == obj
+            assert codec2.loads_bytes(memoryview(b)) == obj
+            assert codec2.loads_many_bytes([b, memoryview(b)]) == [obj, obj]
+
+
+def test_record_codec():
+    record = AutoRecord()
+    data = record.serialize()
+    assert AutoRecord.deserialize(data) == record
+    assert DataClassRecord.get_codec().loads(data)["name"] == "héllo"
+
+    # the default "json" codec output is unchanged
+    record = DataClassRecord(id="1", create_at="2024-01-01T00:00:00+00:00")
+    assert record.serialize() == (
+        '{"id": "1", "create_at": "2024-01-01T00:00:00+00:00"}'
+    )
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.codec", preview=False)
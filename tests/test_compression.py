@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import pytest
+
+from unistream.compression import (
+    zstandard,
+    BaseCompression,
+    get_compression,
+    detect_compression,
+    iter_blocks,
+    decompress_blocks,
+    decompress_auto,
+)
+
+dir_here = Path(__file__).absolute().parent
+
+data = b'{"id": "1", "create_at": "2024-01-01T00:00:00+00:00"}\n' * 100
+
+
+def test_compression():
+    for name in ["zlib", "bz2", "lzma"]:
+        compression = get_compression(name)
+        for level in [None, 1, 9]:
+            block = compression.compress_block(data, level=level)
+            assert len(block) < len(data)
+            assert detect_compression(block) is compression
+            assert compression.decompress(compression.compress(data)) == data
+            # concatenated blocks
+            assert decompress_auto(block + block) == data + data
+
+    assert detect_compression(data) is None
+    assert detect_compression(b"USF1") is None
+    assert decompress_auto(data) is data
+    # plain text that looks like a zlib stream header
+    assert detect_compression(b"x^ not compressed\n") is None
+    assert decompress_auto(b"x^ not compressed\n") == b"x^ not compressed\n"
+
+    with pytest.raises(KeyError):
+        get_compression("unknown")
+    if zstandard is None:
+        with pytest.raises(ImportError):
+            get_compression("zstd")
+
+    # the dict compression restores any bytes
+    compression = get_compression("dict")
+    block = compression.compress_block(data)
+    assert len(block) < len(data) // 2
+    assert detect_compression(block) is compression
+    assert decompress_auto(block + block) == data + data
+    binary = b'\x00"a long string"\x00 "a long string" \x000; \x00;' + bytes(range(256))
+    assert compression.decompress(compression.compress(binary)) == binary
+    assert compression.decompress(compression.compress(b"")) == b""
+    # tokens that appear less than level times are not replaced
+    assert b"create_at" not in compression.compress(data)[100:]
+    assert compression.compress(data, level=101).endswith(data)
+    with pytest.raises(ValueError):
+        compression.decompress(compression.compress(data)[:-1])
+    with pytest.raises(ValueError):
+        compression.decompress(b"USD1")
+
+    with pytest.raises(NotImplementedError):
+        BaseCompression().compress(data)
+    with pytest.raises(NotImplementedError):
+        BaseCompression().decompressobj()
+
+
+def test_iter_blocks():
+    compression = get_compression("zlib")
+    blocks = [
+        compression.compress_block(b"1\n2\n", n_records=2),
+        compression.compress_block(b"", n_records=0),
+        compression.compress_block(b"3\n4\n", n_records=2),
+        get_compression("dict").compress_block(b"5\n", n_records=1),
+    ]
+    content = b"".join(blocks)
+    assert decompress_blocks(content) == [b"1\n2\n", b"", b"3\n4\n", b"5\n"]
+    assert decompress_blocks(data) == [data]
+
+    path = dir_here.joinpath("compression_iter_blocks.log")
+    path.write_bytes(content)
+    for skip, expected in [
+        (0, [(0, b"1\n2\n"), (0, b""), (0, b"3\n4\n"), (0, b"5\n")]),
+        (1, [(1, b"1\n2\n"), (0, b""), (0, b"3\n4\n"), (0, b"5\n")]),
+        (2, [(0, b""), (0, b"3\n4\n"), (0, b"5\n")]),
+        (3, [(1, b"3\n4\n"), (0, b"5\n")]),
+        (5, []),
+    ]:
+        with path.open("rb") as f:
+            assert list(iter_blocks(f, skip)) == expected
+
+    path.write_bytes(content[:-1])
+    with pytest.raises(ValueError):
+        decompress_blocks(path.read_bytes())
+    with pytest.raises(ValueError):
+        decompress_blocks(blocks[0] + data)
+    with pytest.raises(ValueError):
+        decompress_blocks(blocks[0][:12] + data)
+    path.unlink()
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.compression", preview=False)
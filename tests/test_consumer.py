@@ -159,6 +159,29 @@ class TestBaseConsumer:
         tracker = consumer.checkpoint.batch["fail1"]
         assert tracker.status == StatusEnum.exhausted.value
 
+    def _test_recover_batch_from_checkpoint(self):
+        """Reloaded batch skips the succeeded records without decoding them."""
+        prepare_temp_dir(dir_data)
+        call_log.clear()
+
+        records = [DataClassRecord(id="r1"), DataClassRecord(id="r2")]
+        consumer = _make_consumer(SuccessConsumer)
+        # simulate a crash after r1 succeeded
+        consumer.checkpoint.update_for_new_batch(records, next_pointer=2)
+        consumer.checkpoint.dump_records(records)
+        consumer.checkpoint.mark_as_succeeded(records[0])
+        consumer.checkpoint.mark_as_failed_or_exhausted(records[1], ValueError())
+        consumer.checkpoint.dump()
+        assert consumer.checkpoint.get_not_succeeded_records(DataClassRecord) == [
+            records[1]
+        ]
+
+        with logger.disabled(disable=True):
+            consumer.process_batch()
+
+        assert call_log == ["process:r2"]
+        assert consumer.checkpoint.start_pointer == 2
+
     def _test_commit_stream_closed(self):
         """When next_pointer is None, commit raises StreamIsClosedError."""
         prepare_temp_dir(dir_data)
@@ -182,6 +205,7 @@ class TestBaseConsumer:
         self._test_happy_path()
         self._test_process_record_retry_then_succeed()
         self._test_process_record_exhausted()
+        self._test_recover_batch_from_checkpoint()
         self._test_commit_stream_closed()
         self._test_commit_advances_pointer()
 
@@ -2,10 +2,14 @@
 
 import shutil
 from pathlib import Path
+from unittest.mock import patch
 
+from unistream.compression import ZlibCompression
+from unistream.framing import read_data_list
 from unistream.records.dataclass import DataClassRecord
 from unistream.checkpoints.simple import SimpleCheckpoint
 from unistream.consumers.simple import SimpleConsumer
+from unistream.producers.simple import SimpleProducer
 
 from unistream.tests import prepare_temp_dir
 
@@ -92,10 +96,71 @@ class TestSimpleConsumer:
         assert records[0].id == "3"
         assert next_pointer == 3
 
+    def _test_get_records_framed(self):
+        """get_records detects the framing format written by SimpleProducer."""
+        prepare_temp_dir(dir_data)
+
+        records = [DataClassRecord(id=str(i)) for i in [1, 2, 3]]
+        producer = SimpleProducer.new(
+            buffer=None,
+            retry_config=None,
+            path_sink=path_source,
+            framed=True,
+        )
+        producer.send(records[:2])
+        producer.send(records[2:])
+
+        consumer = self._make_consumer()
+        consumer.checkpoint.start_pointer = 1  # skip the first frame
+
+        records1, next_pointer = consumer.get_records(limit=1)
+        assert records1 == records[1:2]
+        assert next_pointer == 2
+
+    def _test_get_records_compressed(self):
+        """get_records detects the compressed sink file written by SimpleProducer."""
+        for framed in [False, True]:
+            prepare_temp_dir(dir_data)
+
+            records = [DataClassRecord(id=str(i)) for i in [1, 2, 3, 4, 5]]
+            producer = SimpleProducer.new(
+                buffer=None,
+                retry_config=None,
+                path_sink=path_source,
+                framed=framed,
+                compression="zlib",
+            )
+            producer.send(records[:2])
+            producer.send(records[2:4])
+            producer.send(records[4:])
+            assert read_data_list(path_source) == [r.serialize() for r in records]
+
+            consumer = self._make_consumer()
+            consumer.checkpoint.start_pointer = 1
+
+            records1, next_pointer = consumer.get_records(limit=5)
+            assert records1 == records[1:]
+            assert next_pointer == 5
+
+            # the consumed blocks are skipped without decompressing them
+            consumer.checkpoint.start_pointer = 3
+            with patch.object(
+                ZlibCompression,
+                "decompress",
+                autospec=True,
+                side_effect=ZlibCompression.decompress,
+            ) as decompress:
+                records1, next_pointer = consumer.get_records(limit=1)
+            assert records1 == records[3:4]
+            assert next_pointer == 4
+            assert decompress.call_count == 1
+
     def test(self):
         self._test_get_records_empty()
         self._test_get_records_with_data()
         self._test_get_records_with_pointer()
+        self._test_get_records_framed()
+        self._test_get_records_compressed()
 
 
 if __name__ == "__main__":
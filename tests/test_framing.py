@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+from pathlib import Path
+
+import pytest
+
+from unistream.exc import FrameError
+from unistream.framing import (
+    MAGIC,
+    FrameWriter,
+    check_magic,
+    iter_frames,
+    skip_frames,
+    is_framed_file,
+    count_frames,
+    validate_file,
+    read_frames,
+    read_data_list,
+    read_data_bytes_list,
+    iter_frame_views,
+    recover_frame_views,
+)
+
+from unistream.tests import prepare_temp_dir
+
+dir_here = Path(__file__).absolute().parent
+dir_data = dir_here / "test_framing"
+
+prepare_temp_dir(dir_data)
+
+path = dir_data / "data.bin"
+
+
+def write_file(payloads: list[bytes], footer: bool):
+    with path.open("wb") as f:
+        writer = FrameWriter(f)
+        writer.write(payloads[0])
+        writer.write_many(payloads[1:])
+        if footer:
+            writer.write_footer()
+
+
+def test_framing():
+    payloads = [b"a", b"line 1\nline 2", b"", "héllo".encode("utf-8")]
+    for footer in [True, False]:
+        write_file(payloads, footer=footer)
+        assert is_framed_file(path) is True
+        assert read_frames(path) == payloads
+        assert count_frames(path) == 4
+        assert validate_file(path) == 4
+        assert read_data_list(path) == ["a", "line 1\nline 2", "", "héllo"]
+        views = read_data_bytes_list(path)
+        assert all(isinstance(view, memoryview) for view in views)
+        assert [bytes(view) for view in views] == payloads
+
+        with path.open("rb") as f:
+            check_magic(f)
+            assert skip_frames(f, 2) == 2
+            assert list(iter_frames(f)) == payloads[2:]
+            assert skip_frames(f, 1) == 0
+
+    # append to an existing file doesn't write the magic again
+    with path.open("ab") as f:
+        FrameWriter(f).write(b"b")
+    assert read_frames(path) == payloads + [b"b"]
+
+    # text format
+    path.write_text("a\nb\n")
+    assert is_framed_file(path) is False
+    assert read_data_list(path) == ["a", "b"]
+    assert read_data_bytes_list(path) == [b"a", b"b"]
+    # only split on "\n", not on the unicode line boundaries
+    path.write_bytes("a\u2028b\u0085c\n\n".encode("utf-8"))
+    assert read_data_list(path) == ["a\u2028b\u0085c", ""]
+    assert len(read_data_bytes_list(path)) == 2
+    path.write_bytes(b"")
+    assert read_data_list(path) == []
+    with pytest.raises(FrameError):
+        read_frames(path)
+
+
+def test_corrupted():
+    write_file([b"hello", b"world"], footer=False)
+    content = path.read_bytes()
+
+    # flip one byte of the payload
+    path.write_bytes(content[:-1] + b"X")
+    with pytest.raises(FrameError):
+        validate_file(path)
+    with pytest.raises(FrameError):
+        list(iter_frame_views(path.read_bytes()))
+    assert count_frames(path) == 2  # count doesn't read the payload
+
+    # torn write
+    path.write_bytes(content[:-2])
+    with pytest.raises(FrameError):
+        read_frames(path)
+    with pytest.raises(FrameError):
+        list(iter_frame_views(content[:-2]))
+    path.write_bytes(content[: len(MAGIC) + 2])
+    with pytest.raises(FrameError):
+        read_frames(path)
+    with pytest.raises(FrameError):
+        list(iter_frame_views(content[: len(MAGIC) + 2]))
+
+
+def test_recover_frame_views():
+    write_file([b"hello", b"world"], footer=True)
+    content = path.read_bytes()
+    payloads, size, n_footer = recover_frame_views(content)
+    assert payloads == [b"hello", b"world"]
+    assert size == len(content)
+    assert n_footer == 2
+
+    # torn footer, torn frame, corrupted frame and torn magic bytes
+    end_of_frames = len(content) - 16
+    for data, n_frames, valid_size in [
+        (content[:-1], 2, end_of_frames),
+        (content[: end_of_frames - 2], 1, end_of_frames - 13),
+        (content[: end_of_frames - 1] + b"X", 1, end_of_frames - 13),
+        (content[:2], 0, 0),
+    ]:
+        payloads, size, n_footer = recover_frame_views(data)
+        assert len(payloads) == n_frames
+        assert size == valid_size
+        assert n_footer is None
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.framing", preview=False)
@@ -52,6 +52,18 @@ class MyProducer(SimpleProducer):
         return records
 
 
+@dataclasses.dataclass
+class FlakyProducer(SimpleProducer):
+    fail: bool = dataclasses.field(default=False)
+    n_sends: int = dataclasses.field(default=0)
+
+    def send(self, records: T.List[DataClassRecord]):
+        if self.fail:
+            raise SendError("sink outage")
+        self.n_sends += 1
+        super().send(records)
+
+
 class TestSimpleProducer:
     @classmethod
     def setup_class(cls):
@@ -93,6 +105,85 @@ class TestSimpleProducer:
             ids = [int(record.id) for record in records]
             assert ids == list(range(1, 1 + i))
 
+    def _test_put_many(self):
+        """
+        A burst of records that fills the buffer many times.
+        """
+        reset_data()
+        i = 0
+        for n in [1, 7, 2, 10]:
+            producer = self.make_producer()
+            producer.retry_config.exp_backoff = [0]
+            producer.put_many([DataClassRecord(id=str(i + j)) for j in range(1, 1 + n)])
+            i += n
+            records = producer.get_all_records()
+            ids = [int(record.id) for record in records]
+            assert ids == list(range(1, 1 + i))
+
+        # without send error, all full WAL files are sent in one call
+        producer = SimpleProducer.new(
+            buffer=producer.buffer,
+            retry_config=RetryConfig(exp_backoff=[0]),
+            path_sink=producer.path_sink,
+        )
+        producer.put_many([DataClassRecord(id=str(i + 1))])
+        i += 1
+        assert len(producer.buffer.storage_queue) == 0
+        records = producer.buffer._read_log_file(producer.path_sink)
+        ids = [int(record.id) for record in records]
+        assert ids == list(range(1, 1 + i - i % 3))
+
+    def _test_poll(self):
+        """
+        The records of an idle producer are sent by poll once they are old.
+        """
+        reset_data()
+        producer = SimpleProducer.new(
+            buffer=FileBuffer.new(
+                record_class=DataClassRecord,
+                path_wal=dir_folder / "poll_buffer.log",
+                max_records=100,
+                max_age=0.1,
+            ),
+            retry_config=RetryConfig(exp_backoff=[0]),
+            path_sink=dir_folder / "poll_sink.log",
+        )
+        producer.put(DataClassRecord(id="1"))
+        producer.poll()
+        assert producer.path_sink.exists() is False
+        time.sleep(0.11)
+        producer.poll()
+        records = producer.buffer._read_log_file(producer.path_sink)
+        assert [record.id for record in records] == ["1"]
+        assert producer.buffer.n_records == 0
+
+    def _test_drain(self):
+        """
+        The backlog after a sink outage is drained without new records.
+        """
+        reset_data()
+        producer = FlakyProducer.new(
+            buffer=FileBuffer.new(
+                record_class=DataClassRecord,
+                path_wal=dir_folder / "drain_buffer.log",
+                max_records=3,
+            ),
+            retry_config=RetryConfig(exp_backoff=[0]),
+            path_sink=dir_folder / "drain_sink.log",
+        )
+        producer.fail = True
+        producer.put_many([DataClassRecord(id=str(i)) for i in range(1, 18)])
+        assert len(producer.buffer.storage_queue) == 5
+        producer.drain()
+        assert len(producer.buffer.storage_queue) == 5
+
+        producer.fail = False
+        producer.drain(max_records=7)
+        assert producer.n_sends == 3  # 6 + 6 + 3 records
+        assert len(producer.buffer.storage_queue) == 0
+        records = producer.buffer._read_log_file(producer.path_sink)
+        assert [record.id for record in records] == [str(i) for i in range(1, 16)]
+
     def _test_error(self):
         """
         It should raise the send error
@@ -113,6 +204,9 @@ class TestSimpleProducer:
             # disable=False,  # show log
         ):
             self._test_happy_path()
+            self._test_put_many()
+            self._test_poll()
+            self._test_drain()
             self._test_error()
 
 
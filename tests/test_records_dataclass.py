@@ -1,9 +1,61 @@
 # -*- coding: utf-8 -*-
 
+import typing as T
+import json
+import dataclasses
 from datetime import datetime
+
+import pytest
+from func_args.api import REQ, ParamError
+from unistream.utils import to_epoch_us, epoch_us_to_iso
+from unistream.record import BaseRecord
 from unistream.records.dataclass import DataClassRecord
 
 
+@dataclasses.dataclass(frozen=True)
+class Point(DataClassRecord):
+    x: int = dataclasses.field(default=REQ)
+    y: int = dataclasses.field(default=0)
+    tags: list = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass(frozen=True)
+class PositiveRecord(DataClassRecord):
+    value: int = dataclasses.field(default=1)
+
+    def __post_init__(self):
+        if self.value <= 0:
+            raise ValueError("value must be positive")
+
+
+@dataclasses.dataclass(frozen=True)
+class Nested(DataClassRecord):
+    point: dict = dataclasses.field(default_factory=dict)
+    child: Point | None = dataclasses.field(default=None)
+
+
+@dataclasses.dataclass(frozen=True)
+class User(DataClassRecord):
+    schema_version: T.ClassVar[int] = 2
+
+    full_name: str = dataclasses.field(default=REQ)
+    age: int = dataclasses.field(default=0)
+
+
+@dataclasses.dataclass(frozen=True)
+class Event(DataClassRecord):
+    intern_fields: T.ClassVar[tuple[str, ...]] = ("tenant", "host")
+
+    tenant: str = dataclasses.field(default="")
+    host: str | None = dataclasses.field(default=None)
+
+
+@User.register_upgrade(from_version=1)
+def _(data: dict) -> dict:
+    data["full_name"] = data.pop("first_name") + " " + data.pop("last_name")
+    return data
+
+
 class TestDataClassRecord:
     def test(self):
         r = DataClassRecord()
@@ -12,6 +64,204 @@ class TestDataClassRecord:
         r1 = DataClassRecord.deserialize(r.serialize())
         assert r == r1
 
+        # the time properties are computed once and cached
+        assert r.create_at_datetime is r.create_at_datetime
+        assert r.create_at_epoch_us == to_epoch_us(r.create_at_datetime)
+        assert r1.create_at_epoch_us == r.create_at_epoch_us
+        assert epoch_us_to_iso(r.create_at_epoch_us) == r.create_at
+
+    def test_compiled_codec(self):
+        record = Point(id="1", x=1, y=2, tags=["a"])
+        # same output as the generic dataclasses.asdict path
+        assert record.serialize() == json.dumps(dataclasses.asdict(record))
+        assert Point.deserialize(record.serialize()) == record
+
+        # missing fields get their default values
+        record = Point.deserialize('{"x": 1}')
+        assert (record.y, record.tags) == (0, [])
+        assert isinstance(record.id, str)
+        assert isinstance(record.create_at, str)
+
+        # missing required field and unknown field fail like ``cls(**data)``
+        with pytest.raises(ParamError):
+            Point.deserialize('{"y": 1}')
+        with pytest.raises(TypeError):
+            Point.deserialize('{"x": 1, "z": 1}')
+        # as many keys as fields, but with an unknown one
+        data = '{"id": "1", "create_at": "2024-01-01T00:00:00+00:00", "x": 1, "zzz": 1, "tags": []}'
+        with pytest.raises(TypeError):
+            Point(**json.loads(data))
+        with pytest.raises(TypeError):
+            Point.deserialize(data)
+
+        # user defined __post_init__ still runs
+        with pytest.raises(ValueError):
+            PositiveRecord.deserialize('{"value": 0}')
+
+        # the compiled functions are per class
+        assert Point._to_dict is not PositiveRecord._to_dict
+
+        # nested dataclass values fall back to dataclasses.asdict
+        record = Nested(child=Point(x=1))
+        assert json.loads(record.serialize())["child"]["x"] == 1
+
+    def test_schema_version(self):
+        record = User(id="1", full_name="John Doe", age=30)
+        data = record.serialize()
+        assert json.loads(data)["_v"] == 2
+        record1 = User.deserialize(data)
+        assert record1 == record
+        assert record1.serialize() == data
+
+        # version 0 (untagged) and 1 are upgraded, version 2 is decoded as is
+        data_list = [
+            '{"id": "1", "first_name": "John", "last_name": "Doe"}',
+            '{"id": "2", "first_name": "Jane", "last_name": "Doe", "_v": 1}',
+            data,
+        ]
+        records = User.deserialize_many(data_list)
+        assert [r.full_name for r in records] == ["John Doe", "Jane Doe", "John Doe"]
+        assert User.deserialize(data_list[0]).full_name == "John Doe"
+        # the upgraded record is re-encoded in the current version
+        assert json.loads(records[1].serialize())["_v"] == 2
+        assert User._get_upgrade(0) is User._get_upgrade(0)
+
+        # newer version than the class
+        with pytest.raises(ValueError):
+            User.deserialize('{"full_name": "John Doe", "_v": 3}')
+
+        # records without schema_version are not tagged
+        assert "_v" not in Point(x=1).serialize()
+
+    def test_serialized_cache(self):
+        record = Point(x=1)
+        data = record.serialize()
+        assert record.serialize() is data
+
+        # the decoded record reuses the input string
+        line = data + "\n"
+        record1 = Point.deserialize(line)
+        assert record1 == record
+        assert record1.serialize() == data
+        assert Point.deserialize_many([line])[0].serialize() == data
+
+        # the input is not reused if some fields are missing
+        record = Point.deserialize('{"x": 1}')
+        assert record.serialize() != '{"x": 1}'
+        assert record.serialize() == Point.deserialize(record.serialize()).serialize()
+
+        # or if the user defined __post_init__ may change the values
+        record = PositiveRecord.deserialize(PositiveRecord().serialize() + " ")
+        assert "_serialized" not in record.__dict__
+
+        # multi-line input is re-encoded to a single line
+        pretty = json.dumps(json.loads(data), indent=2)
+        pretty_bytes = pretty.encode("utf-8")
+        for record1 in [
+            Point.deserialize(pretty),
+            Point.deserialize_many([pretty])[0],
+            Point.deserialize_bytes(pretty_bytes),
+            Point.deserialize_many_bytes([pretty_bytes])[0],
+            Point.deserialize_many_bytes([pretty_bytes], trusted=True)[0],
+        ]:
+            assert record1 == Point.deserialize(data)
+            assert record1.serialize() == data
+
+    def test_serialize_many_and_deserialize_many(self):
+        records = [DataClassRecord(id=str(i)) for i in range(3)]
+        data_list = DataClassRecord.serialize_many(records)
+        assert data_list == [record.serialize() for record in records]
+        assert DataClassRecord.deserialize_many(data_list) == records
+        # lines read by ``readlines()`` still have the trailing newline
+        lines = [data + "\n" for data in data_list]
+        assert DataClassRecord.deserialize_many(lines) == records
+        assert DataClassRecord.deserialize_many([]) == []
+        # a malformed line that decodes to two items doesn't shift the raw cache
+        malformed = data_list[0] + ", " + data_list[1]
+        with pytest.raises(ValueError):
+            DataClassRecord.deserialize_many([malformed, data_list[2]])
+        with pytest.raises(ValueError):
+            DataClassRecord.deserialize_many_bytes([malformed.encode("utf-8")])
+
+        # the default implementation falls back to the per-record methods
+        assert BaseRecord.serialize_many(records) == data_list
+
+    def test_intern_fields(self):
+        records = [Event(id=str(i), tenant="tenant-" + "1") for i in range(3)]
+        data_list = Event.serialize_many(records)
+        bytes_list = [data.encode("utf-8") for data in data_list]
+        for records1 in [
+            Event.deserialize_many(data_list),
+            Event.deserialize_many_bytes(bytes_list),
+            Event.deserialize_many_bytes(bytes_list, trusted=True),
+            [Event.deserialize(data) for data in data_list],
+        ]:
+            assert records1 == records
+            assert records1[0].tenant is records1[1].tenant
+            assert records1[0].host is None
+
+        @dataclasses.dataclass(frozen=True)
+        class BadEvent(DataClassRecord):
+            intern_fields: T.ClassVar[tuple[str, ...]] = ("unknown",)
+
+        with pytest.raises(ValueError):
+            BadEvent.deserialize(DataClassRecord().serialize())
+
+    def test_deserialize_bytes(self):
+        records = [Point(id=str(i), x=i) for i in range(3)]
+        data_list = Point.serialize_many(records)
+        bytes_list = [data.encode("utf-8") for data in data_list]
+
+        record = Point.deserialize_bytes(memoryview(bytes_list[0] + b"\n"))
+        assert record == records[0]
+        # the raw bytes are cached and decoded on demand
+        assert record.__dict__["_serialized"] == bytes_list[0]
+        assert record.serialize() == data_list[0]
+        assert record.__dict__["_serialized"] == data_list[0]
+
+        assert Point.deserialize_many_bytes(bytes_list) == records
+        mixed = [bytes_list[0] + b"\n", memoryview(bytes_list[1]), bytes_list[2]]
+        records1 = Point.deserialize_many_bytes(mixed)
+        assert records1 == records
+        assert [r.serialize() for r in records1] == data_list
+
+        # schema versioned record
+        user = User(full_name="John Doe")
+        data_user = user.serialize().encode("utf-8")
+        assert User.deserialize_bytes(data_user) == user
+        assert User.deserialize_many_bytes([data_user]) == [user]
+
+        # the trusted mode skips the validation and the user __post_init__
+        data = PositiveRecord(id="1").serialize().replace('"value": 1', '"value": 0')
+        data = data.encode("utf-8")
+        with pytest.raises(ValueError):
+            PositiveRecord.deserialize_many_bytes([data])
+        record = PositiveRecord.deserialize_many_bytes([data], trusted=True)[0]
+        assert record.value == 0
+        assert record.serialize() == data.decode("utf-8")
+        # records without all fields fall back to the validated path
+        with pytest.raises(ParamError):
+            Point.deserialize_many_bytes([b'{"y": 1}'], trusted=True)
+        # or with a field of another version of the class
+        data = PositiveRecord(id="1").serialize().replace('"value"', '"old_value"')
+        with pytest.raises(TypeError):
+            PositiveRecord.deserialize_many_bytes([data.encode("utf-8")], trusted=True)
+        data = Event(id="1").serialize().replace('"host"', '"old_host"')
+        with pytest.raises(TypeError):
+            Event.deserialize_many_bytes([data.encode("utf-8")], trusted=True)
+        records1 = Point.deserialize_many_bytes(bytes_list, trusted=True)
+        assert records1 == records
+        assert User.deserialize_many_bytes([data_user], trusted=True) == [user]
+        records1 = User.deserialize_many_bytes(
+            [b'{"first_name": "John", "last_name": "Doe"}'], trusted=True
+        )
+        assert records1[0].full_name == "John Doe"
+
+        # the default implementation decodes the bytes to str
+        assert BaseRecord.deserialize_many_bytes.__func__(
+            Point, [memoryview(bytes_list[0])]
+        ) == records[:1]
+
 
 if __name__ == "__main__":
     from unistream.tests import run_cov_test
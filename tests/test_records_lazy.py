@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import dataclasses
+
+from unistream.records.dataclass import DataClassRecord
+from unistream.records.lazy import LazyRecord, materialize
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(DataClassRecord):
+    value: int = dataclasses.field(default=0)
+
+
+class TestLazyRecord:
+    def test(self):
+        record = MyRecord(id='quote"id', value=1)
+        data = record.serialize()
+        assert MyRecord.deserialize_header(data) == (record.id, record.create_at)
+
+        lazy_record = LazyRecord.from_data(MyRecord, data)
+        assert lazy_record.id == record.id
+        assert lazy_record.create_at == record.create_at
+        assert lazy_record.create_at_datetime == record.create_at_datetime
+        assert lazy_record.serialize() == data
+        assert "MyRecord" in repr(lazy_record)
+        assert lazy_record.is_materialized is False
+
+        assert lazy_record.value == 1
+        assert lazy_record.is_materialized is True
+        assert materialize(lazy_record) == record
+        assert materialize(record) is record
+
+    def test_fallback(self):
+        # the header is not at the beginning, decode the full record
+        data = '{"value": 1, "create_at": "2024-01-01T00:00:00+00:00", "id": "1"}'
+        lazy_record = LazyRecord.from_data_list(MyRecord, [data])[0]
+        assert lazy_record.id == "1"
+        assert lazy_record.create_at == "2024-01-01T00:00:00+00:00"
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.records.lazy", preview=False)
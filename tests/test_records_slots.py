@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import json
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+from unistream.records.slots import SlotsRecord
+from unistream.records.lazy import LazyRecord
+from unistream.buffers.file_buffer import FileBuffer
+
+dir_here = Path(__file__).absolute().parent
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MyRecord(SlotsRecord):
+    value: int = dataclasses.field(default=0)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class PositiveRecord(SlotsRecord):
+    value: int = dataclasses.field(default=1)
+
+    def __post_init__(self):
+        if self.value <= 0:
+            raise ValueError("value must be positive")
+
+
+class TestSlotsRecord:
+    def test(self):
+        record = MyRecord(id="1", value=3)
+        assert hasattr(record, "__dict__") is False
+        assert record.create_at_datetime is record.create_at_datetime
+        assert isinstance(record.create_at_epoch_us, int)
+
+        data = record.serialize()
+        assert data == f'["1", "{record.create_at}", 3]'
+        assert record.serialize() is data
+
+        record1 = MyRecord.deserialize(data + "\n")
+        assert record1 == record
+        assert record1.serialize() == data
+        assert MyRecord.deserialize_many([data, data]) == [record, record]
+
+        b = data.encode("utf-8")
+        record1 = MyRecord.deserialize_bytes(memoryview(b))
+        assert record1 == record
+        assert record1.serialize() == data
+        records = MyRecord.deserialize_many_bytes([b, memoryview(b)])
+        assert records == [record, record]
+        assert records[1].serialize() == data
+        # a malformed line that decodes to two items doesn't shift the raw cache
+        with pytest.raises(ValueError):
+            MyRecord.deserialize_many([data + ", " + data])
+        with pytest.raises(ValueError):
+            MyRecord.deserialize_many_bytes([b + b", " + b], trusted=True)
+
+        # missing trailing values get their default values
+        record = MyRecord.deserialize('["1", "2024-01-01T00:00:00+00:00"]')
+        assert record.value == 0
+
+        # user defined __post_init__ still runs
+        with pytest.raises(ValueError):
+            PositiveRecord.deserialize('["1", "2024-01-01T00:00:00+00:00", 0]')
+        # unless in the trusted mode
+        raw = b'["1", "2024-01-01T00:00:00+00:00", 0]'
+        record1 = PositiveRecord.deserialize_many_bytes([raw], trusted=True)[0]
+        assert record1.value == 0
+        assert record1.serialize() == raw.decode("utf-8")
+
+        lazy_record = LazyRecord.from_data(MyRecord, data)
+        assert lazy_record.id == "1"
+        assert lazy_record.value == 3
+
+    def test_file_buffer(self):
+        path_wal = dir_here.joinpath("slots_record_file_buffer.log")
+        buffer = FileBuffer.new(
+            record_class=MyRecord,
+            path_wal=path_wal,
+            max_records=2,
+        )
+        buffer.clear_wal()
+        for i in [1, 2, 3]:
+            buffer.put(MyRecord(id=str(i), value=i))
+
+        buffer = FileBuffer.new(
+            record_class=MyRecord,
+            path_wal=path_wal,
+            max_records=2,
+        )
+        records = buffer.emit()
+        assert [record.value for record in records] == [1, 2]
+        assert isinstance(records[0], MyRecord)
+        buffer.clear_wal()
+
+        # a record decoded from multi-line input is written as one line
+        pretty = json.dumps(json.loads(MyRecord(id="4", value=4).serialize()), indent=2)
+        buffer.put(MyRecord.deserialize(pretty))
+        buffer = FileBuffer.new(
+            record_class=MyRecord,
+            path_wal=path_wal,
+            max_records=2,
+        )
+        assert [record.value for record in buffer.memory_queue] == [4]
+        buffer.clear_wal()
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.records.slots", preview=False)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import time
+import dataclasses
+from datetime import datetime
+from unittest.mock import patch
+
+from unistream.records.dataclass import UlidRecord
+from unistream.ulid import (
+    encode_ulid,
+    decode_ulid_epoch_ms,
+    UlidGenerator,
+    new_ulid,
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class MyRecord(UlidRecord):
+    value: int = dataclasses.field(default=0)
+
+
+def test_encode_ulid():
+    assert encode_ulid(0, 0) == "0" * 26
+    assert encode_ulid(2**48 - 1, 2**80 - 1) == "7" + "Z" * 25
+    assert encode_ulid(1, 1) == "0000000001" + "0" * 15 + "1"
+    assert decode_ulid_epoch_ms(encode_ulid(1234567890123, 0)) == 1234567890123
+
+
+def test_ulid_generator():
+    generator = UlidGenerator()
+    results = [generator.new() for _ in range(1000)]
+    ulids = [ulid for ulid, _ in results]
+    assert len(set(ulids)) == 1000
+    assert ulids == sorted(ulids)
+    for ulid, epoch_us in results:
+        assert len(ulid) == 26
+        assert decode_ulid_epoch_ms(ulid) >= epoch_us // 1000
+
+
+def test_ulid_generator_clock_backward():
+    generator = UlidGenerator()
+    clock = [1_000_000_500_000_000, 1_000_000_000_000_000, 1_000_000_500_100_000]
+    with patch("unistream.ulid.time.time_ns", side_effect=clock):
+        results = [generator.new() for _ in clock]
+    ulids = [ulid for ulid, _ in results]
+    assert ulids == sorted(ulids)
+    # the timestamp matches the ULID and never goes backward
+    assert [epoch_us for _, epoch_us in results] == [
+        1_000_000_500_000,
+        1_000_000_500_000,
+        1_000_000_500_100,
+    ]
+    for ulid, epoch_us in results:
+        assert decode_ulid_epoch_ms(ulid) == epoch_us // 1000
+
+
+def test_ulid_record():
+    ulid, create_at = new_ulid()
+    epoch_ms = int(datetime.fromisoformat(create_at).timestamp() * 1000)
+    assert abs(decode_ulid_epoch_ms(ulid) - epoch_ms) <= 1
+
+    records = list()
+    for _ in range(10):
+        time.sleep(0.001)
+        records.append(MyRecord())
+    assert [r.id for r in records] == sorted(r.id for r in records)
+    for record in records:
+        # id and create_at come from the same clock read
+        assert decode_ulid_epoch_ms(record.id) == record.create_at_epoch_us // 1000
+
+    # an explicit create_at doesn't leave anything for the next record
+    create_at = "2024-01-01T00:00:00+00:00"
+    record = MyRecord(create_at=create_at)
+    assert record.create_at == create_at
+    assert len(record.id) == 26
+    time.sleep(0.01)
+    record = MyRecord(id="1")
+    assert record.id == "1"
+    assert record.create_at > records[-1].create_at
+
+    # the decoder fills the missing fields the same way
+    record = MyRecord.deserialize('{"value": 1}')
+    assert record.value == 1
+    assert decode_ulid_epoch_ms(record.id) == record.create_at_epoch_us // 1000
+    record = MyRecord.deserialize('{"id": "1"}')
+    assert record.id == "1"
+    assert record.create_at > records[-1].create_at
+    # a complete record is decoded as it is, and reuses the input string
+    data = records[0].serialize()
+    record = MyRecord.deserialize(data)
+    assert record == records[0]
+    assert record.serialize() is data
+
+
+if __name__ == "__main__":
+    from unistream.tests import run_cov_test
+
+    run_cov_test(__file__, "unistream.ulid", preview=False)
@@ -17,6 +17,8 @@ import abc
 from collections.abc import Iterable
 from datetime import datetime
 
+from .utils import to_epoch_us
+
 
 class AbcRecord(abc.ABC):
     """
@@ -42,11 +44,25 @@ class AbcRecord(abc.ABC):
 
     Additionally, the class should provide the following methods:
 
-    - :meth:`AbcRecord.create_at_dt`: return the timezone aware datetime object of the creation time.
+    - :meth:`AbcRecord.create_at_datetime`: return the timezone aware datetime object of the creation time.
+    - :meth:`AbcRecord.create_at_epoch_us`: return the creation time as integer microseconds since epoch.
     - :meth:`AbcRecord.serialize`: serialize the record to a string.
     - :meth:`AbcRecord.deserialize`: deserialize the string to a record.
+
+    Optionally, it can override the batch codec methods, which by default fall back
+    to the per-record methods above:
+
+    - :meth:`AbcRecord.serialize_many`: serialize many records to a list of strings.
+    - :meth:`AbcRecord.deserialize_many`: deserialize many strings to a list of records.
+    - :meth:`AbcRecord.deserialize_header`: deserialize only the ``id`` and ``create_at``.
+    - :meth:`AbcRecord.deserialize_bytes`: deserialize UTF-8 encoded bytes to a record.
+    - :meth:`AbcRecord.deserialize_many_bytes`: deserialize many UTF-8 encoded bytes to records.
     """
 
+    # allow subclasses to be slots only classes, see
+    # :class:`~unistream.records.slots.SlotsRecord`
+    __slots__ = ()
+
     id: str
     create_at: str
 
@@ -57,6 +73,14 @@ class AbcRecord(abc.ABC):
         """
         return datetime.fromisoformat(self.create_at)
 
+    @property
+    def create_at_epoch_us(self) -> int:
+        """
+        Return the creation time of the record as integer microseconds since epoch.
+        Use it to compare the creation time of records cheaply.
+        """
+        return to_epoch_us(self.create_at_datetime)
+
     @abc.abstractmethod
     def serialize(self) -> str:
         """
@@ -72,6 +96,71 @@ class AbcRecord(abc.ABC):
         """
         raise NotImplementedError
 
+    @classmethod
+    def serialize_many(cls, records: Iterable["AbcRecord"]) -> list[str]:
+        """
+        Serialize many records to a list of strings, one string per record.
+
+        The default implementation calls :meth:`AbcRecord.serialize` for each record.
+        Subclasses can override it to encode the whole batch in one pass.
+        """
+        return [record.serialize() for record in records]
+
+    @classmethod
+    def deserialize_many(cls, data_list: Iterable[str]) -> list["AbcRecord"]:
+        """
+        Deserialize many strings to a list of records, one record per string.
+
+        The default implementation calls :meth:`AbcRecord.deserialize` for each string.
+        Subclasses can override it to decode the whole batch in one pass.
+        """
+        return [cls.deserialize(data) for data in data_list]
+
+    @classmethod
+    def deserialize_bytes(cls, data: bytes | memoryview) -> "AbcRecord":
+        """
+        Deserialize the UTF-8 encoded bytes, or a memoryview of them, to a record.
+        Readers use it to decode slices of a binary file without creating
+        a ``str`` per record.
+
+        The default implementation decodes the bytes to a string and calls
+        :meth:`AbcRecord.deserialize`. Subclasses can override it to parse
+        the bytes directly.
+        """
+        return cls.deserialize(str(data, "utf-8"))
+
+    @classmethod
+    def deserialize_many_bytes(
+        cls,
+        data_list: Iterable[bytes | memoryview],
+        trusted: bool = False,
+    ) -> list["AbcRecord"]:
+        """
+        Deserialize many UTF-8 encoded bytes to a list of records.
+
+        The default implementation calls :meth:`AbcRecord.deserialize_bytes`
+        for each item.
+
+        :param trusted: if True, the data was serialized by this library from
+            valid records of the same class, for example a WAL file, so the
+            implementation may skip the validation. The readers of this library
+            set it, user code should leave it False. The default implementation
+            ignores it.
+        """
+        return [cls.deserialize_bytes(data) for data in data_list]
+
+    @classmethod
+    def deserialize_header(cls, data: str) -> tuple[str, str]:
+        """
+        Deserialize only the ``id`` and ``create_at`` of the record from the string.
+        It is used by :class:`~unistream.records.lazy.LazyRecord`.
+
+        The default implementation deserializes the full record. Subclasses can
+        override it to skip decoding the rest of the record.
+        """
+        record = cls.deserialize(data)
+        return record.id, record.create_at
+
 
 T_RECORD = T.TypeVar("T_RECORD", bound=AbcRecord)
 
@@ -342,6 +431,10 @@ class AbcCheckPoint(abc.ABC):
     ) -> Iterable["AbcRecord"]:
         """
         Load the batch records data from the persistence layer. Not from the stream system.
+
+        Implementations may support the ``lazy=True`` keyword argument to return
+        :class:`~unistream.records.lazy.LazyRecord` objects, which only decode
+        the header of the records up front. Otherwise, ignore it.
         """
         raise NotImplementedError
 
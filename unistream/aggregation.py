@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements record aggregation, packing many small records into one record on
+the wire.
+
+Stream systems usually charge and throttle by the number of records, for
+example a Kinesis PUT payload unit is 25 KB no matter how small the record is.
+When the records are small, :class:`~unistream.producer.BaseProducer` can
+pack the records of an emitted batch into a few :class:`AggregatedRecord`
+before calling :meth:`~unistream.abstraction.AbcProducer.send`, see
+:class:`AggregationConfig`. :class:`~unistream.consumer.BaseConsumer` with
+``aggregated=True`` unpacks them right after
+:meth:`~unistream.consumer.BaseConsumer.get_records`, so the checkpoint,
+:meth:`~unistream.consumer.BaseConsumer.process_record` and the DLQ only see
+the inner records. The stream pointer still counts the wire records.
+
+The inner records are stored in the ``payload`` field as a concatenation of
+length-prefixed serialized records, ``"{length}:{data}"``, where the length
+is the number of characters of ``data``. The inner records are not decoded
+on the producer side and are decoded with a single
+:meth:`~unistream.abstraction.AbcRecord.deserialize_many` call on the consumer
+side.
+"""
+
+import typing as T
+import dataclasses
+from collections.abc import Sequence
+
+from func_args.api import REQ, BaseModel
+
+from .utils import get_n_bytes
+from .abstraction import AbcRecord, T_RECORD
+from .batch import RecordBatch
+from .claim_check import deserialize_many
+from .records.dataclass import DataClassRecord
+
+
+def pack(data_list: list[str]) -> str:
+    """
+    Concatenate the serialized records to the length-prefixed payload.
+    """
+    return "".join([f"{len(data)}:{data}" for data in data_list])
+
+
+def unpack(payload: str) -> list[str]:
+    """
+    Split the length-prefixed payload to the serialized records.
+
+    :raises ValueError: the payload is malformed.
+    """
+    data_list = list()
+    start = 0
+    end = len(payload)
+    while start < end:
+        colon = payload.index(":", start)
+        stop = colon + 1 + int(payload[start:colon])
+        if stop > end:
+            raise ValueError(f"the payload is truncated at position {start}!")
+        data_list.append(payload[colon + 1 : stop])
+        start = stop
+    return data_list
+
+
+@dataclasses.dataclass(frozen=True)
+class AggregatedRecord(DataClassRecord):
+    """
+    A wire record that carries many serialized inner records.
+
+    The ``id`` is a new id of the wire record, the ``create_at`` is the
+    ``create_at`` of the first inner record.
+
+    :param n_records: the number of inner records, checked when unpacking.
+    :param payload: the length-prefixed serialized inner records, see :func:`pack`.
+    """
+
+    n_records: int = dataclasses.field(default=REQ)
+    payload: str = dataclasses.field(default=REQ)
+
+    @classmethod
+    def from_data_list(
+        cls,
+        data_list: list[str],
+        create_at: str,
+    ) -> "AggregatedRecord":
+        """
+        Create an aggregated record from the serialized inner records.
+        """
+        return cls(
+            create_at=create_at,
+            n_records=len(data_list),
+            payload=pack(data_list),
+        )
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[AbcRecord],
+    ) -> "AggregatedRecord":
+        """
+        Create an aggregated record from the inner records.
+        """
+        return cls.from_data_list(
+            data_list=type(records[0]).serialize_many(records),
+            create_at=records[0].create_at,
+        )
+
+    def get_data_list(self) -> list[str]:
+        """
+        Get the serialized inner records.
+
+        :raises ValueError: the payload is malformed, or the number of inner
+            records doesn't match ``n_records``.
+        """
+        data_list = unpack(self.payload)
+        if len(data_list) != self.n_records:
+            raise ValueError(
+                f"expect {self.n_records} inner records, got {len(data_list)}!"
+            )
+        return data_list
+
+    def to_records(
+        self,
+        record_class: type[T_RECORD],
+    ) -> list[T_RECORD]:
+        """
+        Decode the inner records.
+        """
+        return record_class.deserialize_many(self.get_data_list())
+
+
+def aggregate(
+    records: Sequence[AbcRecord],
+    max_records: int,
+    max_bytes: int,
+) -> list[AggregatedRecord]:
+    """
+    Pack the records into as few aggregated records as possible, in order.
+
+    :param records: the records to pack, a list or a
+        :class:`~unistream.batch.RecordBatch`.
+    :param max_records: the max number of inner records per aggregated record.
+    :param max_bytes: the max size of the payload in bytes, the UTF-8 encoded
+        size of the length-prefixed inner records. The serialized aggregated
+        record is a bit larger, because the payload is escaped as a JSON
+        string. A record larger than ``max_bytes`` is packed on its own.
+    """
+    if len(records) == 0:
+        return []
+    if isinstance(records, RecordBatch):
+        data_list = records.serialize_many()
+    else:
+        data_list = type(records[0]).serialize_many(records)
+    aggregated_records = list()
+    start = 0
+    n_bytes = 0
+    for ith, data in enumerate(data_list):
+        size = get_n_bytes(data) + len(str(len(data))) + 1
+        if ith > start and (ith - start >= max_records or n_bytes + size > max_bytes):
+            aggregated_records.append(
+                AggregatedRecord.from_data_list(
+                    data_list[start:ith],
+                    create_at=records[start].create_at,
+                )
+            )
+            start = ith
+            n_bytes = 0
+        n_bytes += size
+    aggregated_records.append(
+        AggregatedRecord.from_data_list(
+            data_list[start:],
+            create_at=records[start].create_at,
+        )
+    )
+    return aggregated_records
+
+
+def deaggregate(
+    records: T.Iterable[AggregatedRecord],
+    record_class: type[T_RECORD],
+) -> list[T_RECORD]:
+    """
+    Unpack the aggregated records and decode all the inner records, in order.
+    """
+    data_list = list()
+    for record in records:
+        data_list.extend(record.get_data_list())
+    return deserialize_many(record_class, data_list)
+
+
+@dataclasses.dataclass
+class AggregationConfig(BaseModel):
+    """
+    The record aggregation configuration for
+    :class:`~unistream.producer.BaseProducer`.
+
+    :param max_records: the max number of inner records per aggregated record.
+    :param max_bytes: the max payload size in bytes of an aggregated record,
+        see :func:`aggregate`. Leave some headroom below the record size
+        limit of the stream system.
+    """
+
+    max_records: int = dataclasses.field(default=100)
+    max_bytes: int = dataclasses.field(default=900_000)
+
+    def aggregate(
+        self,
+        records: Sequence[AbcRecord],
+    ) -> list[AggregatedRecord]:
+        """
+        Pack the records, see :func:`aggregate`.
+        """
+        return aggregate(
+            records,
+            max_records=self.max_records,
+            max_bytes=self.max_bytes,
+        )
@@ -7,6 +7,8 @@ Usage example:
 """
 
 from .exc import BufferIsEmptyError
+from .exc import BufferIsFullError
+from .exc import FrameError
 from .exc import SendError
 from .exc import ProcessError
 from .exc import StreamIsClosedError
@@ -16,7 +18,21 @@ from .abstraction import T_BUFFER
 from .abstraction import T_PRODUCER
 from .abstraction import T_CHECK_POINT
 from .abstraction import T_CONSUMER
+from .codec import BaseCodec
+from .codec import register_codec
+from .codec import get_codec
+from .compression import BaseCompression
+from .compression import register_compression
+from .compression import get_compression
+from .ulid import new_ulid
 from .record import BaseRecord
+from .batch import RecordBatch
+from .aggregation import AggregatedRecord
+from .aggregation import AggregationConfig
+from .claim_check import ClaimCheck
+from .claim_check import ClaimCheckConfig
+from .chunking import ChunkRecord
+from .chunking import ChunkingConfig
 from .buffer import BaseBuffer
 from .producer import RetryConfig
 from .producer import BaseProducer
@@ -27,8 +43,13 @@ from .checkpoint import T_TRACKER
 from .checkpoint import BaseCheckPoint
 from .consumer import BaseConsumer
 from .records.dataclass import DataClassRecord
+from .records.dataclass import UlidRecord
 from .records.dataclass import T_DATA_CLASS_RECORD
+from .records.lazy import LazyRecord
+from .records.slots import SlotsRecord
+from .records.slots import T_SLOTS_RECORD
 from .buffers.file_buffer import FileBuffer
+from .buffers.memory_buffer import MemoryBuffer
 from .producers.simple import SimpleProducer
 from .checkpoints.simple import SimpleCheckpoint
 from .consumers.simple import SimpleConsumer
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements :class:`RecordBatch`, a columnar container of a batch of records.
+
+A batch stores one column per field of the record class, so per-field work in
+:meth:`~unistream.abstraction.AbcProducer.send`, such as building partition
+keys or checking sizes, can be done on a whole column at once instead of
+looping over record objects. Numeric columns can be converted to
+:class:`array.array` or, if installed, to a `NumPy <https://numpy.org/>`_ array.
+"""
+
+import typing as T
+import array
+import operator
+import dataclasses
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .utils import get_n_bytes
+from .framing import read_data_bytes_list
+from .abstraction import AbcRecord, T_RECORD
+from .records.lazy import LazyRecord
+from .claim_check import deserialize_many, deserialize_many_bytes
+
+
+def get_field_names(record_class: type[AbcRecord]) -> list[str]:
+    """
+    Get the names of the columns of a record class. For dataclass based records,
+    it is all the dataclass fields, otherwise only ``id`` and ``create_at``.
+    """
+    if dataclasses.is_dataclass(record_class):
+        return [field.name for field in dataclasses.fields(record_class)]
+    else:
+        return ["id", "create_at"]
+
+
+class RecordBatch(Sequence[T_RECORD]):
+    """
+    A batch of records of the same record class, stored column by column.
+
+    It is a read-only sequence of records, so it can be passed to any code
+    that expects ``list[AbcRecord]``. The record objects and the serialized
+    strings are kept along with the columns, so iterating the batch or
+    encoding it again doesn't cost anything.
+
+    Usage example::
+
+        batch = RecordBatch.from_file(MyRecord, path)
+        batch.column("id")  # list of id
+        batch.to_array("value")  # array.array("q", [...])
+        batch.get_sizes()  # array.array("q", [...]), UTF-8 size of each record
+        batch.serialize_many()  # list of serialized records, no re-encoding
+
+    .. note::
+
+        Don't initialize this class directly, use one of the factory methods
+        :meth:`RecordBatch.from_records`, :meth:`RecordBatch.from_data_list`
+        or :meth:`RecordBatch.from_file`.
+
+    :param record_class: the record class.
+    :param columns: the mapping from the field name to the list of values.
+    :param records: the record objects, in the same order as the columns.
+    :param data_list: the serialized records, in the same order as the columns.
+    """
+
+    def __init__(
+        self,
+        record_class: type[T_RECORD],
+        columns: dict[str, list[T.Any]],
+        records: list[T_RECORD],
+        data_list: list[str] | None = None,
+    ):
+        self.record_class = record_class
+        self.columns = columns
+        self.records = records
+        self._data_list = data_list
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[T_RECORD],
+        record_class: type[T_RECORD] | None = None,
+    ) -> "RecordBatch[T_RECORD]":
+        """
+        Create a batch from record objects.
+
+        A :class:`~unistream.records.lazy.LazyRecord`, for example a
+        :class:`~unistream.claim_check.ClaimCheck` reference, is not decoded,
+        only its ``id`` and ``create_at`` are in the columns, its other
+        values are None.
+
+        :param record_class: the record class, default to the class of the
+            first record. It is required if ``records`` is empty.
+        """
+        records = list(records)
+        if record_class is None:
+            if not records:
+                raise ValueError("record_class is required for an empty batch!")
+            record_class = type(records[0])
+        names = get_field_names(record_class)
+        if records:
+            # there are always at least two fields, id and create_at
+            getter = operator.attrgetter(*names)
+            if any(isinstance(record, LazyRecord) for record in records):
+                record_getter = getter
+                header = ("id", "create_at")
+
+                def getter(record):
+                    if isinstance(record, LazyRecord):
+                        return tuple(
+                            getattr(record, name) if name in header else None
+                            for name in names
+                        )
+                    return record_getter(record)
+
+            values = [list(column) for column in zip(*map(getter, records))]
+        else:
+            values = [[] for _ in names]
+        return cls(
+            record_class=record_class,
+            columns=dict(zip(names, values)),
+            records=records,
+        )
+
+    @classmethod
+    def from_data_list(
+        cls,
+        record_class: type[T_RECORD],
+        data_list: Iterable[str],
+    ) -> "RecordBatch[T_RECORD]":
+        """
+        Create a batch from serialized records. The records are decoded with
+        :meth:`~unistream.abstraction.AbcRecord.deserialize_many`, and the
+        serialized strings are kept as they are. The claim check references
+        are decoded as :class:`~unistream.claim_check.ClaimCheck`.
+        """
+        data_list = list(data_list)
+        batch = cls.from_records(
+            records=deserialize_many(record_class, data_list),
+            record_class=record_class,
+        )
+        batch._data_list = data_list
+        return batch
+
+    @classmethod
+    def from_file(
+        cls,
+        record_class: type[T_RECORD],
+        path: Path,
+    ) -> "RecordBatch[T_RECORD]":
+        """
+        Create a batch from a file of serialized records written by
+        ``record_class``, for example a WAL segment of
+        :class:`~unistream.buffers.file_buffer.FileBuffer`. Both the text
+        format and the framing format are supported. Same as ``FileBuffer``,
+        the records are decoded from bytes in the trusted mode, and each record
+        keeps its serialized bytes, so it is not encoded again.
+        """
+        return cls.from_records(
+            records=deserialize_many_bytes(
+                record_class, read_data_bytes_list(path), trusted=True
+            ),
+            record_class=record_class,
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self) -> Iterator[T_RECORD]:
+        return iter(self.records)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"record_class={self.record_class.__name__}, "
+            f"n_records={len(self)}, "
+            f"columns={list(self.columns)})"
+        )
+
+    def column(self, name: str) -> list[T.Any]:
+        """
+        Get the list of values of a field.
+        """
+        return self.columns[name]
+
+    def to_array(
+        self,
+        name: str,
+        typecode: str | None = None,
+    ) -> array.array:
+        """
+        Get the values of a numeric field as an :class:`array.array`.
+
+        :param typecode: the typecode of the array. By default, ``"q"`` (signed
+            64 bits integer) if all values are ``int``, otherwise ``"d"``
+            (double).
+        """
+        values = self.columns[name]
+        if typecode is None:
+            if all(type(value) is int for value in values):
+                typecode = "q"
+            else:
+                typecode = "d"
+        return array.array(typecode, values)
+
+    def to_numpy(self, name: str, dtype=None):
+        """
+        Get the values of a field as a NumPy array.
+
+        :raises ImportError: NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("you have to install numpy to use to_numpy()!")
+        return np.asarray(self.columns[name], dtype=dtype)  # pragma: no cover
+
+    def serialize_many(self) -> list[str]:
+        """
+        Get the serialized records. They are encoded with
+        :meth:`~unistream.abstraction.AbcRecord.serialize_many` only once.
+        """
+        if self._data_list is None:
+            self._data_list = self.record_class.serialize_many(self.records)
+        return self._data_list
+
+    def get_sizes(self) -> array.array:
+        """
+        Get the size in bytes of the UTF-8 encoded serialized records, as
+        an ``array.array("q")``. Use it to check the size limits of the target
+        system for the whole batch.
+        """
+        return array.array("q", [get_n_bytes(data) for data in self.serialize_many()])
+
+    @property
+    def n_bytes(self) -> int:
+        """
+        The total size in bytes of the UTF-8 encoded serialized records.
+        """
+        return sum(self.get_sizes())
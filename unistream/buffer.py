@@ -4,7 +4,10 @@
 Implements :class:`BaseBuffer`, the base class for all buffer backends.
 """
 
-from .abstraction import AbcBuffer
+from collections.abc import Iterable
+
+from .abstraction import AbcRecord, AbcBuffer
+from .batch import RecordBatch
 
 
 class BaseBuffer(AbcBuffer):
@@ -17,3 +20,53 @@ class BaseBuffer(AbcBuffer):
     See :class:`~unistream.buffers.file_buffer.FileBuffer` for a concrete
     implementation using local WAL files.
     """
+
+    def put_many(self, records: Iterable[AbcRecord]):
+        """
+        Put many records to the buffer, in order.
+
+        The default implementation calls :meth:`~unistream.abstraction.AbcBuffer.put`
+        for each record. Subclasses can override it to persist the records
+        with fewer I/O calls.
+        """
+        for record in records:
+            self.put(record)
+
+    def emit_many(
+        self,
+        max_records: int | None = None,
+        max_bytes: int | None = None,
+    ) -> list[AbcRecord]:
+        """
+        Emit the records of more than one full batch at once, up to
+        ``max_records`` records and ``max_bytes`` bytes, to drain a backlog
+        with fewer sends. :meth:`~unistream.abstraction.AbcBuffer.commit`
+        commits all of them.
+
+        The default implementation is the same as
+        :meth:`~unistream.abstraction.AbcBuffer.emit`.
+        """
+        return self.emit()
+
+    def tick(self) -> bool:
+        """
+        Check the time-based conditions of the buffer, for example the max age
+        of the buffered records or a time-based fsync policy, and get ready
+        to emit if one is met.
+
+        The default implementation does nothing, the buffer only emits when
+        it is full.
+
+        :return: True if the buffer gets ready to emit because of this call.
+        """
+        return False
+
+    def emit_batch(self) -> RecordBatch:
+        """
+        Emit the same records as :meth:`~unistream.abstraction.AbcBuffer.emit`,
+        as a columnar :class:`~unistream.batch.RecordBatch`.
+
+        The default implementation converts the emitted records. Subclasses can
+        override it to build the batch straight from the persistence layer.
+        """
+        return RecordBatch.from_records(self.emit())
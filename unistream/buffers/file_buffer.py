@@ -4,16 +4,30 @@
 Implements :class:`FileBuffer`, a WAL-based buffer using local files.
 """
 
-import sys
-import random
+import typing as T
+import os
+import time
 import collections
 from collections.abc import Iterable
 from pathlib import Path
-from datetime import datetime, timezone
+from datetime import timedelta
 
 from ..exc import BufferIsEmptyError
+from ..logger import logger
+from ..utils import EPOCH, get_n_bytes
+from ..compression import get_compression
+from ..framing import (
+    MAGIC,
+    FrameWriter,
+    recover_frame_views,
+    split_lines,
+    read_data_bytes_list,
+)
 from ..abstraction import AbcRecord
+from ..claim_check import deserialize_many_bytes
+from ..batch import RecordBatch
 from ..buffer import BaseBuffer
+from .manifest import Segment, Manifest
 
 
 _FILENAME_FRIENDLY_DATETIME_FORMAT = "%Y-%m-%d_%H-%M-%S_%f"
@@ -28,12 +42,68 @@ class FileBuffer(BaseBuffer):
         a file extension, for example: ``my_buffer.log``.
     :param max_records: The maximum number of records that can be stored in the buffer.
     :param max_bytes: The maximum total size of records (in bytes) that can be stored in the buffer.
+    :param framed: if True, write the WAL files in the length-prefixed, checksummed
+        binary format of :mod:`unistream.framing`, otherwise use the
+        newline-delimited text format. Files in both formats can be read.
+    :param compression: the name of the compression in :mod:`unistream.compression`,
+        for example ``"zlib"``. If set, a full WAL file is compressed when it is
+        moved to the storage queue, which makes backlog recovery read less
+        from the disk. The current WAL file is never compressed.
+        Compressed and uncompressed files can be read. Default is no compression.
+    :param compression_level: the compression level, a low level costs less
+        CPU, a high level saves more disk I/O. Default is the library default.
+    :param fsync_every_records: call ``os.fsync`` on the WAL file once this many
+        records are written since the last fsync, ``1`` means every record.
+    :param fsync_every_ms: call ``os.fsync`` on the WAL file when a record is
+        written and this many milliseconds passed since the last fsync, which
+        lets a burst of records share one fsync (group commit). The unsynced
+        tail of a burst is fsynced by :meth:`FileBuffer.tick` once it is due.
+    :param max_age: the max age in seconds of the oldest record in the
+        current WAL file, counted from when it was put to this buffer. Once
+        exceeded, the WAL file is moved to the storage queue even though it
+        is not full, so the latency of a low traffic stream is bounded,
+        like the ``linger.ms`` of Kafka. It is checked on put and by
+        :meth:`FileBuffer.tick`. Default is None, wait until the buffer is full.
     :param n_records: This variable tracks the number of records in the memory queue.
-    :param n_bytes: This variable tracks the number of bytes in the memory queue.
+    :param n_bytes: This variable tracks the number of bytes of the UTF-8 encoded
+        serialized records in the memory queue.
     :param memory_queue:
     :param memory_serialization_queue:
     :param storage_queue: This queue tracks the older WAL files that have not been
         emitted.
+    :param manifest: the :class:`~unistream.buffers.manifest.Manifest` of the
+        older WAL files, stored at ``${path_wal}.manifest``. The storage queue
+        is loaded from it on startup without listing the WAL directory. If it
+        is missing, it is rebuilt from the WAL directory.
+    :param emitted_records: the cache of the emitted records, cleared on commit.
+    :param emitted_batch: the cache of the emitted :class:`~unistream.batch.RecordBatch`,
+        cleared on commit.
+    :param n_emitted_files: the number of WAL files in the storage queue
+        the emitted records come from, see :meth:`FileBuffer.emit_many`.
+
+    **Durability**
+
+    The WAL file is kept open across puts, and every put is flushed to the
+    operating system before it returns, so the records survive a crash of
+    the program. Whether they survive a power loss depends on the fsync policy:
+
+    - default, both ``fsync_every_records`` and ``fsync_every_ms`` are None:
+      never fsync, leave it to the operating system. The fastest.
+    - ``fsync_every_records=1``: fsync every put. The safest and the slowest.
+    - ``fsync_every_records=N``: lose at most the last ``N - 1`` records.
+    - ``fsync_every_ms=T``: lose at most the records of the last ``T``
+      milliseconds, as long as :meth:`FileBuffer.tick` is called at least
+      every ``T`` milliseconds when no record is put, for example by
+      :meth:`~unistream.producer.BaseProducer.poll`. Otherwise the tail of
+      the last burst is fsynced on the next put or on close.
+
+    If both are set, fsync when either is due. A full WAL file is fsynced
+    before it is moved to the storage queue if any policy is set. Call
+    :meth:`FileBuffer.close` to fsync and close the WAL file on shutdown.
+
+    On startup, a record half written by a crash at the end of the current
+    WAL file is truncated, and a full WAL file that was not moved yet is
+    moved to the storage queue, see :meth:`FileBuffer._recover_wal`.
 
     .. note::
 
@@ -46,11 +116,25 @@ class FileBuffer(BaseBuffer):
         path_wal: Path,
         max_records: int = 1000,
         max_bytes: int = 1000000,  # KB
+        framed: bool = False,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        fsync_every_records: int | None = None,
+        fsync_every_ms: int | None = None,
+        max_age: float | None = None,
     ):
         self.record_class = record_class
         self.path_wal = path_wal
         self.max_records = max_records
         self.max_bytes = max_bytes
+        self.framed = framed
+        self.compression = compression
+        self.compression_level = compression_level
+        if compression is not None:
+            get_compression(compression)  # fail fast if not available
+        self.fsync_every_records = fsync_every_records
+        self.fsync_every_ms = fsync_every_ms
+        self.max_age = max_age
 
         self.n_records = 0
         self.n_bytes = 0
@@ -58,26 +142,44 @@ class FileBuffer(BaseBuffer):
         self.memory_queue: collections.deque[AbcRecord] = collections.deque()
         self.memory_serialization_queue: collections.deque[str] = collections.deque()
         self.storage_queue: collections.deque[Path] = collections.deque()
+        self.manifest = Manifest(
+            path=path_wal.parent.joinpath(path_wal.name + ".manifest"),
+            fsync=self._is_fsync_enabled(),
+        )
 
         self.emitted_records: list[AbcRecord] | None = None
+        self.emitted_batch: RecordBatch | None = None
+        self.n_emitted_files = 1
+
+        # the open WAL file, opened on the first write
+        self._wal: T.BinaryIO | None = None
+        self._frame_writer: FrameWriter | None = None
+        self._n_unsynced = 0
+        self._last_fsync = time.monotonic()
+        # the monotonic time when the oldest record in the memory queue was put
+        self._first_put_time: float | None = None
 
         self._validate_path()
 
     def _read_log_file(self, path_wal: Path) -> list[AbcRecord]:
         """
-        Load records from one WAL file.
+        Load records from one WAL file, without decoding the file to ``str``.
         """
-        return [
-            self.record_class.deserialize(line)
-            for line in path_wal.read_text().splitlines()
-        ]
+        return deserialize_many_bytes(
+            self.record_class,
+            read_data_bytes_list(path_wal),
+            trusted=True,  # written by this buffer
+        )
 
-    def _get_new_log_file(self, create_at_datetime: datetime) -> Path:
+    def _get_new_log_file(self, create_at_epoch_us: int) -> Path:
         """
         When the buffer is full, we move the current WAL to the storage queue
         Get the path of the new log file to persist the buffer.
+
+        :param create_at_epoch_us: the creation time of the oldest record
+            in the WAL file, the UTC time is in the file name.
         """
-        utc_create_at_datetime = create_at_datetime.astimezone(timezone.utc)
+        utc_create_at_datetime = EPOCH + timedelta(microseconds=create_at_epoch_us)
         dt_str = utc_create_at_datetime.strftime(_FILENAME_FRIENDLY_DATETIME_FORMAT)
         return self.path_wal.parent.joinpath(
             f"{self.path_wal.stem}.{dt_str}{self.path_wal.suffix}"
@@ -85,7 +187,9 @@ class FileBuffer(BaseBuffer):
 
     def _get_old_log_files(self) -> list[Path]:
         """
-        Discover the list of path of the old WAL files. Their file name looks like::
+        Discover the list of path of the old WAL files by listing the WAL
+        directory, it is only used to rebuild the manifest. Their file name
+        looks like::
 
             ${prefix}.${timestamp}.${suffix}
         """
@@ -103,46 +207,246 @@ class FileBuffer(BaseBuffer):
         path_list.sort()  # sort by timestamp in filename to ensure the order
         return path_list
 
+    def _open_wal(self) -> T.BinaryIO:
+        """
+        Get the open WAL file, open it in append mode if it's not open yet.
+        """
+        if self._wal is None:
+            self._wal = self.path_wal.open("ab")
+            if self.framed:
+                self._frame_writer = FrameWriter(self._wal)
+        return self._wal
+
+    def _append(
+        self,
+        data_list: list[str],
+        n_footer: int | None = None,
+    ):
+        """
+        Append the serialized records to the WAL file with a single write call,
+        flush it to the operating system, and fsync it if the policy says so.
+
+        :param n_footer: if not None, the WAL file is full after this call,
+            also write the footer of a framed file with this number of records.
+        """
+        f = self._open_wal()
+        if self.framed:
+            self._frame_writer.write_many([data.encode("utf-8") for data in data_list])
+            if n_footer is not None:
+                self._frame_writer.write_footer(n_footer)
+        else:
+            f.write("".join([data + "\n" for data in data_list]).encode("utf-8"))
+        f.flush()
+        self._n_unsynced += len(data_list)
+        if self._is_fsync_due():
+            self._fsync()
+
+    def _is_fsync_enabled(self) -> bool:
+        return self.fsync_every_records is not None or self.fsync_every_ms is not None
+
+    def _is_fsync_due(self) -> bool:
+        if self._n_unsynced == 0:
+            return False
+        if (
+            self.fsync_every_records is not None
+            and self._n_unsynced >= self.fsync_every_records
+        ):
+            return True
+        if (
+            self.fsync_every_ms is not None
+            and (time.monotonic() - self._last_fsync) * 1000 >= self.fsync_every_ms
+        ):
+            return True
+        return False
+
+    def _fsync(self):
+        os.fsync(self._wal.fileno())
+        self._n_unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def _close_wal(self):
+        """
+        Close the WAL file before it is renamed or deleted. It is fsynced first
+        if any fsync policy is set.
+        """
+        if self._wal is None:
+            return
+        if self._n_unsynced and self._is_fsync_enabled():
+            self._fsync()
+        self._wal.close()
+        self._wal = None
+        self._frame_writer = None
+        self._n_unsynced = 0
+
+    def close(self):
+        """
+        Flush, fsync if any fsync policy is set, and close the WAL file.
+        The buffer can still be used, the WAL file is opened again on the
+        next put.
+        """
+        self._close_wal()
+
     def _push(self, record: AbcRecord):
         """
         Push a record to the memory queue and write it to WAL.
         """
         data = record.serialize()
-        with self.path_wal.open("a") as f:
-            f.write(data + "\n")
+        self._append([data])
+        if not self.memory_queue:
+            self._first_put_time = time.monotonic()
         self.memory_serialization_queue.appendleft(data)
         self.memory_queue.appendleft(record)
         self.n_records += 1
-        self.n_bytes += sys.getsizeof(data)
+        self.n_bytes += get_n_bytes(data)
 
     def _push_many(self, records: Iterable[AbcRecord]):
         for record in records:
             self._push(record)
 
+    def _extend(
+        self,
+        records: list[AbcRecord],
+        data_list: list[str],
+        n_records: int,
+        n_bytes: int,
+        is_full: bool,
+    ):
+        """
+        Append the serialized records to the WAL with a single write call,
+        then add them to the memory queue and set the counters.
+
+        :param n_records: the number of records in the memory queue after this call.
+        :param n_bytes: the number of bytes in the memory queue after this call.
+        :param is_full: if True, the WAL file is full after this call, the
+            footer of a framed file is written in the same write call.
+        """
+        self._append(data_list, n_footer=n_records if is_full else None)
+        if not self.memory_queue:
+            self._first_put_time = time.monotonic()
+        self.memory_serialization_queue.extendleft(data_list)
+        self.memory_queue.extendleft(records)
+        self.n_records = n_records
+        self.n_bytes = n_bytes
+
+    def _rebuild_manifest(self):
+        """
+        Create the manifest from the old WAL files in the WAL directory, for
+        example when the manifest is deleted, or the WAL files are written
+        by an older version. It reads every old WAL file once.
+        """
+        self.manifest.segments.clear()
+        for seq, path in enumerate(self._get_old_log_files(), start=1):
+            data_list = read_data_bytes_list(path)
+            first_record = deserialize_many_bytes(
+                self.record_class, data_list[:1], trusted=True
+            )[0]
+            self.manifest.segments[path.name] = Segment(
+                seq=seq,
+                name=path.name,
+                n_records=len(data_list),
+                n_bytes=sum([len(data) for data in data_list]),
+                create_at=first_record.create_at,
+            )
+        self.manifest.compact()
+
+    def _recover_manifest(self):
+        """
+        Load the manifest, and finish the work interrupted by a crash. Only
+        the oldest and the newest segments are checked.
+
+        - a full WAL file is added to the manifest right before it is renamed,
+          if the newest segment is missing, rename the WAL file again.
+        - a WAL file is deleted right before it is removed from the manifest,
+          if the oldest segments are missing, remove them from the manifest.
+        """
+        self.manifest.load()
+        dir_wal = self.path_wal.parent
+        if self.manifest.segments:
+            name = next(reversed(self.manifest.segments))
+            if dir_wal.joinpath(name).exists() is False:
+                if self.path_wal.exists():
+                    self._rotate(dir_wal.joinpath(name))
+                else:  # pragma: no cover
+                    self.manifest.remove(name)
+        while self.manifest.segments:
+            name = next(iter(self.manifest.segments))
+            if dir_wal.joinpath(name).exists():
+                break
+            self.manifest.remove(name)
+
+    def _recover_wal(self) -> tuple[list[bytes | memoryview], bool]:
+        """
+        Read the serialized records of the current WAL file, and truncate
+        the torn tail left by a crash, so the next write starts at a record
+        boundary. The valid records of a framed file are the frames before the
+        first truncated frame or crc32 mismatch, the valid records of a text
+        file are the lines that end with a newline. The number of dropped
+        bytes is logged as a warning, a crc32 mismatch drops all the frames
+        after it.
+
+        :return: a two-item tuple, the UTF-8 encoded serialized records, and
+            whether the WAL file has a footer, which means it is full.
+        """
+        content = self.path_wal.read_bytes()
+        if self.framed:
+            if len(content) >= len(MAGIC) and not content.startswith(MAGIC):  # pragma: no cover
+                raise ValueError("you should not change framed!")
+            data_list, size, n_footer = recover_frame_views(content)
+        else:
+            if content.startswith(MAGIC):  # pragma: no cover
+                raise ValueError("you should not change framed!")
+            size = content.rfind(b"\n") + 1
+            data_list = split_lines(content[:size])
+            n_footer = None
+        if size < len(content):
+            logger.warning(
+                f"drop {len(content) - size} bytes at offset {size} "
+                f"of the WAL file {self.path_wal}, after {len(data_list)} records"
+            )
+            os.truncate(self.path_wal, size)
+        return data_list, n_footer is not None
+
     def _validate_path(self):
         """
-        Locate all persisted log files and check if the number of records in each file
-        match the ``max_records``.
+        Load the storage queue from the manifest, load the current WAL file
+        to the memory queue, and check the number of records against
+        the ``max_records``.
         """
-        # exam the current WAL file
-        if self.path_wal.exists():
-            records = self._read_log_file(self.path_wal)
-            if len(records) >= self.max_records:  # pragma: no cover
-                raise ValueError("you should not change max_size!")
-            for record in records:
-                data = record.serialize()
-                self.memory_queue.appendleft(record)
-                self.memory_serialization_queue.appendleft(data)
-                self.n_records += 1
-                self.n_bytes += sys.getsizeof(data)
-
-        # exam the old WAL files
-        path_list = self._get_old_log_files()
-        if len(path_list):
-            n_records = len(random.choice(path_list).read_text().splitlines())
-            if n_records != self.max_records:  # pragma: no cover
+        # exam the old WAL files, before the current WAL file, which may
+        # be a full WAL file that is not renamed yet
+        if self.manifest.path.exists():
+            self._recover_manifest()
+        else:
+            self._rebuild_manifest()
+        dir_wal = self.path_wal.parent
+        for segment in self.manifest.segments.values():
+            # a WAL file can be moved earlier by max_bytes or max_age
+            if segment.n_records > self.max_records:  # pragma: no cover
                 raise ValueError("you should not change max_size!")
-        self.storage_queue.extendleft(path_list)
+            self.storage_queue.appendleft(dir_wal.joinpath(segment.name))
+
+        # exam the current WAL file, the records are decoded once,
+        # from bytes, without validation, because they are written by this buffer
+        if self.path_wal.exists():
+            data_list, has_footer = self._recover_wal()
+            records = deserialize_many_bytes(
+                self.record_class, data_list, trusted=True
+            )
+            self.memory_serialization_queue.extendleft(
+                [str(data, "utf-8") for data in data_list]
+            )
+            self.memory_queue.extendleft(records)
+            self.n_records = len(records)
+            self.n_bytes = sum([len(data) for data in data_list])
+            if records:
+                self._first_put_time = time.monotonic()
+            # the program crashed before the full WAL file was moved
+            if records and has_footer:
+                self._move_to_storage_queue()
+            elif records and (
+                self.n_records >= self.max_records or self.n_bytes >= self.max_bytes
+            ):
+                self._seal()
 
     @classmethod
     def new(
@@ -151,6 +455,12 @@ class FileBuffer(BaseBuffer):
         path_wal: Path,
         max_records: int = 1000,
         max_bytes: int = 1000000,  # 1MB
+        framed: bool = False,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        fsync_every_records: int | None = None,
+        fsync_every_ms: int | None = None,
+        max_age: float | None = None,
     ):
         """
         Create a new instance of :class:`FileBuffer`.
@@ -160,12 +470,27 @@ class FileBuffer(BaseBuffer):
             a file extension, for example: ``my_buffer.log``.
         :param max_records: The maximum number of records that can be stored in the buffer.
         :param max_bytes: The maximum total size of records (in bytes) that can be stored in the buffer.
+        :param framed: if True, write the WAL files in the binary framing format,
+            see :mod:`unistream.framing`.
+        :param compression: the name of the compression of the full WAL files,
+            see :mod:`unistream.compression`.
+        :param compression_level: the compression level.
+        :param fsync_every_records: fsync the WAL file every this many records.
+        :param fsync_every_ms: fsync the WAL file every this many milliseconds.
+        :param max_age: the max age in seconds of the oldest record before
+            the WAL file is moved to the storage queue.
         """
         return cls(
             record_class=record_class,
             path_wal=path_wal,
             max_records=max_records,
             max_bytes=max_bytes,
+            framed=framed,
+            compression=compression,
+            compression_level=compression_level,
+            fsync_every_records=fsync_every_records,
+            fsync_every_ms=fsync_every_ms,
+            max_age=max_age,
         )
 
     def clear_memory_queue(self):
@@ -175,6 +500,7 @@ class FileBuffer(BaseBuffer):
         """
         self.n_records = 0
         self.n_bytes = 0
+        self._first_put_time = None
         self.memory_queue.clear()
         self.memory_serialization_queue.clear()
 
@@ -183,13 +509,11 @@ class FileBuffer(BaseBuffer):
         Clear all WAL file. Including the current one and old files.
         """
         # remove all log files and file queue
-        prefix = self.path_wal.stem + "."
-        suffix = self.path_wal.suffix
-        for p in self.path_wal.parent.iterdir():
-            if (
-                p.name.startswith(prefix) and p.name.endswith(suffix)
-            ) or p == self.path_wal:
-                p.unlink()
+        self._close_wal()
+        for path in self.storage_queue:
+            path.unlink(missing_ok=True)
+        self.path_wal.unlink(missing_ok=True)
+        self.manifest.clear()
         self.storage_queue.clear()
 
         # clear memory queue
@@ -203,20 +527,137 @@ class FileBuffer(BaseBuffer):
         and move the WAL file to the storage queue if the buffer is full, which indicates
         that the buffer is ready to emit records.
 
-        todo: when putting lots of records, avoid open and close file every time,
-            maybe create a put_many method. However, I did a test, it seems that
-            open and close file 1000 times is not a big deal comparing to network IO.
+        To put lots of records at once, use :meth:`FileBuffer.put_many`.
         """
         # immediately append to log file
         self._push(record)
 
         # when buffer is full, create a new log file and clear the memory queue
         # print(f"{self._current_records = }, {self.max_records = }, {self._current_size = }, {self.max_size = }")
-        if self.n_records == self.max_records or self.n_bytes >= self.max_bytes:
-            path = self._get_new_log_file(self.memory_queue[0].create_at_datetime)
+        if (
+            self.n_records == self.max_records
+            or self.n_bytes >= self.max_bytes
+            or self._is_too_old()
+        ):
+            self._seal()
+
+    def put_many(self, records: Iterable[AbcRecord]):
+        """
+        Put many records to the buffer, in order.
+
+        The result is the same as calling :meth:`FileBuffer.put` for each record,
+        but the records that go to the same WAL file are written with a single
+        ``write`` call, and the counters are updated once per WAL file. If the
+        buffer becomes full in the middle of the records, the full WAL file is
+        moved to the storage queue and the rest of the records go to a new WAL file.
+        """
+        records = list(records)
+        data_list = [record.serialize() for record in records]
+        n_records = self.n_records
+        n_bytes = self.n_bytes
+        start = 0
+        for ith, data in enumerate(data_list, start=1):
+            n_records += 1
+            n_bytes += get_n_bytes(data)
+            if n_records == self.max_records or n_bytes >= self.max_bytes:
+                self._extend(
+                    records=records[start:ith],
+                    data_list=data_list[start:ith],
+                    n_records=n_records,
+                    n_bytes=n_bytes,
+                    is_full=True,
+                )
+                self._move_to_storage_queue()
+                n_records = 0
+                n_bytes = 0
+                start = ith
+        if start < len(records):
+            self._extend(
+                records=records[start:],
+                data_list=data_list[start:],
+                n_records=n_records,
+                n_bytes=n_bytes,
+                is_full=False,
+            )
+            if self._is_too_old():
+                self._seal()
+
+    def _is_too_old(self) -> bool:
+        """
+        Check whether the oldest record in the current WAL file exceeds ``max_age``.
+        """
+        return (
+            self.max_age is not None
+            and self._first_put_time is not None
+            and time.monotonic() - self._first_put_time >= self.max_age
+        )
+
+    def _seal(self):
+        """
+        Write the footer of a framed WAL file, then move it to the storage queue.
+        """
+        if self.framed:
+            self._open_wal()
+            self._frame_writer.write_footer(self.n_records)
+        self._move_to_storage_queue()
+
+    def tick(self) -> bool:
+        """
+        Move the current WAL file to the storage queue if its oldest record
+        exceeds ``max_age``, and fsync the WAL file if the ``fsync_every_ms``
+        policy is due. Call it periodically when no record is put, so the
+        records of an idle stream are emitted and fsynced in time.
+
+        :return: True if the WAL file is moved.
+        """
+        if self._is_too_old():
+            self._seal()
+            return True
+        if self._wal is not None and self._is_fsync_due():
+            self._fsync()
+        return False
+
+    def _move_to_storage_queue(self):
+        """
+        Move the full WAL file to the storage queue and clear the memory queue.
+        """
+        self._close_wal()
+        path = self._get_new_log_file(self.memory_queue[0].create_at_epoch_us)
+        self.manifest.add(
+            Segment(
+                seq=self.manifest.next_seq,
+                name=path.name,
+                n_records=self.n_records,
+                n_bytes=self.n_bytes,
+                create_at=self.memory_queue[-1].create_at,
+            )
+        )
+        self._rotate(path)
+        self.storage_queue.appendleft(path)
+        self.clear_memory_queue()
+
+    def _rotate(self, path: Path):
+        """
+        Move the current WAL file to ``path``, and compress it if needed.
+
+        The compressed file is written to a temp file first, then it replaces
+        the renamed WAL file atomically. If the program crashes in between,
+        ``path`` is still a valid uncompressed WAL file.
+        """
+        if self.compression is None:
             self.path_wal.rename(path)
-            self.storage_queue.appendleft(path)
-            self.clear_memory_queue()
+            return
+        compression = get_compression(self.compression)
+        path_tmp = path.parent.joinpath(path.name + ".tmp")
+        path_tmp.write_bytes(
+            compression.compress_block(
+                self.path_wal.read_bytes(),
+                n_records=self.manifest.segments[path.name].n_records,
+                level=self.compression_level,
+            )
+        )
+        self.path_wal.rename(path)
+        os.replace(path_tmp, path)
 
     def should_i_emit(self) -> bool:
         """
@@ -247,6 +688,81 @@ class FileBuffer(BaseBuffer):
             self.emitted_records = records
         return self.emitted_records
 
+    def emit_many(
+        self,
+        max_records: int | None = None,
+        max_bytes: int | None = None,
+    ) -> list[AbcRecord]:
+        """
+        Emit the records of the oldest WAL files in the storage queue, as many
+        files as fit in ``max_records`` and ``max_bytes``, and at least one.
+        :meth:`FileBuffer.commit` then removes all of them. It drains a backlog
+        with fewer sends, and merges the WAL files moved early by ``max_age``.
+
+        If the storage queue is empty, it is the same as :meth:`FileBuffer.emit`.
+        If records are already emitted and not committed, they are returned
+        as they are. The records are shared with :meth:`FileBuffer.emit` and
+        :meth:`FileBuffer.emit_batch` until commit.
+
+        :param max_records: the max number of records, default to the
+            ``max_records`` of the buffer.
+        :param max_bytes: the max total size in bytes of the serialized records,
+            default to the ``max_bytes`` of the buffer.
+        """
+        if self.emitted_records is not None or not self.storage_queue:
+            return self.emit()
+        if max_records is None:
+            max_records = self.max_records
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        # pick the files by the sizes in the manifest, then only read those
+        paths = list()
+        n_records = 0
+        n_bytes = 0
+        for path in reversed(self.storage_queue):
+            segment = self.manifest.segments[path.name]
+            if paths and (
+                n_records + segment.n_records > max_records
+                or n_bytes + segment.n_bytes > max_bytes
+            ):
+                break
+            paths.append(path)
+            n_records += segment.n_records
+            n_bytes += segment.n_bytes
+        records = list()
+        for path in paths:
+            records.extend(
+                deserialize_many_bytes(
+                    self.record_class, read_data_bytes_list(path), trusted=True
+                )
+            )
+        n_files = len(paths)
+        self.emitted_records = records
+        self.n_emitted_files = n_files
+        return records
+
+    def emit_batch(self) -> RecordBatch:
+        """
+        Emit the records as a :class:`~unistream.batch.RecordBatch`. If the
+        records come from a WAL file, the batch is built straight from the file
+        and keeps the serialized records, so they are not encoded again.
+        The records of the batch are shared with :meth:`FileBuffer.emit`.
+        """
+        if self.emitted_batch is None:
+            if self.emitted_records is None and self.storage_queue:
+                batch = RecordBatch.from_file(
+                    record_class=self.record_class,
+                    path=self.storage_queue[-1],
+                )
+                self.emitted_records = batch.records
+            else:
+                batch = RecordBatch.from_records(
+                    records=self.emit(),
+                    record_class=self.record_class,
+                )
+            self.emitted_batch = batch
+        return self.emitted_batch
+
     def commit(self):
         """
         When the emitted records are successfully processed, we can remove it
@@ -255,11 +771,18 @@ class FileBuffer(BaseBuffer):
         We also clear the emitted records cache.
         """
         if self.storage_queue:
-            self.storage_queue.pop().unlink()
+            for _ in range(self.n_emitted_files):
+                path = self.storage_queue.pop()
+                path.unlink()
+                self.manifest.remove(path.name)
+            self.n_emitted_files = 1
             self.emitted_records = None
+            self.emitted_batch = None
         elif self.memory_queue:
             self.clear_memory_queue()
+            self._close_wal()
             self.path_wal.unlink()
             self.emitted_records = None
+            self.emitted_batch = None
         else:
             raise BufferIsEmptyError
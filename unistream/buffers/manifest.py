@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements :class:`Manifest`, the index of the full WAL files of
+:class:`~unistream.buffers.file_buffer.FileBuffer`.
+
+With a manifest, the buffer knows its full WAL files (segments), their order,
+size and age without listing the WAL directory or reading any segment, so
+the startup time doesn't grow with the number of files in the directory.
+
+The manifest is an append-only JSON lines file. A line is either a new
+segment, or the name of a removed segment::
+
+    {"seq": 1, "name": "buffer.2024-01-01_00-00-00_000000.log", "n_records": 1000, "n_bytes": 65536, "create_at": "2024-01-01T00:00:00+00:00"}
+    {"del": "buffer.2024-01-01_00-00-00_000000.log"}
+
+Once there are many lines of removed segments, the file is rewritten with
+the live segments only, see :meth:`Manifest.compact`.
+"""
+
+import os
+import json
+import dataclasses
+from pathlib import Path
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Segment:
+    """
+    A full WAL file in the storage queue. It is a plain dataclass, so loading
+    a manifest of many segments skips the field validation.
+
+    :param seq: the sequence number of the segment, older segments have
+        smaller numbers.
+    :param name: the file name of the segment, in the WAL directory.
+    :param n_records: the number of records in the segment.
+    :param n_bytes: the total size of the UTF-8 encoded serialized records.
+    :param create_at: the create_at of the oldest record in the segment.
+    """
+
+    seq: int
+    name: str
+    n_records: int
+    n_bytes: int
+    create_at: str
+
+
+class Manifest:
+    """
+    The append-only index of the segments.
+
+    :param path: the path of the manifest file.
+    :param fsync: if True, fsync the manifest file after each change.
+    :param compact_threshold: rewrite the manifest file once the number of
+        lines of removed segments reaches this number, and exceeds
+        the number of live segments.
+    :param segments: the live segments by name, from the oldest to the newest.
+    :param n_garbage: the number of lines of removed segments in the file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync: bool = False,
+        compact_threshold: int = 1000,
+    ):
+        self.path = path
+        self.fsync = fsync
+        self.compact_threshold = compact_threshold
+        self.segments: dict[str, Segment] = dict()
+        self.n_garbage = 0
+
+    @property
+    def next_seq(self) -> int:
+        """
+        The sequence number of the next segment.
+        """
+        if self.segments:
+            return next(reversed(self.segments.values())).seq + 1
+        return 1
+
+    def load(self):
+        """
+        Replay the manifest file. A torn last line, written by a crash, is
+        ignored and the file is compacted right away.
+        """
+        lines = self.path.read_bytes().splitlines()
+        is_torn = False
+        try:
+            # decode all lines with one call
+            dct_list = json.loads(b"[" + b",".join(lines) + b"]")
+        except ValueError:
+            dct_list = list()
+            for line in lines:
+                try:
+                    dct_list.append(json.loads(line))
+                except ValueError:
+                    is_torn = True
+                    break
+        segments = dict()
+        for dct in dct_list:
+            if "del" in dct:
+                segments.pop(dct["del"], None)
+            else:
+                segments[dct["name"]] = Segment(**dct)
+        n_lines = len(dct_list)
+        self.segments = segments
+        self.n_garbage = n_lines - len(segments)
+        if is_torn:
+            self.compact()
+
+    def _append(self, dct: dict):
+        with self.path.open("ab") as f:
+            f.write(json.dumps(dct).encode("utf-8") + b"\n")
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def add(self, segment: Segment):
+        """
+        Add a new segment, it has to be newer than all segments.
+        """
+        self._append(dataclasses.asdict(segment))
+        self.segments[segment.name] = segment
+
+    def remove(self, name: str):
+        """
+        Remove a segment, compact the manifest file if needed.
+        """
+        self._append({"del": name})
+        self.segments.pop(name, None)
+        self.n_garbage += 2  # the line of the segment and the del line
+        if (
+            self.n_garbage >= self.compact_threshold
+            and self.n_garbage > len(self.segments)
+        ):
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrite the manifest file with the live segments only. The new file
+        is written to a temp file first, then it replaces the old one atomically.
+        """
+        path_tmp = self.path.parent.joinpath(self.path.name + ".tmp")
+        with path_tmp.open("wb") as f:
+            f.write(
+                b"".join(
+                    [
+                        json.dumps(dataclasses.asdict(segment)).encode("utf-8") + b"\n"
+                        for segment in self.segments.values()
+                    ]
+                )
+            )
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path_tmp, self.path)
+        self.n_garbage = 0
+
+    def clear(self):
+        """
+        Remove all segments and delete the manifest file.
+        """
+        self.path.unlink(missing_ok=True)
+        self.segments.clear()
+        self.n_garbage = 0
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements :class:`MemoryBuffer`, a bounded in-memory buffer without
+persistence.
+"""
+
+import collections
+
+from ..exc import BufferIsEmptyError, BufferIsFullError
+from ..utils import get_n_bytes
+from ..abstraction import AbcRecord
+from ..buffer import BaseBuffer
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_RAISE = "raise"
+
+_OVERFLOW_POLICIES = {OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_RAISE}
+
+
+class MemoryBuffer(BaseBuffer):
+    """
+    Keep the buffer in memory only. It has the same behavior as
+    :class:`~unistream.buffers.file_buffer.FileBuffer`, but nothing is
+    written to the disk, so the buffered records are lost when the program
+    crashes. Use it for the streams that can lose a few seconds of data,
+    for example telemetry, or as the baseline to measure the cost of durability.
+
+    The records are put to the current batch. When the batch is full, it is
+    moved to a ring of ready-to-send batches, which holds at most
+    ``max_batches`` batches. If the ring is full, the ``overflow`` policy applies.
+
+    :param max_records: The maximum number of records in a batch.
+    :param max_bytes: The maximum total size of the records (in bytes) in a batch.
+    :param max_batches: the max number of full batches waiting to be sent,
+        it bounds the memory usage when the sink is down.
+    :param overflow: what to do when a batch is full and the ring is full:
+
+        - ``"drop_oldest"`` (default): drop the oldest batch that is not
+          emitted, keep the recent records.
+        - ``"drop_newest"``: drop the new full batch.
+        - ``"raise"``: raise :class:`~unistream.exc.BufferIsFullError` in
+          :meth:`MemoryBuffer.put`, the record is not put.
+    :param n_records: the number of records in the current batch.
+    :param n_bytes: the number of bytes of the UTF-8 encoded serialized records
+        in the current batch.
+    :param memory_queue: the records of the current batch, older records first.
+    :param storage_queue: the full batches, the oldest batch is on the right.
+    :param emitted_records: the cache of the emitted records, cleared on commit.
+    :param n_dropped_records: the total number of records dropped by the
+        overflow policy.
+    """
+
+    def __init__(
+        self,
+        max_records: int = 1000,
+        max_bytes: int = 1000000,
+        max_batches: int = 100,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+    ):
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow has to be one of {sorted(_OVERFLOW_POLICIES)}, "
+                f"got {overflow!r}!"
+            )
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_batches = max_batches
+        self.overflow = overflow
+
+        self.n_records = 0
+        self.n_bytes = 0
+        self.memory_queue: list[AbcRecord] = list()
+        self.storage_queue: collections.deque[list[AbcRecord]] = collections.deque()
+        self.emitted_records: list[AbcRecord] | None = None
+        self.n_dropped_records = 0
+
+    @classmethod
+    def new(
+        cls,
+        max_records: int = 1000,
+        max_bytes: int = 1000000,  # 1MB
+        max_batches: int = 100,
+        overflow: str = OVERFLOW_DROP_OLDEST,
+    ):
+        """
+        Create a new instance of :class:`MemoryBuffer`.
+
+        :param max_records: The maximum number of records in a batch.
+        :param max_bytes: The maximum total size of the records (in bytes) in a batch.
+        :param max_batches: the max number of full batches waiting to be sent.
+        :param overflow: the overflow policy, ``"drop_oldest"``,
+            ``"drop_newest"`` or ``"raise"``.
+        """
+        return cls(
+            max_records=max_records,
+            max_bytes=max_bytes,
+            max_batches=max_batches,
+            overflow=overflow,
+        )
+
+    def clear_memory_queue(self):
+        """
+        Clear the current batch, and reset the records and bytes counter.
+        """
+        self.n_records = 0
+        self.n_bytes = 0
+        self.memory_queue = list()
+
+    def put(self, record: AbcRecord):
+        """
+        Put one record to the current batch, and move the batch to the ring
+        if it is full.
+
+        :raises BufferIsFullError: the ring is full and the overflow policy
+            is ``"raise"``.
+        """
+        n_bytes = get_n_bytes(record.serialize())
+        is_full = (
+            self.n_records + 1 >= self.max_records
+            or self.n_bytes + n_bytes >= self.max_bytes
+        )
+        if (
+            is_full
+            and self.overflow == OVERFLOW_RAISE
+            and len(self.storage_queue) >= self.max_batches
+        ):
+            raise BufferIsFullError(
+                f"{len(self.storage_queue)} batches are waiting to be sent!"
+            )
+        self.memory_queue.append(record)
+        self.n_records += 1
+        self.n_bytes += n_bytes
+        if is_full:
+            self._move_to_storage_queue()
+
+    def _move_to_storage_queue(self):
+        """
+        Move the current batch to the ring, apply the overflow policy if
+        the ring is full.
+        """
+        batch = self.memory_queue
+        self.clear_memory_queue()
+        if len(self.storage_queue) >= self.max_batches:
+            if self.overflow == OVERFLOW_DROP_NEWEST:
+                self.n_dropped_records += len(batch)
+                return
+            # the emitted batch is waiting for commit, drop the next one
+            if self.storage_queue and self.storage_queue[-1] is self.emitted_records:
+                index = len(self.storage_queue) - 2
+            else:
+                index = len(self.storage_queue) - 1
+            if index < 0:
+                self.n_dropped_records += len(batch)
+                return
+            self.n_dropped_records += len(self.storage_queue[index])
+            del self.storage_queue[index]
+        self.storage_queue.appendleft(batch)
+
+    def should_i_emit(self) -> bool:
+        """
+        If there is a full batch in the ring, we should emit records.
+        """
+        return len(self.storage_queue) > 0
+
+    def emit(self) -> list[AbcRecord]:
+        """
+        Emit the oldest full batch. If the ring is empty, the current batch
+        is moved to the ring and emitted, so the records put before commit
+        go to the next batch. The result is cached until commit.
+        """
+        if self.emitted_records is None:
+            if not self.storage_queue:
+                if not self.memory_queue:
+                    raise BufferIsEmptyError
+                self.storage_queue.appendleft(self.memory_queue)
+                self.clear_memory_queue()
+            self.emitted_records = self.storage_queue[-1]
+        return self.emitted_records
+
+    def commit(self):
+        """
+        Remove the emitted batch, and clear the emitted records cache.
+        """
+        if self.emitted_records is None:
+            self.emit()
+        self.storage_queue.pop()
+        self.emitted_records = None
@@ -33,8 +33,9 @@ from .vendor.better_enum import BetterIntEnum
 from .vendor.better_dataclass import DataClass
 
 from .logger import logger
-from .utils import EPOCH_STR, get_utc_now
+from .utils import EPOCH_STR, get_utc_now, get_utc_now_epoch_us, to_epoch_us
 from .abstraction import AbcRecord, AbcCheckPoint
+from .records.lazy import materialize
 
 
 class StatusEnum(BetterIntEnum):
@@ -107,6 +108,18 @@ class Tracker(DataClass, BaseModel):
     def lock_expire_datetime(self) -> datetime:
         return datetime.fromisoformat(self.lock_expire_time)
 
+    @property
+    def lock_expire_epoch_us(self) -> int:
+        """
+        The lock expire time as integer microseconds since epoch. It is cached
+        until the ``lock_expire_time`` changes.
+        """
+        cache = self.__dict__.get("_lock_expire_epoch_us")
+        if cache is None or cache[0] != self.lock_expire_time:
+            cache = (self.lock_expire_time, to_epoch_us(self.lock_expire_datetime))
+            self.__dict__["_lock_expire_epoch_us"] = cache
+        return cache[1]
+
 
 T_TRACKER = T.TypeVar("T_TRACKER", bound=Tracker)
 
@@ -183,8 +196,10 @@ class BaseCheckPoint(DataClass, AbcCheckPoint, BaseModel):
         if tracker.lock == lock:
             return False
         if now is None:
-            now = get_utc_now()
-        return now < tracker.lock_expire_datetime
+            now_epoch_us = get_utc_now_epoch_us()
+        else:
+            now_epoch_us = to_epoch_us(now)
+        return now_epoch_us < tracker.lock_expire_epoch_us
 
     def mark_as_in_progress(
         self,
@@ -345,11 +360,12 @@ class BaseCheckPoint(DataClass, AbcCheckPoint, BaseModel):
             the persistence layer.
         """
         if records is None:
-            records = self.load_records(record_class=record_class, **kwargs)
+            # only decode the records that are not succeeded
+            records = self.load_records(record_class=record_class, lazy=True, **kwargs)
         not_succeeded_records = list()
         expected_status = StatusEnum.succeeded.value
         for record in records:
             tracker = self.get_tracker(record)
             if tracker.status != expected_status:
-                not_succeeded_records.append(record)
+                not_succeeded_records.append(materialize(record))
         return not_succeeded_records
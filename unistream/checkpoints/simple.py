@@ -5,6 +5,7 @@ Implements :class:`SimpleCheckpoint`, a JSON-file-based checkpoint for local
 development and testing.
 """
 
+import io
 import json
 import dataclasses
 from collections.abc import Iterable
@@ -12,7 +13,11 @@ from pathlib import Path
 
 from func_args.api import REQ
 
+from ..compression import get_compression
+from ..framing import FrameWriter, read_data_list, read_data_bytes_list
 from ..abstraction import AbcRecord
+from ..records.lazy import LazyRecord
+from ..claim_check import deserialize_many_bytes, to_lazy_records
 from ..checkpoint import (
     T_POINTER,
     Tracker,
@@ -27,10 +32,18 @@ class SimpleCheckpoint(BaseCheckPoint):
 
     :param path_checkpoint: the path to the checkpoint file.
     :param path_records: the path to the records data file.
+    :param framed: if True, write the records data file in the binary framing
+        format of :mod:`unistream.framing`, otherwise use the newline-delimited
+        text format. Files in both formats can be read.
+    :param compression: the name of the compression in :mod:`unistream.compression`
+        of the records data file, for example ``"dict"`` to store the repeated
+        strings of the batch once. Compressed files are detected automatically.
     """
 
     checkpoint_file: str = dataclasses.field(default=REQ)
     records_file: str = dataclasses.field(default=REQ)
+    framed: bool = dataclasses.field(default=False)
+    compression: str | None = dataclasses.field(default=None)
 
     @property
     def path_checkpoint(self) -> Path:
@@ -55,6 +68,8 @@ class SimpleCheckpoint(BaseCheckPoint):
         next_pointer: T_POINTER | None = None,
         batch_sequence: int = 0,
         batch: dict[str, Tracker] | None = None,
+        framed: bool = False,
+        compression: str | None = None,
     ) -> "SimpleCheckpoint":
         path_checkpoint = Path(checkpoint_file)
         path_records = Path(records_file)
@@ -76,6 +91,8 @@ class SimpleCheckpoint(BaseCheckPoint):
                 batch=batch,
                 lock_expire=lock_expire,
                 max_attempts=max_attempts,
+                framed=framed,
+                compression=compression,
             )
             checkpoint.dump()
             return checkpoint
@@ -87,22 +104,45 @@ class SimpleCheckpoint(BaseCheckPoint):
         """
         Dump the records in a batch to the persistence layer.
         """
-        self.path_records.write_text(
-            "\n".join([record.serialize() for record in records])
-        )
+        records = list(records)
+        if records:
+            data_list = type(records[0]).serialize_many(records)
+        else:
+            data_list = []
+        if self.framed:
+            f = io.BytesIO()
+            writer = FrameWriter(f)
+            writer.write_many([data.encode("utf-8") for data in data_list])
+            writer.write_footer()
+            content = f.getvalue()
+        else:
+            content = "\n".join(data_list).encode("utf-8")
+        if self.compression is not None:
+            compression = get_compression(self.compression)
+            content = compression.compress_block(content, n_records=len(data_list))
+        self.path_records.write_bytes(content)
 
     def load_records(
         self,
         record_class: type[AbcRecord],
+        lazy: bool = False,
         **kwargs,
-    ) -> list[AbcRecord]:
+    ) -> list[AbcRecord] | list[LazyRecord]:
         """
         Load the batch records from the persistence layer.
+
+        :param lazy: if True, return :class:`~unistream.records.lazy.LazyRecord`
+            objects that only decode the header up front.
+
+        The claim check references are returned as
+        :class:`~unistream.claim_check.ClaimCheck`.
         """
         if self.path_records.exists():
-            with self.path_records.open("r") as f:
-                records = [record_class.deserialize(line) for line in f.readlines()]
-            return records
+            if lazy:
+                data_list = read_data_list(self.path_records)
+                return to_lazy_records(record_class, data_list)
+            data_list = read_data_bytes_list(self.path_records)
+            return deserialize_many_bytes(record_class, data_list, trusted=True)
         else:
             return []
 
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements the chunking of oversized records.
+
+Stream systems have a per-record size limit, for example 1 MB for Kinesis.
+A record larger than that makes :meth:`~unistream.abstraction.AbcProducer.send`
+fail on every retry, and :class:`~unistream.producer.BaseProducer` keeps
+the whole buffer behind it. With a :class:`ChunkingConfig`, the producer
+splits each oversized serialized record into ordered :class:`ChunkRecord`
+right before ``send``, the records within the limit are sent as they are.
+:class:`~unistream.consumer.BaseConsumer` with ``chunked=True`` joins the
+chunks back into the logical record before
+:meth:`~unistream.consumer.BaseConsumer.process_record`, so the checkpoint
+tracks the logical record.
+
+A serialized chunk is a JSON header followed by a slice of the serialized
+logical record, without escaping, so the size of a chunk is exact::
+
+    {"_chunk": "${record_id}", "seq": 0, "n_chunks": 3, "id": "${record_id}.0", "create_at": "..."}{"id": "${record_id}", ...
+
+The chunks of a record share the ``group_id``, which is the id of the
+logical record. If the producer crashes after sending part of the chunks,
+it sends all of them again on retry, and the consumer drops the incomplete
+group.
+"""
+
+import json
+import dataclasses
+from collections.abc import Iterable, Sequence
+
+from func_args.api import BaseModel
+
+from .utils import get_n_bytes
+from .abstraction import AbcRecord, T_RECORD
+from .record import BaseRecord
+from .batch import RecordBatch
+from .claim_check import deserialize_many, deserialize_many_bytes as _deserialize_many_bytes
+
+_MARKER = '{"_chunk": '
+_MARKER_BYTES = _MARKER.encode("utf-8")
+
+_decoder = json.JSONDecoder()
+
+# the room reserved for the JSON header of a chunk
+HEADER_SIZE = 256
+
+
+def is_chunk(data: str | bytes | memoryview) -> bool:
+    """
+    Check whether a serialized record is a chunk, without decoding it.
+    """
+    if data.__class__ is str:
+        return data.startswith(_MARKER)
+    return data[: len(_MARKER_BYTES)] == _MARKER_BYTES
+
+
+def split_text(data: str, max_bytes: int) -> list[str]:
+    """
+    Split a string into pieces of at most ``max_bytes`` UTF-8 encoded bytes,
+    without breaking a multi-bytes character.
+    """
+    if data.isascii():
+        return [data[i : i + max_bytes] for i in range(0, len(data), max_bytes)]
+    encoded = data.encode("utf-8")
+    pieces = list()
+    start = 0
+    end = len(encoded)
+    while start < end:
+        stop = min(start + max_bytes, end)
+        # move back to the first byte of a character
+        while stop < end and (encoded[stop] & 0xC0) == 0x80:
+            stop -= 1
+        pieces.append(encoded[start:stop].decode("utf-8"))
+        start = stop
+    return pieces
+
+
+class ChunkRecord(BaseRecord):
+    """
+    A wire record that carries a slice of a serialized oversized record.
+
+    :param id: the id of the chunk, ``${group_id}.${seq}``.
+    :param create_at: the create_at of the logical record.
+    :param group_id: the id of the logical record.
+    :param seq: the 0-based index of the chunk in the group.
+    :param n_chunks: the number of chunks in the group.
+    :param piece: the slice of the serialized logical record.
+    """
+
+    __slots__ = ("id", "create_at", "group_id", "seq", "n_chunks", "piece")
+
+    def __init__(
+        self,
+        create_at: str,
+        group_id: str,
+        seq: int,
+        n_chunks: int,
+        piece: str,
+    ):
+        self.id = f"{group_id}.{seq}"
+        self.create_at = create_at
+        self.group_id = group_id
+        self.seq = seq
+        self.n_chunks = n_chunks
+        self.piece = piece
+
+    def __eq__(self, other) -> bool:
+        return type(other) is ChunkRecord and self.serialize() == other.serialize()
+
+    def serialize(self) -> str:
+        header = json.dumps(
+            {
+                "_chunk": self.group_id,
+                "seq": self.seq,
+                "n_chunks": self.n_chunks,
+                "id": self.id,
+                "create_at": self.create_at,
+            }
+        )
+        return header + self.piece
+
+    @classmethod
+    def deserialize(cls, data: str) -> "ChunkRecord":
+        # the newline of the text format is not part of the piece,
+        # a serialized record never has a raw newline
+        data = data.rstrip("\r\n")
+        header, end = _decoder.raw_decode(data)
+        return cls(
+            create_at=header["create_at"],
+            group_id=header["_chunk"],
+            seq=header["seq"],
+            n_chunks=header["n_chunks"],
+            piece=data[end:],
+        )
+
+    @classmethod
+    def deserialize_bytes(cls, data: bytes | memoryview) -> "ChunkRecord":
+        return cls.deserialize(str(data, "utf-8"))
+
+
+def split(
+    record: AbcRecord,
+    max_bytes: int,
+    data: str | None = None,
+) -> list[ChunkRecord]:
+    """
+    Split a record into chunks of at most ``max_bytes`` bytes each.
+
+    :param data: the serialized record, if it's already known.
+    """
+    if max_bytes <= HEADER_SIZE + 4:
+        raise ValueError(f"max_bytes has to be larger than {HEADER_SIZE + 4}!")
+    if data is None:
+        data = record.serialize()
+    pieces = split_text(data, max_bytes - HEADER_SIZE)
+    return [
+        ChunkRecord(
+            create_at=record.create_at,
+            group_id=record.id,
+            seq=seq,
+            n_chunks=len(pieces),
+            piece=piece,
+        )
+        for seq, piece in enumerate(pieces)
+    ]
+
+
+def reassemble(
+    records: Iterable[AbcRecord],
+    record_class: type[T_RECORD],
+) -> tuple[list[T_RECORD], int]:
+    """
+    Join the chunks back into the logical records, keep the other records.
+    A logical record takes the position of its last chunk.
+
+    The chunks that don't continue the current group are incomplete groups
+    left by a failed send, they are dropped.
+
+    :return: a two-item tuple, the records, and the number of the trailing
+        chunks of an incomplete group. The caller should read them again
+        with the rest of the group.
+    """
+    results = list()
+    pieces: list[str] = list()
+    group: ChunkRecord | None = None
+    for record in records:
+        if type(record) is not ChunkRecord:
+            results.append(record)
+            continue
+        if record.seq == 0:
+            group = record
+            pieces = [record.piece]
+        elif (
+            group is not None
+            and record.group_id == group.group_id
+            and record.seq == len(pieces)
+        ):
+            pieces.append(record.piece)
+        else:
+            group = None
+            pieces = []
+            continue
+        if len(pieces) == group.n_chunks:
+            results.extend(deserialize_many(record_class, ["".join(pieces)]))
+            group = None
+            pieces = []
+    return results, len(pieces)
+
+
+def deserialize_many_bytes(
+    record_class: type[T_RECORD],
+    data_list: Iterable[bytes | memoryview],
+    trusted: bool = False,
+) -> list[T_RECORD | ChunkRecord]:
+    """
+    Same as :func:`unistream.claim_check.deserialize_many_bytes`, but the
+    chunks are returned as :class:`ChunkRecord`.
+    """
+    data_list = list(data_list)
+    flags = [is_chunk(data) for data in data_list]
+    if not any(flags):
+        return _deserialize_many_bytes(record_class, data_list, trusted=trusted)
+    records = iter(
+        _deserialize_many_bytes(
+            record_class,
+            [data for data, flag in zip(data_list, flags) if not flag],
+            trusted=trusted,
+        )
+    )
+    return [
+        ChunkRecord.deserialize_bytes(data) if flag else next(records)
+        for data, flag in zip(data_list, flags)
+    ]
+
+
+@dataclasses.dataclass
+class ChunkingConfig(BaseModel):
+    """
+    The chunking configuration for :class:`~unistream.producer.BaseProducer`.
+
+    :param max_bytes: the max size in bytes of a serialized record the stream
+        system accepts. A larger record is split into chunks of at most
+        this size, including a header of up to ``HEADER_SIZE`` bytes.
+    """
+
+    max_bytes: int = dataclasses.field(default=1_000_000)
+
+    def split(
+        self,
+        records: Sequence[AbcRecord],
+    ) -> Sequence[AbcRecord]:
+        """
+        Split the oversized records into chunks, in place of the record.
+        If no record is oversized, the input is returned as it is, otherwise
+        a list is returned, even for a :class:`~unistream.batch.RecordBatch`.
+        """
+        if len(records) == 0:
+            return records
+        if isinstance(records, RecordBatch):
+            data_list = records.serialize_many()
+        else:
+            data_list = type(records[0]).serialize_many(records)
+        sizes = [get_n_bytes(data) for data in data_list]
+        if max(sizes) <= self.max_bytes:
+            return records
+        results = list()
+        for record, data, size in zip(records, data_list, sizes):
+            if size <= self.max_bytes:
+                results.append(record)
+            else:
+                results.extend(split(record, self.max_bytes, data))
+        return results
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements the claim-check pattern for large records.
+
+A record of a few megabytes fills :class:`~unistream.buffers.file_buffer.FileBuffer`
+by itself, bloats the checkpoint records file and gets throttled by the sink.
+With a :class:`ClaimCheckConfig`, :class:`~unistream.producer.BaseProducer`
+writes the serialized record to a local, content-addressed blob directory
+when the record enters the buffer, and puts a small :class:`ClaimCheck`
+reference in its place. Only the reference travels through the WAL,
+:meth:`~unistream.abstraction.AbcProducer.send`, the sink and the checkpoint.
+
+The reference is a serialized JSON object that starts with the
+``"_claim_check"`` key, the path of the blob::
+
+    {"_claim_check": "/path/to/blobs/3f/3f9a...", "id": "...", "create_at": "...", "n_bytes": 5242880}
+
+The readers (:class:`~unistream.buffers.file_buffer.FileBuffer`,
+:class:`~unistream.consumers.simple.SimpleConsumer`,
+:class:`~unistream.checkpoints.simple.SimpleCheckpoint`) detect it by the
+prefix and create a :class:`ClaimCheck`, which is a
+:class:`~unistream.records.lazy.LazyRecord`: the ``id`` and ``create_at`` are
+available right away, the blob is read and decoded on first access to any
+other attribute.
+
+**Blob retention**
+
+The blobs are content-addressed and shared by all references to the same
+content, without a reference count. :class:`~unistream.consumer.BaseConsumer`
+deletes the blobs of the succeeded records of a batch at the start of the
+next batch, once the checkpoint records file no longer points to them,
+except the blobs the next batch references again, for example a duplicate
+sent by a producer retry. The blobs of the failed and exhausted records are
+kept, so :meth:`~unistream.checkpoint.BaseCheckPoint.get_not_succeeded_records`
+can still read them; delete them with :func:`delete_blobs` after sending the
+records to a DLQ.
+
+A blob is deleted too early if a duplicate reference arrives more than one
+batch after the first copy, which can happen when the consumer ``limit`` is
+smaller than the producer batch size. A blob is left behind if the consumer
+stops before the next batch, or for the failed records. For these cases,
+set ``keep_blobs=True`` on the consumer and/or sweep the blob directory
+periodically with :meth:`ClaimCheckConfig.delete_expired_blobs`, with
+a retention longer than a record can stay in the buffer and the stream.
+"""
+
+import typing as T
+import os
+import time
+import json
+import hashlib
+import dataclasses
+from collections.abc import Iterable
+from pathlib import Path
+
+from func_args.api import REQ, BaseModel
+
+from .utils import get_n_bytes
+from .abstraction import AbcRecord, T_RECORD
+from .records.lazy import LazyRecord
+
+_MARKER = '{"_claim_check": '
+_MARKER_BYTES = _MARKER.encode("utf-8")
+
+
+def is_claim_check(data: str | bytes | memoryview) -> bool:
+    """
+    Check whether a serialized record is a claim check reference, without
+    decoding it.
+    """
+    if data.__class__ is str:
+        return data.startswith(_MARKER)
+    return data[: len(_MARKER_BYTES)] == _MARKER_BYTES
+
+
+class ClaimCheck(LazyRecord[T_RECORD]):
+    """
+    A reference to a record stored in a blob file.
+
+    :param record_class: the record class used to decode the blob.
+    :param data: the serialized reference.
+    :param id: the id of the record.
+    :param create_at: the create_at of the record.
+    :param path: the path of the blob file.
+    :param n_bytes: the size of the blob file in bytes.
+    """
+
+    __slots__ = ("path", "n_bytes")
+
+    def __init__(
+        self,
+        record_class: type[T_RECORD],
+        data: str,
+        id: str,
+        create_at: str,
+        path: str,
+        n_bytes: int,
+    ):
+        super().__init__(
+            record_class=record_class,
+            data=data,
+            id=id,
+            create_at=create_at,
+        )
+        self.path = path
+        self.n_bytes = n_bytes
+
+    @classmethod
+    def new(
+        cls,
+        record_class: type[T_RECORD],
+        id: str,
+        create_at: str,
+        path: str,
+        n_bytes: int,
+    ) -> "ClaimCheck[T_RECORD]":
+        """
+        Create a reference and its serialized form.
+        """
+        data = json.dumps(
+            {"_claim_check": path, "id": id, "create_at": create_at, "n_bytes": n_bytes}
+        )
+        return cls(
+            record_class=record_class,
+            data=data,
+            id=id,
+            create_at=create_at,
+            path=path,
+            n_bytes=n_bytes,
+        )
+
+    @classmethod
+    def from_data(
+        cls,
+        record_class: type[T_RECORD],
+        data: str | bytes | memoryview,
+    ) -> "ClaimCheck[T_RECORD]":
+        """
+        Create a reference from its serialized form.
+        """
+        if data.__class__ is not str:
+            data = str(data, "utf-8")
+        data = data.rstrip()
+        dct = json.loads(data)
+        return cls(
+            record_class=record_class,
+            data=data,
+            id=dct["id"],
+            create_at=dct["create_at"],
+            path=dct["_claim_check"],
+            n_bytes=dct["n_bytes"],
+        )
+
+    @classmethod
+    def serialize_many(cls, records: Iterable[AbcRecord]) -> list[str]:
+        return [record.serialize() for record in records]
+
+    def materialize(self) -> T_RECORD:
+        """
+        Read the blob and decode the record, the result is cached.
+        """
+        if self._record is None:
+            blob = Path(self.path).read_bytes()
+            self._record = self.record_class.deserialize_bytes(blob)
+        return self._record
+
+    def delete_blob(self):
+        """
+        Delete the blob file, if it still exists.
+        """
+        Path(self.path).unlink(missing_ok=True)
+
+
+def _merge(
+    data_list: list,
+    decode_many: T.Callable[[list], list],
+    to_reference: T.Callable,
+) -> list:
+    """
+    Decode the normal records in one call and the references one by one,
+    keep the order.
+    """
+    flags = [is_claim_check(data) for data in data_list]
+    if not any(flags):
+        return decode_many(data_list)
+    records = iter(decode_many([d for d, f in zip(data_list, flags) if not f]))
+    return [
+        to_reference(data) if flag else next(records)
+        for data, flag in zip(data_list, flags)
+    ]
+
+
+def deserialize_many(
+    record_class: type[T_RECORD],
+    data_list: Iterable[str],
+) -> list[T_RECORD | ClaimCheck[T_RECORD]]:
+    """
+    Same as :meth:`~unistream.abstraction.AbcRecord.deserialize_many`, but
+    the claim check references are returned as :class:`ClaimCheck`.
+    """
+    return _merge(
+        list(data_list),
+        record_class.deserialize_many,
+        lambda data: ClaimCheck.from_data(record_class, data),
+    )
+
+
+def deserialize_many_bytes(
+    record_class: type[T_RECORD],
+    data_list: Iterable[bytes | memoryview],
+    trusted: bool = False,
+) -> list[T_RECORD | ClaimCheck[T_RECORD]]:
+    """
+    Same as :meth:`~unistream.abstraction.AbcRecord.deserialize_many_bytes`,
+    but the claim check references are returned as :class:`ClaimCheck`.
+    """
+    return _merge(
+        list(data_list),
+        lambda data_list: record_class.deserialize_many_bytes(data_list, trusted=trusted),
+        lambda data: ClaimCheck.from_data(record_class, data),
+    )
+
+
+def to_lazy_records(
+    record_class: type[T_RECORD],
+    data_list: Iterable[str],
+) -> list[LazyRecord[T_RECORD]]:
+    """
+    Same as :meth:`~unistream.records.lazy.LazyRecord.from_data_list`, but
+    the claim check references are returned as :class:`ClaimCheck`.
+    """
+    return [
+        ClaimCheck.from_data(record_class, data)
+        if is_claim_check(data)
+        else LazyRecord.from_data(record_class, data)
+        for data in data_list
+    ]
+
+
+def get_blob_paths(records: Iterable[AbcRecord | LazyRecord]) -> set[str]:
+    """
+    Get the blob paths of the claim check references in the records.
+    """
+    return {record.path for record in records if isinstance(record, ClaimCheck)}
+
+
+def delete_blobs(records: Iterable[AbcRecord | LazyRecord]):
+    """
+    Delete the blob files of the claim check references in the records,
+    for example after sending the failed records to a DLQ. The blobs are
+    shared by the references to the same content, make sure no other
+    reference still needs them.
+    """
+    for record in records:
+        if isinstance(record, ClaimCheck):
+            record.delete_blob()
+
+
+@dataclasses.dataclass
+class ClaimCheckConfig(BaseModel):
+    """
+    The claim check configuration for :class:`~unistream.producer.BaseProducer`.
+
+    :param dir_blob: the directory of the blob files. The blob of a record
+        is stored at ``${dir_blob}/${sha256[:2]}/${sha256}``, where ``sha256``
+        is the hash of the serialized record.
+    :param threshold: the records with a UTF-8 encoded serialized size larger
+        than this number of bytes are offloaded to the blob directory.
+    """
+
+    dir_blob: Path = dataclasses.field(default=REQ)
+    threshold: int = dataclasses.field(default=256_000)
+
+    def write_blob(self, data: bytes) -> Path:
+        """
+        Write the blob to its content address, the same content is written once.
+        The blob is written to a temp file first, so a crash never leaves
+        a partial blob. Writing an existing blob again updates its modification
+        time, which restarts its retention, see :meth:`delete_expired_blobs`.
+        """
+        key = hashlib.sha256(data).hexdigest()
+        path = Path(self.dir_blob).joinpath(key[:2], key)
+        if path.exists() is False:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path_tmp = path.parent.joinpath(f"{key}.{os.getpid()}.tmp")
+            path_tmp.write_bytes(data)
+            os.replace(path_tmp, path)
+        else:
+            os.utime(path)
+        return path
+
+    def delete_expired_blobs(self, retention: float) -> int:
+        """
+        Delete the blob files, and the temp files left by a crash, that are
+        not written for ``retention`` seconds.
+
+        :param retention: the retention in seconds, it has to be longer than
+            a record can stay in the buffer and the stream before it is consumed.
+
+        :return: the number of deleted files.
+        """
+        expire = time.time() - retention
+        n_deleted = 0
+        for path in Path(self.dir_blob).glob("*/*"):
+            try:
+                if path.stat().st_mtime < expire:
+                    path.unlink()
+                    n_deleted += 1
+            except FileNotFoundError:  # pragma: no cover
+                pass
+        return n_deleted
+
+    def offload(
+        self,
+        record: T_RECORD,
+    ) -> T_RECORD | ClaimCheck[T_RECORD]:
+        """
+        Return a :class:`ClaimCheck` that references the blob of the record
+        if the record is larger than the threshold, otherwise return the record.
+        """
+        data = record.serialize()
+        if get_n_bytes(data) <= self.threshold:
+            return record
+        blob = data.encode("utf-8")
+        path = self.write_blob(blob)
+        return ClaimCheck.new(
+            record_class=type(record),
+            id=record.id,
+            create_at=record.create_at,
+            path=str(path.absolute()),
+            n_bytes=len(blob),
+        )
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements the JSON codec registry used by
+:class:`~unistream.records.dataclass.DataClassRecord`.
+
+A codec converts a JSON compatible Python object to a string and back. All
+built-in codecs produce standard JSON, so data written by one codec can always
+be read back by any other codec. This is important because WAL files and sink
+files written before switching the codec must still be readable.
+
+Built-in codecs:
+
+- ``"json"``: the standard library :mod:`json`. Always available.
+- ``"orjson"``: `orjson <https://github.com/ijl/orjson>`_, if installed.
+- ``"msgspec"``: `msgspec <https://jcristharif.com/msgspec/>`_, if installed.
+- ``"auto"``: the fastest installed codec, in the order of
+    ``orjson``, ``msgspec``, ``json``.
+
+.. note::
+
+    ``orjson`` and ``msgspec`` output compact JSON (no whitespace after ``:``
+    and ``,``) and don't escape non-ASCII characters, so their output is not
+    the same bytes as the ``json`` codec output. They decode each other's
+    output without any problem.
+
+    The non-ASCII characters include the Unicode line boundaries, such as
+    U+2028, U+2029 and U+0085, which :meth:`str.splitlines` treats as line
+    breaks. So a file in the text format has to be split on ``"\\n"`` only,
+    see :func:`unistream.framing.split_lines`.
+"""
+
+import typing as T
+import json
+from collections.abc import Iterable
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+
+class BaseCodec:
+    """
+    Base class for JSON codec implementations.
+
+    Subclasses have to implement :meth:`BaseCodec.dumps` and :meth:`BaseCodec.loads`.
+    The batch method :meth:`BaseCodec.loads_many` decodes many strings with one
+    parser call by joining them into a JSON array.
+
+    :param name: the name of the codec in the registry.
+    """
+
+    name: str = ""
+
+    def is_available(self) -> bool:
+        """
+        Return True if the underlying library is installed.
+        """
+        return True
+
+    def dumps(self, obj: T.Any) -> str:
+        """
+        Encode a JSON compatible object to a string.
+        """
+        raise NotImplementedError
+
+    def loads(self, data: str | bytes) -> T.Any:
+        """
+        Decode a string to a JSON compatible object.
+        """
+        raise NotImplementedError
+
+    def loads_many(self, data_list: Iterable[str]) -> list[T.Any]:
+        """
+        Decode many strings to a list of JSON compatible objects.
+        """
+        return self.loads(f"[{','.join(data_list)}]")
+
+    def loads_bytes(self, data: bytes | memoryview) -> T.Any:
+        """
+        Decode UTF-8 encoded bytes, or a memoryview of them, to a JSON
+        compatible object, without creating a ``str`` first if the library
+        can parse bytes natively.
+        """
+        return self.loads(bytes(data))
+
+    def loads_many_bytes(self, data_list: Iterable[bytes | memoryview]) -> list[T.Any]:
+        """
+        Decode many UTF-8 encoded bytes to a list of JSON compatible objects.
+        """
+        return self.loads_bytes(b"[" + b",".join(data_list) + b"]")
+
+
+class JsonCodec(BaseCodec):
+    """
+    Codec using the standard library :mod:`json`.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: T.Any) -> str:
+        return json.dumps(obj)
+
+    def loads(self, data: str | bytes) -> T.Any:
+        return json.loads(data)
+
+    def loads_bytes(self, data: bytes | memoryview) -> T.Any:
+        # skip the encoding detection of ``json.loads(bytes)``
+        return json.loads(str(data, "utf-8"))
+
+
+class OrjsonCodec(BaseCodec):
+    """
+    Codec using `orjson <https://github.com/ijl/orjson>`_.
+    """
+
+    name = "orjson"
+
+    def is_available(self) -> bool:
+        return orjson is not None
+
+    def dumps(self, obj: T.Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, data: str | bytes) -> T.Any:
+        return orjson.loads(data)
+
+    def loads_bytes(self, data: bytes | memoryview) -> T.Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(BaseCodec):
+    """
+    Codec using `msgspec <https://jcristharif.com/msgspec/>`_.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is not None:  # pragma: no cover
+            self._encode = msgspec.json.Encoder().encode
+            self._decode = msgspec.json.Decoder().decode
+
+    def is_available(self) -> bool:
+        return msgspec is not None
+
+    def dumps(self, obj: T.Any) -> str:  # pragma: no cover
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, data: str | bytes) -> T.Any:  # pragma: no cover
+        return self._decode(data)
+
+    def loads_bytes(self, data: bytes | memoryview) -> T.Any:  # pragma: no cover
+        return self._decode(data)
+
+
+_codec_registry: dict[str, BaseCodec] = dict()
+
+_auto_codec_names = ["orjson", "msgspec", "json"]
+
+
+def register_codec(codec: BaseCodec):
+    """
+    Register a codec instance by its name. An existing codec with the same
+    name is replaced.
+    """
+    _codec_registry[codec.name] = codec
+
+
+def get_codec(name: str) -> BaseCodec:
+    """
+    Get a registered and installed codec by name. Use ``"auto"`` to get
+    the fastest installed codec.
+
+    :raises KeyError: the codec is not registered.
+    :raises ImportError: the codec is registered, but the library is not installed.
+    """
+    if name == "auto":
+        for codec_name in _auto_codec_names:
+            codec = _codec_registry[codec_name]
+            if codec.is_available():
+                return codec
+    codec = _codec_registry[name]
+    if codec.is_available() is False:
+        raise ImportError(f"the library of codec {name!r} is not installed!")
+    return codec
+
+
+register_codec(JsonCodec())
+register_codec(OrjsonCodec())
+register_codec(MsgspecCodec())
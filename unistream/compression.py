@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements the compression registry used by
+:class:`~unistream.buffers.file_buffer.FileBuffer` (rotated WAL files) and
+:class:`~unistream.producers.simple.SimpleProducer` (sink file).
+
+The serialized records are JSON and compress very well, so compressing them
+trades CPU time for disk I/O. A compressed file is a concatenation of one or
+more compressed blocks, for example one block per batch in a sink file. Each
+block is the compressed content of a self-contained file, in the text or the
+framing format, with a block header::
+
+    BLOCK_MAGIC                               4 bytes, b"USB1"
+    n_records                                 4 bytes, big-endian uint32
+    size                                      4 bytes, big-endian uint32
+    the compressed content                    size bytes
+
+Readers detect compressed files by the block magic, and the algorithm by the
+magic bytes of the compressed content, see :func:`decompress_auto`. They can
+skip the blocks before a record number by their header without reading them,
+see :func:`iter_blocks`.
+
+Built-in compressions:
+
+- ``"zlib"``: the standard library :mod:`zlib`. Fast, moderate ratio.
+- ``"bz2"``: the standard library :mod:`bz2`. Slow, good ratio.
+- ``"lzma"``: the standard library :mod:`lzma`. Slowest, best ratio.
+- ``"zstd"``: `zstandard <https://github.com/indygreg/python-zstandard>`_,
+    if installed. Fastest, good ratio.
+- ``"dict"``: :class:`DictCompression`, stores each repeated JSON string once
+    per block. No extra dependency, the block stays mostly readable.
+
+The ``level`` argument chooses the tradeoff within one algorithm. A low level
+(e.g. ``1``) uses little CPU and still shrinks JSON a lot, it is a good
+choice when the disk is the bottleneck. A high level (e.g. ``9``) spends
+more CPU for smaller files. ``None`` uses the default level of the library.
+"""
+
+import typing as T
+import io
+import re
+import bz2
+import lzma
+import zlib
+import struct
+import collections
+from collections.abc import Iterator
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+BLOCK_MAGIC = b"USB1"
+_BLOCK_HEADER = struct.Struct(">4sII")
+
+
+class BaseCompression:
+    """
+    Base class for compression implementations.
+
+    Subclasses have to implement :meth:`BaseCompression.compress` and
+    :meth:`BaseCompression.decompressobj`.
+
+    :param name: the name of the compression in the registry.
+    :param magic: the magic bytes at the beginning of the compressed data.
+    """
+
+    name: str = ""
+    magic: bytes = b""
+
+    def is_available(self) -> bool:
+        """
+        Return True if the underlying library is installed.
+        """
+        return True
+
+    def match(self, data: bytes) -> bool:
+        """
+        Return True if the data is compressed by this compression.
+        """
+        return data.startswith(self.magic)
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        """
+        Compress the data to the compressed content of one block, without
+        the block header, see :meth:`BaseCompression.compress_block`.
+        """
+        raise NotImplementedError
+
+    def decompressobj(self):
+        """
+        Create a decompressor object for one compressed stream. It has to have
+        the ``decompress()`` method and the ``unused_data`` attribute.
+        """
+        raise NotImplementedError
+
+    def compress_block(
+        self,
+        data: bytes,
+        n_records: int = 0,
+        level: int | None = None,
+    ) -> bytes:
+        """
+        Compress the data to one compressed block with the block header.
+
+        :param n_records: the number of records in the data.
+        """
+        block = self.compress(data, level=level)
+        return _BLOCK_HEADER.pack(BLOCK_MAGIC, n_records, len(block)) + block
+
+    def decompress(self, data: bytes) -> bytes:
+        """
+        Decompress the compressed content of a block, which can be many
+        concatenated compressed streams.
+        """
+        chunks = list()
+        while data:
+            decompressor = self.decompressobj()
+            chunks.append(decompressor.decompress(data))
+            data = decompressor.unused_data
+        return b"".join(chunks)
+
+
+class ZlibCompression(BaseCompression):
+    """
+    Compression using the standard library :mod:`zlib`.
+    """
+
+    name = "zlib"
+
+    def match(self, data: bytes) -> bool:
+        # zlib doesn't have a fixed magic, check the two bytes stream header,
+        # it is reliable enough because it is only checked after the block magic
+        return (
+            len(data) >= 2
+            and data[0] == 0x78
+            and (data[0] * 256 + data[1]) % 31 == 0
+        )
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        if level is None:
+            level = -1
+        return zlib.compress(data, level)
+
+    def decompressobj(self):
+        return zlib.decompressobj()
+
+
+class Bz2Compression(BaseCompression):
+    """
+    Compression using the standard library :mod:`bz2`.
+    """
+
+    name = "bz2"
+    magic = b"BZh"
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        if level is None:
+            level = 9
+        return bz2.compress(data, level)
+
+    def decompressobj(self):
+        return bz2.BZ2Decompressor()
+
+
+class LzmaCompression(BaseCompression):
+    """
+    Compression using the standard library :mod:`lzma`, in the ``.xz`` format.
+    """
+
+    name = "lzma"
+    magic = b"\xfd7zXZ\x00"
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        return lzma.compress(data, preset=level)
+
+    def decompressobj(self):
+        return lzma.LZMADecompressor()
+
+
+class ZstdCompression(BaseCompression):
+    """
+    Compression using `zstandard <https://github.com/indygreg/python-zstandard>`_.
+    """
+
+    name = "zstd"
+    magic = b"\x28\xb5\x2f\xfd"
+
+    def is_available(self) -> bool:
+        return zstandard is not None
+
+    def compress(
+        self, data: bytes, level: int | None = None
+    ) -> bytes:  # pragma: no cover
+        if level is None:
+            level = 3
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def decompressobj(self):  # pragma: no cover
+        return zstandard.ZstdDecompressor().decompressobj()
+
+
+# a NUL byte, or a JSON string token, which never has a raw control character
+_DICT_TOKEN = re.compile(rb'(\x00|"(?:[^"\\\x00-\x1f]|\\[^\x00-\x1f])*")')
+_DICT_REFERENCE = re.compile(rb"\x00(\d*);")
+_DICT_HEADER = struct.Struct(">II")
+
+
+class _DictDecompressor:
+    """
+    The decompressor object of one :class:`DictCompression` block.
+    """
+
+    def __init__(self, magic: bytes):
+        self.magic = magic
+        self.unused_data = b""
+
+    def decompress(self, data: bytes) -> bytes:
+        start = len(self.magic) + _DICT_HEADER.size
+        if len(data) < start or data[: len(self.magic)] != self.magic:
+            raise ValueError("not a dict compression block!")
+        dict_size, body_size = _DICT_HEADER.unpack_from(data, len(self.magic))
+        end = start + dict_size + body_size
+        if len(data) < end:
+            raise ValueError("the dict compression block is truncated!")
+        table = {b"": b"\x00"}
+        if dict_size:
+            tokens = data[start : start + dict_size].split(b"\n")
+            table.update({b"%d" % index: token for index, token in enumerate(tokens)})
+        self.unused_data = data[end:]
+        # the odd items are the indexes of the references
+        parts = _DICT_REFERENCE.split(data[start + dict_size : end])
+        parts[1::2] = [table[index] for index in parts[1::2]]
+        return b"".join(parts)
+
+
+class DictCompression(BaseCompression):
+    """
+    Dictionary encoding of the repeated JSON strings in a block, such as the
+    field names, tenant ids, event types and hostnames that every record of
+    a batch repeats.
+
+    Each JSON string token that appears at least ``level`` times (default 2)
+    in the block, and is longer than its reference, is stored once in
+    the dictionary at the beginning of the block and replaced by a short
+    ``\x00${index};`` reference in the body, the most frequent tokens get
+    the shortest references. A NUL byte in the input is escaped as ``\x00;``,
+    so any input, including the binary framing format, is restored byte by
+    byte. Unlike the general purpose algorithms, the body is still the
+    original text outside the replaced tokens.
+
+    Block layout: ``USD1``, the dictionary size and the body size as two
+    big-endian uint32, the newline separated tokens, the body.
+    """
+
+    name = "dict"
+    magic = b"USD1"
+
+    def compress(self, data: bytes, level: int | None = None) -> bytes:
+        min_count = 2 if level is None else level
+        # the odd items are the NUL bytes and the JSON strings
+        parts = _DICT_TOKEN.split(data)
+        tokens = parts[1::2]
+        references = dict()
+        for token, count in collections.Counter(tokens).most_common():
+            if count < min_count:
+                break
+            reference = b"\x00%d;" % len(references)
+            if len(token) > len(reference):  # never true for a NUL byte
+                references[token] = reference
+        dictionary = b"\n".join(references)
+        references[b"\x00"] = b"\x00;"
+        parts[1::2] = [references.get(token, token) for token in tokens]
+        body = b"".join(parts)
+        return b"".join(
+            [
+                self.magic,
+                _DICT_HEADER.pack(len(dictionary), len(body)),
+                dictionary,
+                body,
+            ]
+        )
+
+    def decompressobj(self):
+        return _DictDecompressor(self.magic)
+
+
+_compression_registry: dict[str, BaseCompression] = dict()
+
+
+def register_compression(compression: BaseCompression):
+    """
+    Register a compression instance by its name. An existing compression with
+    the same name is replaced.
+    """
+    _compression_registry[compression.name] = compression
+
+
+def get_compression(name: str) -> BaseCompression:
+    """
+    Get a registered and installed compression by name.
+
+    :raises KeyError: the compression is not registered.
+    :raises ImportError: the compression is registered, but the library is not installed.
+    """
+    compression = _compression_registry[name]
+    if compression.is_available() is False:
+        raise ImportError(f"the library of compression {name!r} is not installed!")
+    return compression
+
+
+def _detect_block_compression(block: bytes) -> BaseCompression | None:
+    """
+    Detect the compression of the compressed content of a block.
+    """
+    for compression in _compression_registry.values():
+        if compression.match(block):
+            return compression
+    return None
+
+
+def detect_compression(data: bytes) -> BaseCompression | None:
+    """
+    Detect the compression of the data by the block header and the magic
+    bytes of the first block. Return None if the data is not compressed.
+    """
+    if data.startswith(BLOCK_MAGIC) is False:
+        return None
+    return _detect_block_compression(data[_BLOCK_HEADER.size :])
+
+
+def iter_blocks(
+    f: T.BinaryIO,
+    skip: int = 0,
+) -> Iterator[tuple[int, bytes]]:
+    """
+    Iterate the compressed blocks of a file from the current position, and
+    decompress them one by one. The blocks whose records are all in the first
+    ``skip`` records are skipped by their header, without reading them.
+
+    :return: an iterator of the number of records to skip in the block,
+        and the decompressed content of the block.
+    """
+    while True:
+        header = f.read(_BLOCK_HEADER.size)
+        if not header:
+            return
+        if len(header) < _BLOCK_HEADER.size or header[:4] != BLOCK_MAGIC:
+            raise ValueError("not a compressed block!")
+        _, n_records, size = _BLOCK_HEADER.unpack(header)
+        if skip and n_records <= skip:
+            f.seek(size, io.SEEK_CUR)
+            skip -= n_records
+            continue
+        block = f.read(size)
+        if len(block) < size:
+            raise ValueError("the compressed block is truncated!")
+        compression = _detect_block_compression(block)
+        if compression is None:
+            raise ValueError("unknown compression of the block!")
+        yield skip, get_compression(compression.name).decompress(block)
+        skip = 0
+
+
+def decompress_blocks(data: bytes) -> list[bytes]:
+    """
+    Decompress each block of the data. If the data is not compressed, it is
+    the only item of the returned list.
+    """
+    if data.startswith(BLOCK_MAGIC) is False:
+        return [data]
+    return [content for _, content in iter_blocks(io.BytesIO(data))]
+
+
+def decompress_auto(data: bytes) -> bytes:
+    """
+    Decompress the data if it is compressed, otherwise return it as it is.
+    The contents of the blocks are concatenated, read a file of many blocks
+    in the framing format with :func:`decompress_blocks` instead.
+    """
+    contents = decompress_blocks(data)
+    if len(contents) == 1:
+        return contents[0]
+    return b"".join(contents)
+
+
+register_compression(ZlibCompression())
+register_compression(Bz2Compression())
+register_compression(LzmaCompression())
+register_compression(ZstdCompression())
+register_compression(DictCompression())
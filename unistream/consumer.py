@@ -16,6 +16,7 @@ This section is for this project maintainer only.
 import typing as T
 import time
 import dataclasses
+from pathlib import Path
 
 from func_args.api import REQ, BaseModel
 from tenacity import retry, wait_exponential, stop_after_attempt, RetryError
@@ -23,6 +24,10 @@ from tenacity import retry, wait_exponential, stop_after_attempt, RetryError
 from .exc import StreamIsClosedError
 from .logger import logger
 from .abstraction import AbcRecord, AbcConsumer
+from .records.lazy import materialize
+from .aggregation import AggregatedRecord, deaggregate
+from .claim_check import ClaimCheck, get_blob_paths
+from .chunking import reassemble
 from .checkpoint import T_POINTER, BaseCheckPoint, StatusEnum
 
 
@@ -54,6 +59,26 @@ class BaseConsumer(AbcConsumer, BaseModel):
     :param skip_error: if True, skip the error and continue to process the next record.
         this is the most common use case. if False, raise the error and stop the consumer.
     :param delay: the delay time between pulling two batches.
+    :param aggregated: if True, the records in the stream are
+        :class:`~unistream.aggregation.AggregatedRecord` written by a producer
+        with an :class:`~unistream.aggregation.AggregationConfig`. They are
+        unpacked right after :meth:`get_records`, the checkpoint tracks the
+        inner records. The pointer still counts the records in the stream.
+    :param chunked: if True, the stream may have
+        :class:`~unistream.chunking.ChunkRecord` written by a producer with
+        a :class:`~unistream.chunking.ChunkingConfig`. They are joined back
+        into the logical records right after :meth:`get_records`, before the
+        aggregated records are unpacked. A group of chunks cut by the
+        ``limit`` is read again in the next batch, so the pointer has to be
+        an integer offset, like the one of
+        :class:`~unistream.consumers.simple.SimpleConsumer`.
+    :param keep_blobs: if False (default), the blobs of the
+        :class:`~unistream.claim_check.ClaimCheck` references of the succeeded
+        records are deleted at the start of the next batch, once the checkpoint
+        records file no longer points to them. After a restart, they are found
+        in the checkpoint records file. If True, the blobs are never
+        deleted by the consumer, see the blob retention of
+        :mod:`unistream.claim_check`.
     """
 
     record_class: type[AbcRecord] = dataclasses.field(default=REQ)
@@ -65,6 +90,25 @@ class BaseConsumer(AbcConsumer, BaseModel):
     exp_backoff_max: int = dataclasses.field(default=REQ)
     skip_error: bool = dataclasses.field(default=REQ)
     delay: int | float = dataclasses.field(default=REQ)
+    aggregated: bool = dataclasses.field(default=False)
+    chunked: bool = dataclasses.field(default=False)
+    keep_blobs: bool = dataclasses.field(default=False)
+
+    # the blob paths of the succeeded records of the last batch,
+    # None until they are collected in this process
+    _blob_paths: set[str] | None = dataclasses.field(
+        default=None, init=False, repr=False
+    )
+
+    @property
+    def wire_record_class(self) -> type[AbcRecord]:
+        """
+        The record class of the records in the stream system.
+        :meth:`get_records` should decode the records with it.
+        """
+        if self.aggregated:
+            return AggregatedRecord
+        return self.record_class
 
     def get_records(
         self,
@@ -84,6 +128,9 @@ class BaseConsumer(AbcConsumer, BaseModel):
             and the second one is the value of the next pointer for the next batch
             if we successfully process this batch of records.
 
+        Decode the records with :attr:`wire_record_class`, so the aggregated
+        records are supported.
+
         .. important::
 
             If you need additional parameters other than the :class:`BaseConsumer`
@@ -92,6 +139,25 @@ class BaseConsumer(AbcConsumer, BaseModel):
         """
         raise NotImplementedError
 
+    def _reassemble(
+        self,
+        records: list[AbcRecord],
+        next_pointer: int,
+    ) -> tuple[list[AbcRecord], int]:
+        """
+        Join the chunks into the logical records. If the batch ends in the
+        middle of a group, move the next pointer back to the first chunk of
+        the group. If the batch has nothing but that group, read the whole
+        group again.
+        """
+        n_records = len(records)
+        results, n_pending = reassemble(records, self.wire_record_class)
+        if n_pending and n_pending == n_records:
+            records, next_pointer = self.get_records(limit=records[0].n_chunks)
+            n_records = len(records)
+            results, n_pending = reassemble(records, self.wire_record_class)
+        return results, next_pointer - n_pending
+
     def process_record(self, record: AbcRecord):
         """
         **[End User]** This method defines how to process a record.
@@ -165,6 +231,7 @@ class BaseConsumer(AbcConsumer, BaseModel):
             return None, None
 
         self.checkpoint.batch[record.id].status = StatusEnum.in_progress.value
+        record = materialize(record)
 
         _process_record_with_retry = retry(
             wait=wait_exponential(
@@ -195,6 +262,45 @@ class BaseConsumer(AbcConsumer, BaseModel):
             else:
                 e.reraise()
 
+    def _collect_blobs(self, records: list[AbcRecord]):
+        """
+        Remember the blobs of the succeeded claim check references of the
+        batch, except the ones a not succeeded record of the batch references.
+        """
+        succeeded = StatusEnum.succeeded.value
+        blob_paths = set()
+        kept_paths = set()
+        for record in records:
+            if isinstance(record, ClaimCheck):
+                if self.checkpoint.batch[record.id].status == succeeded:
+                    blob_paths.add(record.path)
+                else:
+                    kept_paths.add(record.path)
+        self._blob_paths = blob_paths - kept_paths
+
+    def _recover_blobs(self):
+        """
+        Collect the blobs of the last batch from the checkpoint records file,
+        when the consumer starts, so the blobs of the batch finished before
+        a restart are still deleted.
+        """
+        self._collect_blobs(
+            self.checkpoint.load_records(
+                record_class=self.record_class,
+                lazy=True,
+            )
+        )
+
+    def _delete_blobs(self, records: list[AbcRecord]):
+        """
+        Delete the blobs of the last batch, except the ones referenced by
+        the records of the new batch.
+        """
+        if self._blob_paths:
+            for path in self._blob_paths - get_blob_paths(records):
+                Path(path).unlink(missing_ok=True)
+            self._blob_paths = set()
+
     @logger.emoji_block(
         msg="process batch in sequence",
         emoji="⏳",
@@ -202,19 +308,33 @@ class BaseConsumer(AbcConsumer, BaseModel):
     def _process_batch_in_sequence(self):
         # check if we should call get_records API
         if self.checkpoint.is_ready_for_next_batch():
+            if self._blob_paths is None and self.keep_blobs is False:
+                self._recover_blobs()
             # get records from the stream system
             records, next_pointer = self.get_records()
+            if self.chunked:
+                records, next_pointer = self._reassemble(records, next_pointer)
+            if self.aggregated:
+                records = deaggregate(records, self.record_class)
             # update and persist checkpoint
             self.checkpoint.update_for_new_batch(records, next_pointer)
             self.checkpoint.dump()
             self.checkpoint.dump_records(records)
+            # the records file no longer points to the last batch
+            self._delete_blobs(records)
         else:
-            # get records from the checkpoint
-            records = self.checkpoint.load_records(record_class=self.record_class)
+            # get records from the checkpoint, only decode the header up front,
+            # the records already processed are skipped by their id
+            records = self.checkpoint.load_records(
+                record_class=self.record_class,
+                lazy=True,
+            )
         # process all record
         for record in records:
             flag, process_record_res = self._process_record(record)
         self.commit()
+        if self.keep_blobs is False:
+            self._collect_blobs(records)
 
     def process_batch(
         self,
@@ -5,17 +5,37 @@ Implements :class:`SimpleConsumer`, a file-based consumer for local development
 and testing.
 """
 
+import typing as T
+import io
 import dataclasses
 from pathlib import Path
 from itertools import islice
 
 from func_args.api import REQ
 
+from ..compression import BLOCK_MAGIC, iter_blocks
+from ..framing import MAGIC, iter_frames, skip_frames
 from ..abstraction import AbcRecord
+from ..chunking import deserialize_many_bytes
 from ..checkpoint import T_POINTER, BaseCheckPoint
 from ..consumer import BaseConsumer
 
 
+def _read_lines(f: T.BinaryIO, skip: int, limit: int) -> list[bytes]:
+    """
+    Read at most ``limit`` serialized records after the first ``skip`` records
+    from a file in either the framing format or the text format.
+    """
+    if f.read(len(MAGIC)) == MAGIC:
+        # skip the frames before the pointer without reading them
+        skip_frames(f, skip)
+        return list(islice(iter_frames(f), limit))
+    f.seek(0)
+    for _ in range(skip):
+        next(f)
+    return list(islice(f, limit))
+
+
 @dataclasses.dataclass
 class SimpleConsumer(BaseConsumer):
     """
@@ -43,7 +63,18 @@ class SimpleConsumer(BaseConsumer):
     :param skip_error: if True, skip the error and continue to process the next record.
         this is the most common use case. if False, raise the error and stop the consumer.
     :param delay: the delay time between pulling two batches.
-    :param path_source: the path of the source file to read from.
+    :param aggregated: if True, the source file is written by a
+        :class:`~unistream.producers.simple.SimpleProducer` with record aggregation.
+    :param chunked: if True, the source file is written by a
+        :class:`~unistream.producers.simple.SimpleProducer` with chunking.
+    :param keep_blobs: if True, never delete the claim check blobs,
+        see :class:`~unistream.consumer.BaseConsumer`.
+    :param path_source: the path of the source file to read from. It can be
+        in either the newline-delimited text format or the binary framing format
+        of :mod:`unistream.framing`, and optionally compressed, see
+        :mod:`unistream.compression`, all detected automatically. The pointer is
+        the line number or the frame number. The blocks of a compressed file
+        before the pointer are skipped by their header, without reading them.
     :param path_dlq: the path of the dead letter queue file to write to.
     """
 
@@ -64,6 +95,9 @@ class SimpleConsumer(BaseConsumer):
         exp_backoff_max: int = 60,
         skip_error: bool = True,
         delay: int | float = 0,
+        aggregated: bool = False,
+        chunked: bool = False,
+        keep_blobs: bool = False,
     ):
         return cls(
             record_class=record_class,
@@ -77,6 +111,9 @@ class SimpleConsumer(BaseConsumer):
             exp_backoff_max=exp_backoff_max,
             skip_error=skip_error,
             delay=delay,
+            aggregated=aggregated,
+            chunked=chunked,
+            keep_blobs=keep_blobs,
         )
 
     def get_records(
@@ -85,15 +122,24 @@ class SimpleConsumer(BaseConsumer):
     ) -> tuple[list[AbcRecord], T_POINTER]:
         if limit is None:
             limit = self.limit
-        records = list()
+        lines = list()
         try:
-            with self.path_source.open("r") as f:
-                for _ in range(self.checkpoint.start_pointer):
-                    next(f)
-                for line in islice(f, limit):
-                    record = self.record_class.deserialize(line)
-                    records.append(record)
+            with self.path_source.open("rb") as f:
+                if f.read(len(BLOCK_MAGIC)) == BLOCK_MAGIC:
+                    f.seek(0)
+                    # each block is a self-contained file
+                    for skip, content in iter_blocks(f, self.checkpoint.start_pointer):
+                        lines.extend(
+                            _read_lines(io.BytesIO(content), skip, limit - len(lines))
+                        )
+                        if len(lines) >= limit:
+                            break
+                else:
+                    f.seek(0)
+                    lines = _read_lines(f, self.checkpoint.start_pointer, limit)
         except FileNotFoundError:
             pass
+        # the lines are bytes, decode them without creating str first
+        records = deserialize_many_bytes(self.wire_record_class, lines, trusted=True)
         next_pointer = self.checkpoint.start_pointer + len(records)
         return records, next_pointer
@@ -9,6 +9,24 @@ class BufferIsEmptyError(IndexError):
     pass
 
 
+class BufferIsFullError(Exception):
+    """
+    Raised when try to put item to a full bounded buffer.
+    See :class:`~unistream.buffers.memory_buffer.MemoryBuffer`.
+    """
+
+    pass
+
+
+class FrameError(ValueError):
+    """
+    Raised when a file in the framing format is corrupted or truncated.
+    See :mod:`unistream.framing`.
+    """
+
+    pass
+
+
 class SendError(Exception):
     """
     Raised when producer failed to send records.
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements the length-prefixed, checksummed binary framing format, an optional
+alternative to the newline-delimited text format used by
+:class:`~unistream.buffers.file_buffer.FileBuffer` (WAL files),
+:class:`~unistream.producers.simple.SimpleProducer` (sink file) and
+:class:`~unistream.checkpoints.simple.SimpleCheckpoint` (records file).
+
+File layout::
+
+    MAGIC                                     4 bytes, b"USF1"
+    frame 1: length | crc32 | payload         4 + 4 + length bytes
+    frame 2: length | crc32 | payload
+    ...
+    footer (optional): marker | count | crc32 4 + 8 + 4 bytes
+
+- ``length`` is the big-endian unsigned size of the payload.
+- ``crc32`` is the :func:`zlib.crc32` of the payload.
+- The footer starts with ``length = 0xFFFFFFFF``, followed by the number of
+    frames in the file and the crc32 of the count bytes. It is written when
+    the file is closed for good, for example when a WAL file is rotated,
+    so the number of records can be read without scanning the file.
+
+Compared to the text format, payloads may contain newlines, and readers can
+skip, count and validate frames without decoding the payloads.
+"""
+
+import typing as T
+import zlib
+import struct
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .exc import FrameError
+from .compression import decompress_blocks
+
+MAGIC = b"USF1"
+_HEADER = struct.Struct(">II")
+_FOOTER = struct.Struct(">IQI")
+_FOOTER_MARKER = 0xFFFFFFFF
+_COUNT = struct.Struct(">Q")
+
+
+def encode_frame(payload: bytes) -> bytes:
+    """
+    Encode one payload to a frame.
+    """
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def encode_footer(n_frames: int) -> bytes:
+    """
+    Encode the footer that stores the number of frames in the file.
+    """
+    return _FOOTER.pack(
+        _FOOTER_MARKER, n_frames, zlib.crc32(_COUNT.pack(n_frames))
+    )
+
+
+class FrameWriter:
+    """
+    Write frames to a binary file object. The magic bytes are written first
+    if the file is empty.
+
+    :param f: a binary file object opened in ``"wb"`` or ``"ab"`` mode.
+    :param n_frames: the number of frames written by this writer.
+    """
+
+    def __init__(self, f: T.BinaryIO):
+        self.f = f
+        if f.tell() == 0:
+            f.write(MAGIC)
+        self.n_frames = 0
+
+    def write(self, payload: bytes):
+        """
+        Write one payload as a frame.
+        """
+        self.f.write(encode_frame(payload))
+        self.n_frames += 1
+
+    def write_many(self, payloads: Iterable[bytes]):
+        """
+        Write many payloads with one ``write`` call.
+        """
+        frames = [encode_frame(payload) for payload in payloads]
+        self.f.write(b"".join(frames))
+        self.n_frames += len(frames)
+
+    def write_footer(self, n_frames: int | None = None):
+        """
+        Write the footer. After that, no more frames can be written.
+
+        :param n_frames: the total number of frames in the file, default to
+            the number of frames written by this writer.
+        """
+        if n_frames is None:
+            n_frames = self.n_frames
+        self.f.write(encode_footer(n_frames))
+
+
+def _read_header(f: T.BinaryIO) -> tuple[int, int] | None:
+    """
+    Read the next frame header. Return None at the end of the file or
+    at the footer.
+    """
+    header = f.read(_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        raise FrameError("truncated frame header")
+    length, crc = _HEADER.unpack(header)
+    if length == _FOOTER_MARKER:
+        f.seek(-_HEADER.size, 1)  # stay at the footer
+        return None
+    return length, crc
+
+
+def check_magic(f: T.BinaryIO):
+    """
+    Read and check the magic bytes at the beginning of the file.
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise FrameError("not a framed file")
+
+
+def iter_frames(
+    f: T.BinaryIO,
+    validate: bool = True,
+) -> Iterator[bytes]:
+    """
+    Iterate the payloads of the frames, starting from the current position
+    of the file object, which has to be right after the magic bytes or
+    at a frame boundary.
+
+    :param validate: if True, verify the crc32 of each payload.
+    """
+    while 1:
+        header = _read_header(f)
+        if header is None:
+            return
+        length, crc = header
+        payload = f.read(length)
+        if len(payload) < length:
+            raise FrameError("truncated frame payload")
+        if validate and zlib.crc32(payload) != crc:
+            raise FrameError("frame crc32 mismatch")
+        yield payload
+
+
+def iter_frame_views(
+    buffer: bytes | memoryview,
+    validate: bool = True,
+) -> Iterator[memoryview]:
+    """
+    Iterate the payloads of the frames in the content of a framed file, as
+    memoryview slices of the content, without copying them.
+
+    :param buffer: the full content of the file, starting with the magic bytes.
+    :param validate: if True, verify the crc32 of each payload.
+    """
+    view = memoryview(buffer)
+    size = len(view)
+    offset = len(MAGIC)
+    while offset < size:
+        if offset + _HEADER.size > size:
+            raise FrameError("truncated frame header")
+        length, crc = _HEADER.unpack_from(view, offset)
+        if length == _FOOTER_MARKER:
+            return
+        offset += _HEADER.size
+        end = offset + length
+        if end > size:
+            raise FrameError("truncated frame payload")
+        payload = view[offset:end]
+        if validate and zlib.crc32(payload) != crc:
+            raise FrameError("frame crc32 mismatch")
+        yield payload
+        offset = end
+
+
+def recover_frame_views(
+    buffer: bytes | memoryview,
+) -> tuple[list[memoryview], int, int | None]:
+    """
+    Read the valid frames of the content of a framed file that may be cut
+    by a crash. Same as :func:`iter_frame_views`, but it stops at the first
+    truncated frame or crc32 mismatch instead of raising :class:`FrameError`.
+
+    :param buffer: the full content of the file, starting with the magic bytes.
+
+    :return: a three-item tuple, the payloads of the valid frames, the size
+        of the valid content, and the number of frames in the footer, None
+        if there is no valid footer. If the magic bytes are truncated, the
+        size of the valid content is 0.
+    """
+    view = memoryview(buffer)
+    size = len(view)
+    if view[: len(MAGIC)] != MAGIC:
+        return [], 0, None
+    payloads = list()
+    offset = len(MAGIC)
+    while offset + _HEADER.size <= size:
+        length, crc = _HEADER.unpack_from(view, offset)
+        if length == _FOOTER_MARKER:
+            if offset + _FOOTER.size <= size:
+                _, n_frames, footer_crc = _FOOTER.unpack_from(view, offset)
+                if (
+                    zlib.crc32(_COUNT.pack(n_frames)) == footer_crc
+                    and n_frames == len(payloads)
+                ):
+                    return payloads, offset + _FOOTER.size, n_frames
+            break
+        end = offset + _HEADER.size + length
+        if end > size:
+            break
+        payload = view[offset + _HEADER.size : end]
+        if zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        offset = end
+    return payloads, offset, None
+
+
+def skip_frames(f: T.BinaryIO, n: int) -> int:
+    """
+    Skip ``n`` frames by seeking over the payloads, without reading them.
+
+    :return: the number of frames skipped, less than ``n`` if the end of the
+        file is reached.
+    """
+    skipped = 0
+    while skipped < n:
+        header = _read_header(f)
+        if header is None:
+            break
+        f.seek(header[0], 1)
+        skipped += 1
+    return skipped
+
+
+def read_footer(f: T.BinaryIO) -> int | None:
+    """
+    Read the number of frames from the footer. Return None if the file
+    doesn't have a footer. The position of the file object is changed.
+    """
+    size = f.seek(0, 2)
+    if size < len(MAGIC) + _FOOTER.size:
+        return None
+    f.seek(size - _FOOTER.size)
+    marker, n_frames, crc = _FOOTER.unpack(f.read(_FOOTER.size))
+    if marker == _FOOTER_MARKER and zlib.crc32(_COUNT.pack(n_frames)) == crc:
+        return n_frames
+    return None
+
+
+def is_framed_file(path: Path) -> bool:
+    """
+    Check whether the file uses the framing format by its magic bytes.
+    """
+    with path.open("rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def count_frames(path: Path) -> int:
+    """
+    Count the number of frames in a framed file. It uses the footer if
+    available, otherwise it seeks over all frames without reading the payloads.
+    """
+    with path.open("rb") as f:
+        n_frames = read_footer(f)
+        if n_frames is not None:
+            return n_frames
+        f.seek(0)
+        check_magic(f)
+        return skip_frames(f, 2**63)
+
+
+def validate_file(path: Path) -> int:
+    """
+    Read all frames and verify their crc32, and the footer if any,
+    without decoding the payloads.
+
+    :return: the number of frames.
+    """
+    with path.open("rb") as f:
+        check_magic(f)
+        n_frames = sum(1 for _ in iter_frames(f))
+        footer_n_frames = read_footer(f)
+    if footer_n_frames is not None and footer_n_frames != n_frames:
+        raise FrameError(
+            f"footer says {footer_n_frames} frames, but found {n_frames} frames"
+        )
+    return n_frames
+
+
+def read_frames(path: Path) -> list[bytes]:
+    """
+    Read all payloads from a framed file.
+    """
+    with path.open("rb") as f:
+        check_magic(f)
+        return list(iter_frames(f))
+
+
+def split_lines(content: bytes) -> list[bytes]:
+    """
+    Split the content of a file in the text format into lines, on ``b"\\n"``
+    only. Unlike :meth:`str.splitlines`, it doesn't split on the Unicode line
+    boundaries, such as U+2028, that ``orjson`` and ``msgspec`` don't escape.
+    """
+    lines = content.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    return lines
+
+
+def read_data_list(path: Path) -> list[str]:
+    """
+    Read the serialized records from a file, in either the framing format or
+    the newline-delimited text format, detected by the magic bytes. Compressed
+    files are decompressed, see :func:`unistream.compression.decompress_blocks`.
+    """
+    return [str(data, "utf-8") for data in read_data_bytes_list(path)]
+
+
+def read_data_bytes_list(path: Path) -> list[bytes | memoryview]:
+    """
+    Same as :func:`read_data_list`, but return the UTF-8 encoded serialized
+    records without decoding them, for
+    :meth:`~unistream.abstraction.AbcRecord.deserialize_many_bytes`.
+    The payloads of a framed file are memoryview slices of the file content.
+    """
+    data_list = list()
+    # each compressed block is a self-contained file
+    for content in decompress_blocks(path.read_bytes()):
+        if content.startswith(MAGIC):
+            data_list.extend(iter_frame_views(content))
+        else:
+            data_list.extend(split_lines(content))
+    return data_list
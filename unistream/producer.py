@@ -5,7 +5,9 @@ Implements :class:`RetryConfig` and :class:`BaseProducer`, the base class
 for all producer implementations.
 """
 
+import typing as T
 import dataclasses
+from collections.abc import Iterable
 from datetime import datetime
 
 from func_args.api import REQ, BaseModel
@@ -13,6 +15,10 @@ from func_args.api import REQ, BaseModel
 from .utils import get_utc_now
 from .logger import logger
 from .abstraction import AbcRecord, AbcBuffer, AbcProducer
+from .batch import RecordBatch
+from .aggregation import AggregatedRecord, AggregationConfig
+from .claim_check import ClaimCheckConfig
+from .chunking import ChunkingConfig
 
 
 def _default_exp_backoff():
@@ -99,13 +105,45 @@ class BaseProducer(AbcProducer, BaseModel):
       records to a specific streaming backend.
     - :meth:`put` — **End users** call this to send records. Already
       implemented with buffer management and retry logic.
+    - :meth:`put_many` — **End users** call this to send a burst of records,
+      see :meth:`~unistream.buffer.BaseBuffer.put_many`.
+    - :meth:`poll` — **End users** call this periodically when no record is
+      put, so the time-based flush of the buffer still happens, see
+      :meth:`~unistream.buffer.BaseBuffer.tick`.
+    - :meth:`drain` — **End users** call this to send the backlog of the
+      buffer back-to-back, for example after a sink outage.
 
     :param buffer: the :class:`~unistream.abstraction.AbcBuffer` backend for batching records.
     :param retry_config: the :class:`RetryConfig` for send retry behavior.
+    :param use_record_batch: class level setting, if True, :meth:`send` receives
+        a columnar :class:`~unistream.batch.RecordBatch` from
+        :meth:`~unistream.buffer.BaseBuffer.emit_batch` instead of a list of records.
+        Plugin developers can turn it on to do per-column work in ``send``.
+        The buffer has to be a :class:`~unistream.buffer.BaseBuffer`.
+    :param aggregation_config: the :class:`~unistream.aggregation.AggregationConfig`.
+        If set, the emitted records are packed into
+        :class:`~unistream.aggregation.AggregatedRecord` before :meth:`send`,
+        so many small records cost one record in the stream system. The
+        consumer has to set ``aggregated=True``. Default is None, no aggregation.
+    :param claim_check_config: the :class:`~unistream.claim_check.ClaimCheckConfig`.
+        If set, a large record is written to the blob directory when it enters
+        the buffer, and only a small :class:`~unistream.claim_check.ClaimCheck`
+        reference is buffered and sent. Default is None, no offloading.
+    :param chunking_config: the :class:`~unistream.chunking.ChunkingConfig`.
+        If set, the records larger than the size limit of the stream system
+        are split into :class:`~unistream.chunking.ChunkRecord` before
+        :meth:`send`, so they don't fail forever. ``send`` then receives
+        a list even if ``use_record_batch`` is True. The consumer has to set
+        ``chunked=True``. Default is None, no chunking.
     """
 
+    use_record_batch: T.ClassVar[bool] = False
+
     buffer: AbcBuffer = dataclasses.field(default=REQ)
     retry_config: RetryConfig = dataclasses.field(default=REQ)
+    aggregation_config: AggregationConfig | None = dataclasses.field(default=None)
+    claim_check_config: ClaimCheckConfig | None = dataclasses.field(default=None)
+    chunking_config: ChunkingConfig | None = dataclasses.field(default=None)
 
     @logger.emoji_block(
         msg="put record",
@@ -125,16 +163,107 @@ class BaseProducer(AbcProducer, BaseModel):
         :meth:`unistream.abstraction.AbcProducer.send` method. It also
         handles the exceptions gracefully.
         """
+        if self.claim_check_config is not None:
+            record = self.claim_check_config.offload(record)
         logger.info(f"record = {record.serialize()}")
         self.buffer.put(record)
+        self._send_emitted(skip_error=skip_error)
+
+    @logger.emoji_block(
+        msg="put records",
+        emoji="📤",
+    )
+    def _put_many(
+        self,
+        records: Iterable[AbcRecord],
+        skip_error: bool = True,
+    ):
+        """
+        Same as :meth:`BaseProducer._put`, but puts all records to the buffer
+        with one :meth:`~unistream.buffer.BaseBuffer.put_many` call. A burst
+        can fill the buffer more than once, so it keeps sending the emitted
+        records until the buffer has nothing to emit, or a send fails.
+        """
+        if self.claim_check_config is not None:
+            records = [self.claim_check_config.offload(record) for record in records]
+        else:
+            records = list(records)
+        logger.info(f"n_records = {len(records)}")
+        self.buffer.put_many(records)
+        while self._send_emitted(skip_error=skip_error):
+            pass
+
+    @logger.emoji_block(
+        msg="poll",
+        emoji="⏰",
+    )
+    def _poll(
+        self,
+        skip_error: bool = True,
+    ):
+        """
+        Let the buffer check its time-based conditions, then send the emitted
+        records like :meth:`BaseProducer._put` does, without putting a record.
+        """
+        self.buffer.tick()
+        self._send_emitted(skip_error=skip_error)
 
+    @logger.emoji_block(
+        msg="drain",
+        emoji="🚰",
+    )
+    def _drain(
+        self,
+        max_records: int | None = None,
+        max_bytes: int | None = None,
+        skip_error: bool = True,
+    ):
+        """
+        Send the emitted records with :meth:`~unistream.buffer.BaseBuffer.emit_many`
+        and commit them, again and again, until the buffer has nothing to emit,
+        or a send fails.
+        """
+        while self._send_emitted(
+            skip_error=skip_error,
+            drain=True,
+            max_records=max_records,
+            max_bytes=max_bytes,
+        ):
+            pass
+
+    def _send_emitted(
+        self,
+        skip_error: bool = True,
+        drain: bool = False,
+        max_records: int | None = None,
+        max_bytes: int | None = None,
+    ) -> bool:
+        """
+        Send the emitted records to the sink if the buffer should emit, and
+        the exponential backoff allows.
+
+        :param drain: if True, emit with :meth:`~unistream.buffer.BaseBuffer.emit_many`,
+            with the ``max_records`` and ``max_bytes`` caps.
+
+        :return: True if the records are sent and committed.
+        """
         # self.retry_config.show()
         self.retry_config.skip_error = skip_error  # override the
 
         now = get_utc_now()
         if self.retry_config.shall_we_retry(now=now):
             if self.buffer.should_i_emit():
-                records = self.buffer.emit()
+                if drain:
+                    self.buffer.emit_many(max_records=max_records, max_bytes=max_bytes)
+                # emit and emit_batch return the records emitted by emit_many
+                if self.use_record_batch:
+                    records = self.buffer.emit_batch()
+                else:
+                    records = self.buffer.emit()
+                if self.aggregation_config is not None:
+                    records = self._aggregate(records)
+                if self.chunking_config is not None:
+                    records = self.chunking_config.split(records)
                 self.retry_config.mark_start_retry(now=now)
                 try:
                     logger.info(f"📤 send records: {[record.id for record in records]}")
@@ -142,19 +271,35 @@ class BaseProducer(AbcProducer, BaseModel):
                     logger.info("🟢 succeeded")
                     self.buffer.commit()
                     self.retry_config.reset_tracker()
-                    return
+                    return True
                 except Exception as e:
                     logger.info(f"🔴 failed, error: {e!r}")
                     self.retry_config.mark_retry_failed(error=e)  # this may raise error
                     if not skip_error:
                         raise e
-                    return
+                    return False
             else:
                 logger.info("🚫 we should not emit")
-                return
+                return False
         else:
             logger.info("🚫 on hold due to exponential backoff")
-            return
+            return False
+
+    def _aggregate(
+        self,
+        records: list[AbcRecord] | RecordBatch,
+    ) -> list[AggregatedRecord] | RecordBatch:
+        """
+        Pack the emitted records into aggregated records, keep the container
+        type :meth:`send` expects.
+        """
+        aggregated_records = self.aggregation_config.aggregate(records)
+        if self.use_record_batch:
+            return RecordBatch.from_records(
+                aggregated_records,
+                record_class=AggregatedRecord,
+            )
+        return aggregated_records
 
     def put(
         self,
@@ -169,3 +314,65 @@ class BaseProducer(AbcProducer, BaseModel):
                 record=record,
                 skip_error=skip_error,
             )
+
+    def put_many(
+        self,
+        records: Iterable[AbcRecord],
+        skip_error: bool = True,
+        verbose: bool = False,
+    ):
+        """
+        Put many records at once, the bulk version of :meth:`put`. The buffer
+        has to be a :class:`~unistream.buffer.BaseBuffer`.
+        """
+        with logger.disabled(
+            disable=not verbose,
+        ):
+            return self._put_many(
+                records=records,
+                skip_error=skip_error,
+            )
+
+    def poll(
+        self,
+        skip_error: bool = True,
+        verbose: bool = False,
+    ):
+        """
+        Flush the buffer by time and send the emitted records, without putting
+        a record. Call it from the idle loop of a low traffic producer. The
+        buffer has to be a :class:`~unistream.buffer.BaseBuffer`.
+        """
+        with logger.disabled(
+            disable=not verbose,
+        ):
+            return self._poll(
+                skip_error=skip_error,
+            )
+
+    def drain(
+        self,
+        max_records: int | None = None,
+        max_bytes: int | None = None,
+        skip_error: bool = True,
+        verbose: bool = False,
+    ):
+        """
+        Send the backlog of the buffer back-to-back, so the recovery time after
+        a sink outage is bounded by the sink throughput, rather than by the
+        arrival rate of new records. It stops when the buffer has nothing to
+        emit, when a send fails, or when the exponential backoff says wait.
+        The buffer has to be a :class:`~unistream.buffer.BaseBuffer`.
+
+        :param max_records: the max number of records per :meth:`send`,
+            see :meth:`~unistream.buffer.BaseBuffer.emit_many`.
+        :param max_bytes: the max total size in bytes of the records per :meth:`send`.
+        """
+        with logger.disabled(
+            disable=not verbose,
+        ):
+            return self._drain(
+                max_records=max_records,
+                max_bytes=max_bytes,
+                skip_error=skip_error,
+            )
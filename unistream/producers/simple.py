@@ -10,7 +10,13 @@ from pathlib import Path
 
 from func_args.api import REQ
 
+from ..compression import get_compression
+from ..framing import MAGIC, encode_frame
+from ..batch import RecordBatch
 from ..abstraction import AbcRecord, AbcBuffer
+from ..aggregation import AggregationConfig
+from ..claim_check import ClaimCheckConfig
+from ..chunking import ChunkingConfig
 from ..producer import BaseProducer, RetryConfig
 
 
@@ -31,9 +37,23 @@ class SimpleProducer(BaseProducer):
         use the :meth:`SimpleProducer.new` method
 
     :param path_sink: the path of the file you want to write data to.
+    :param framed: if True, write the sink file in the binary framing format
+        of :mod:`unistream.framing`, otherwise use the newline-delimited text format.
+    :param compression: the name of the compression in :mod:`unistream.compression`.
+        If set, each batch is appended to the sink file as one compressed block.
+        Don't change it for an existing sink file. The block header has the
+        number of records in the block, so
+        :meth:`SimpleConsumer.get_records <unistream.consumers.simple.SimpleConsumer.get_records>`
+        skips the consumed blocks without reading them, and only decompresses
+        the blocks it returns records from.
+    :param compression_level: the compression level, a low level costs less
+        CPU, a high level saves more disk I/O.
     """
 
     path_sink: Path = dataclasses.field(default=REQ)
+    framed: bool = dataclasses.field(default=False)
+    compression: str | None = dataclasses.field(default=None)
+    compression_level: int | None = dataclasses.field(default=None)
 
     @classmethod
     def new(
@@ -41,6 +61,12 @@ class SimpleProducer(BaseProducer):
         buffer: AbcBuffer,
         retry_config: RetryConfig,
         path_sink: Path,
+        framed: bool = False,
+        compression: str | None = None,
+        compression_level: int | None = None,
+        aggregation_config: AggregationConfig | None = None,
+        claim_check_config: ClaimCheckConfig | None = None,
+        chunking_config: ChunkingConfig | None = None,
     ):
         """
         Create a :class:`SimpleProducer` instance.
@@ -49,17 +75,55 @@ class SimpleProducer(BaseProducer):
         :param path_sink: the path of the file you want to write data to.
         :param buffer: the buffer you want to use.
         :param retry_config: the retry configuration.
+        :param framed: if True, write the sink file in the binary framing format.
+        :param compression: the name of the compression of the sink file.
+        :param compression_level: the compression level.
+        :param aggregation_config: the record aggregation configuration.
+        :param claim_check_config: the claim check configuration of large records.
+        :param chunking_config: the chunking configuration of oversized records.
         """
         return cls(
             buffer=buffer,
             retry_config=retry_config,
             path_sink=path_sink,
+            framed=framed,
+            compression=compression,
+            compression_level=compression_level,
+            aggregation_config=aggregation_config,
+            claim_check_config=claim_check_config,
+            chunking_config=chunking_config,
         )
 
-    def send(self, records: list[AbcRecord]):
+    def send(self, records: list[AbcRecord] | RecordBatch):
         """
-        Send records to the sink, which is an append-only file
+        Send records to the sink, which is an append-only file.
+        It also accepts a :class:`~unistream.batch.RecordBatch`.
         """
-        with self.path_sink.open("a") as f:
-            for record in records:
-                f.write(record.serialize() + "\n")
+        if isinstance(records, RecordBatch):
+            data_list = records.serialize_many()
+        else:
+            records = list(records)
+            if records:
+                data_list = type(records[0]).serialize_many(records)
+            else:
+                data_list = []
+        if self.framed:
+            content = b"".join([encode_frame(data.encode("utf-8")) for data in data_list])
+            # each compressed block is a self-contained file
+            if (
+                self.compression is not None
+                or self.path_sink.exists() is False
+                or self.path_sink.stat().st_size == 0
+            ):
+                content = MAGIC + content
+        else:
+            content = "".join([data + "\n" for data in data_list]).encode("utf-8")
+        if self.compression is not None:
+            compression = get_compression(self.compression)
+            content = compression.compress_block(
+                content,
+                n_records=len(data_list),
+                level=self.compression_level,
+            )
+        with self.path_sink.open("ab") as f:
+            f.write(content)
@@ -18,4 +18,4 @@ class BaseRecord(AbcRecord):
     implementation using :mod:`dataclasses`.
     """
 
-    pass
+    __slots__ = ()
@@ -5,13 +5,19 @@ Implements :class:`DataClassRecord`, a frozen record built on :mod:`dataclasses`
 """
 
 import typing as T
+from collections.abc import Iterable
+import re
+import sys
 import uuid
 import json
 import dataclasses
+from datetime import datetime
 
-from func_args.api import BaseFrozenModel
+from func_args.api import REQ, ParamError, BaseFrozenModel
 
-from ..utils import get_utc_now
+from ..utils import to_epoch_us, get_utc_now_epoch_us, epoch_us_to_iso
+from ..codec import BaseCodec, get_codec
+from ..ulid import UlidGenerator
 from ..record import BaseRecord
 
 
@@ -20,27 +26,569 @@ def id_factory() -> str:
 
 
 def create_at_factory() -> str:
-    return get_utc_now().isoformat()
+    return epoch_us_to_iso(get_utc_now_epoch_us())
+
+
+# the keys of the cached values in the record ``__dict__``
+_SERIALIZED = "_serialized"
+_CREATE_AT_DATETIME = "_create_at_datetime"
+_CREATE_AT_EPOCH_US = "_create_at_epoch_us"
+
+# the key of the schema version tag in the serialized record
+_SCHEMA_VERSION = "_v"
+
+# match the ``id`` and ``create_at`` at the beginning of the serialized record
+_HEADER_PATTERN = re.compile(
+    r'\s*\{\s*"id"\s*:\s*"((?:[^"\\]|\\.)*)"\s*,\s*"create_at"\s*:\s*"((?:[^"\\]|\\.)*)"'
+)
+
+
+def _to_raw_str(data: str) -> str | None:
+    """
+    Convert the serialized record string to the cached raw string. An input
+    with a newline inside, for example pretty-printed JSON, is not cached,
+    so :meth:`DataClassRecord.serialize` re-encodes it to a single line that
+    can be written to the newline-delimited files.
+    """
+    raw = data.rstrip()
+    if "\n" in raw:
+        return None
+    return raw
+
+
+def _to_raw(data: bytes | memoryview) -> bytes | None:
+    """
+    Same as :func:`_to_raw_str`, for the serialized record bytes, without
+    copying ``bytes`` objects.
+    """
+    if data.__class__ is bytes:
+        raw = data.rstrip()
+    else:
+        raw = bytes(data).rstrip()
+    if b"\n" in raw:
+        return None
+    return raw
+
+
+def _to_raw_many(data_list: list[bytes | memoryview]) -> list[bytes | None]:
+    """
+    Same as :func:`_to_raw`, for a list of serialized records.
+    """
+    if all([data.__class__ is bytes for data in data_list]):
+        raw_list = [data.rstrip() for data in data_list]
+    else:
+        raw_list = [bytes(data).rstrip() for data in data_list]
+    return [None if b"\n" in raw else raw for raw in raw_list]
+
+
+_ulid_generator = UlidGenerator()
+
+
+def _fill_ulid(values: dict[str, T.Any]):
+    """
+    Fill the missing ``id`` and ``create_at`` of :class:`UlidRecord` in the
+    record ``__dict__``, both from the same ULID.
+    """
+    if values["id"] is None:
+        ulid, epoch_us = _ulid_generator.new()
+        values["id"] = ulid
+        if values["create_at"] is None:
+            values["create_at"] = epoch_us_to_iso(epoch_us)
+            values[_CREATE_AT_EPOCH_US] = epoch_us
+    else:
+        values["create_at"] = create_at_factory()
+
+
+def _exec_function(source: str, globals_: dict[str, T.Any], name: str) -> T.Callable:
+    namespace = dict()
+    exec(source, globals_, namespace)
+    return namespace[name]
+
+
+def _make_to_dict(cls: type["DataClassRecord"]) -> T.Callable:
+    """
+    Generate a function that reads the fields of a record straight into a dict.
+    Unlike :func:`dataclasses.asdict`, it doesn't deep copy the values.
+    """
+    items = [f"{field.name!r}: self.{field.name}" for field in dataclasses.fields(cls)]
+    if cls.schema_version is not None:
+        items.append(f"{_SCHEMA_VERSION!r}: {cls.schema_version!r}")
+    source = f"def to_dict(self):\n    return {{{', '.join(items)}}}\n"
+    return _exec_function(source, {}, "to_dict")
+
+
+def _make_from_dict(cls: type["DataClassRecord"]) -> T.Callable:
+    """
+    Generate a function that creates a record from a decoded dict without
+    calling ``__init__``. Missing fields get their default values, missing
+    required fields raise :class:`func_args.api.ParamError`, unknown fields
+    raise :class:`TypeError`, the same as ``cls(**data)``.
+
+    The generic ``BaseFrozenModel.__post_init__`` validation is skipped, because
+    the required fields are already checked here. A ``__post_init__``
+    defined by the user is still called. The missing ``id`` and ``create_at``
+    of :class:`UlidRecord` are filled here instead of by its ``__post_init__``.
+
+    If the ``raw`` string the dict was decoded from is given, and the dict
+    has exactly all fields, it is cached as the serialized form of the record.
+    It is not cached if the user defined ``__post_init__`` may change the values.
+    """
+    fields = dataclasses.fields(cls)
+    globals_ = {
+        "cls": cls,
+        "new": object.__new__,
+        "setattr": object.__setattr__,
+        "field_names": frozenset([field.name for field in fields]),
+        "ParamError": ParamError,
+        "SERIALIZED": _SERIALIZED,
+        "post_init": cls.__post_init__,
+        "intern": sys.intern,
+    }
+    lines = [
+        "def from_dict(data, raw=None):",
+        "    if data.keys() != field_names and not data.keys() <= field_names:",
+        "        raise TypeError(",
+        "            f'unexpected fields {sorted(data.keys() - field_names)} for {cls}!'",
+        "        )",
+    ]
+    items = list()
+    for ith, field in enumerate(fields):
+        name = field.name
+        if field.default is not dataclasses.MISSING and field.default is not REQ:
+            globals_[f"default_{ith}"] = field.default
+            items.append(f"{name!r}: data.get({name!r}, default_{ith})")
+        elif field.default_factory is not dataclasses.MISSING:
+            globals_[f"factory_{ith}"] = field.default_factory
+            items.append(f"{name!r}: data[{name!r}] if {name!r} in data else factory_{ith}()")
+        else:
+            lines.extend(
+                [
+                    f"    if {name!r} not in data:",
+                    f'        raise ParamError(f"Field {name!r} is required for {{cls}}.")',
+                ]
+            )
+            items.append(f"{name!r}: data[{name!r}]")
+    lines.append(f"    values = {{{', '.join(items)}}}")
+    for name in cls.intern_fields:
+        lines.append(f"    if values[{name!r}].__class__ is str:")
+        lines.append(f"        values[{name!r}] = intern(values[{name!r}])")
+    post_init = cls.__post_init__
+    if post_init is UlidRecord.__post_init__:
+        globals_["fill_ulid"] = _fill_ulid
+        lines.append("    if values['id'] is None or values['create_at'] is None:")
+        lines.append("        fill_ulid(values)")
+        post_init = BaseFrozenModel.__post_init__
+    if post_init is BaseFrozenModel.__post_init__:
+        lines.append("    if raw is not None and data.keys() == field_names:")
+        lines.append("        values[SERIALIZED] = raw")
+    lines.append("    obj = new(cls)")
+    lines.append("    setattr(obj, '__dict__', values)")
+    if post_init is not BaseFrozenModel.__post_init__:
+        lines.append("    post_init(obj)")
+    lines.append("    return obj")
+    return _exec_function("\n".join(lines) + "\n", globals_, "from_dict")
+
+
+def _make_from_dict_trusted(
+    cls: type["DataClassRecord"],
+    from_dict: T.Callable,
+) -> T.Callable:
+    """
+    Generate a function that creates a record from a decoded dict that was
+    serialized by the same class, so it has exactly all fields. The dict
+    itself becomes the ``__dict__`` of the record, nothing is validated, and
+    ``__post_init__`` is not called. If the keys of the dict are not exactly
+    the fields, for example a file written by another version of the class,
+    it falls back to ``from_dict``.
+    """
+    field_names = frozenset([field.name for field in dataclasses.fields(cls)])
+    intern_fields = cls.intern_fields
+    new = object.__new__
+    setattr = object.__setattr__
+    intern = sys.intern
+
+    def from_dict_trusted(data, raw=None):
+        if data.keys() != field_names:
+            return from_dict(data, raw)
+        for name in intern_fields:
+            value = data[name]
+            if value.__class__ is str:
+                data[name] = intern(value)
+        if raw is not None:
+            data[_SERIALIZED] = raw
+        obj = new(cls)
+        setattr(obj, "__dict__", data)
+        return obj
+
+    return from_dict_trusted
 
 
 @dataclasses.dataclass(frozen=True)
 class DataClassRecord(BaseRecord, BaseFrozenModel):
     """
     Record built on top of `dataclasses <https://docs.python.org/3/library/dataclasses.html>`_.
+
+    Each subclass gets a specialized encoder and decoder, generated once on
+    first use. The encoder reads the fields straight into a dict instead of
+    calling :func:`dataclasses.asdict`, the decoder creates the record without
+    calling ``__init__``.
+
+    Since the record is frozen, :meth:`DataClassRecord.serialize` caches the
+    serialized string on the record, and records created by
+    :meth:`DataClassRecord.deserialize` reuse the input string. So a record
+    is encoded only once on its way through the buffer, the producer and
+    the checkpoint. Don't mutate the mutable field values (e.g. a list) of
+    a record after it is serialized. For the same reason,
+    :attr:`DataClassRecord.create_at_datetime` and
+    :attr:`DataClassRecord.create_at_epoch_us` are computed once and cached.
+
+    :param codec: class level setting, the name of the JSON codec in
+        :mod:`unistream.codec` used to serialize and deserialize the record.
+        Default is ``"json"``, the standard library. Use ``"auto"`` to pick
+        ``orjson`` or ``msgspec`` when installed. For example::
+
+            @dataclasses.dataclass(frozen=True)
+            class MyRecord(DataClassRecord):
+                codec: T.ClassVar[str] = "auto"
+
+    :param schema_version: class level setting, the version of the schema of
+        the record. Default is None, no version. If set, the serialized record
+        has a ``"_v"`` version tag, and records of older versions are upgraded
+        by the functions registered with :meth:`DataClassRecord.register_upgrade`
+        when they are decoded. Untagged records are version ``0``. So WAL files
+        and sink files written by the old code can still be read after
+        changing the fields. For example::
+
+            @dataclasses.dataclass(frozen=True)
+            class MyRecord(DataClassRecord):
+                schema_version: T.ClassVar[int] = 2
+
+                full_name: str = dataclasses.field(default="")
+
+            @MyRecord.register_upgrade(from_version=1)
+            def _(data: dict) -> dict:
+                data["full_name"] = data.pop("first_name") + " " + data.pop("last_name")
+                return data
+
+        Records of the current version are decoded at full speed, the
+        upgrade chain of each older version is built once and cached.
+
+    :param intern_fields: class level setting, the names of the string fields
+        whose decoded values are interned with :func:`sys.intern`. Use it for
+        fields that repeat a few values across many records, such as a tenant
+        id or an event type, so all decoded records share one string object
+        per value instead of one per record. Default is no field. For example::
+
+            @dataclasses.dataclass(frozen=True)
+            class MyRecord(DataClassRecord):
+                intern_fields: T.ClassVar[tuple[str, ...]] = ("tenant", "event")
+
+                tenant: str = dataclasses.field(default="")
+                event: str = dataclasses.field(default="")
+
+        To store the repeated values once per file on disk, use the ``"dict"``
+        compression, see :class:`~unistream.compression.DictCompression`.
     """
 
+    codec: T.ClassVar[str] = "json"
+    schema_version: T.ClassVar[int | None] = None
+    intern_fields: T.ClassVar[tuple[str, ...]] = ()
+
+    # per-class compiled codec objects, see :meth:`DataClassRecord._compile`
+    _codec = None
+    _to_dict = None
+    _from_dict = None
+    _from_dict_trusted = None
+    # per-class upgrade functions, see :meth:`DataClassRecord.register_upgrade`
+    _upgrades: T.ClassVar[dict[int, T.Callable[[dict], dict]]] = dict()
+    _upgrade_cache: T.ClassVar[dict[int, T.Callable[[dict], dict]]] = dict()
+
     id: str = dataclasses.field(default_factory=id_factory)
     create_at: str = dataclasses.field(default_factory=create_at_factory)
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the dataclass fields are not ready yet at this point,
+        # the compiled functions are generated on first use.
+        cls._codec = None
+        cls._to_dict = None
+        cls._from_dict = None
+        cls._from_dict_trusted = None
+        cls._upgrades = dict()
+        cls._upgrade_cache = dict()
+
+    @classmethod
+    def _compile(cls):
+        """
+        Resolve the codec and generate the encoder and decoder of this class.
+        """
+        field_names = {field.name for field in dataclasses.fields(cls)}
+        unknown_fields = set(cls.intern_fields) - field_names
+        if unknown_fields:
+            raise ValueError(
+                f"intern_fields {sorted(unknown_fields)} are not fields of {cls}!"
+            )
+        cls._codec = get_codec(cls.codec)
+        cls._to_dict = staticmethod(_make_to_dict(cls))
+        from_dict = _make_from_dict(cls)
+        cls._from_dict = staticmethod(from_dict)
+        cls._from_dict_trusted = staticmethod(_make_from_dict_trusted(cls, from_dict))
+
+    @classmethod
+    def register_upgrade(cls, from_version: int):
+        """
+        A decorator to register the function that upgrades the decoded dict of
+        a record from ``from_version`` to ``from_version + 1``. The function
+        can modify the dict in place, and has to return it.
+
+        Missing versions in the chain are treated as no-op, which is enough
+        when the new version only adds fields with default values.
+        """
+
+        def decorator(func: T.Callable[[dict], dict]) -> T.Callable[[dict], dict]:
+            cls._upgrades[from_version] = func
+            cls._upgrade_cache.clear()
+            return func
+
+        return decorator
+
+    @classmethod
+    def _get_upgrade(cls, version: int) -> T.Callable[[dict], dict]:
+        """
+        Get the function that upgrades a decoded dict from ``version`` to
+        :attr:`DataClassRecord.schema_version`. It is built once per version.
+        """
+        try:
+            return cls._upgrade_cache[version]
+        except KeyError:
+            pass
+        if version > cls.schema_version:
+            raise ValueError(
+                f"cannot decode schema version {version} with {cls}, "
+                f"its schema version is {cls.schema_version}!"
+            )
+        funcs = [
+            cls._upgrades[v]
+            for v in range(version, cls.schema_version)
+            if v in cls._upgrades
+        ]
+
+        def upgrade(data: dict) -> dict:
+            for func in funcs:
+                data = func(data)
+            return data
+
+        cls._upgrade_cache[version] = upgrade
+        return upgrade
+
+    @classmethod
+    def _from_versioned_dict(
+        cls,
+        data: dict[str, T.Any],
+        raw: str | None = None,
+    ) -> "DataClassRecord":
+        """
+        Create a record from a decoded dict that may have a version tag.
+        """
+        version = data.pop(_SCHEMA_VERSION, 0)
+        if version == cls.schema_version:
+            return cls._from_dict(data, raw)
+        # the raw string is in the old format, don't cache it
+        return cls._from_dict(cls._get_upgrade(version)(data))
+
+    @classmethod
+    def _from_versioned_dict_trusted(
+        cls,
+        data: dict[str, T.Any],
+        raw: str | None = None,
+    ) -> "DataClassRecord":
+        """
+        The trusted version of :meth:`DataClassRecord._from_versioned_dict`,
+        only records of the current version skip the validation.
+        """
+        version = data.pop(_SCHEMA_VERSION, 0)
+        if version == cls.schema_version:
+            return cls._from_dict_trusted(data, raw)
+        # the raw string is in the old format, don't cache it
+        return cls._from_dict(cls._get_upgrade(version)(data))
+
+    @property
+    def create_at_datetime(self) -> datetime:
+        create_at_datetime = self.__dict__.get(_CREATE_AT_DATETIME)
+        if create_at_datetime is None:
+            create_at_datetime = datetime.fromisoformat(self.create_at)
+            self.__dict__[_CREATE_AT_DATETIME] = create_at_datetime
+        return create_at_datetime
+
+    @property
+    def create_at_epoch_us(self) -> int:
+        create_at_epoch_us = self.__dict__.get(_CREATE_AT_EPOCH_US)
+        if create_at_epoch_us is None:
+            create_at_epoch_us = to_epoch_us(self.create_at_datetime)
+            self.__dict__[_CREATE_AT_EPOCH_US] = create_at_epoch_us
+        return create_at_epoch_us
+
+    @classmethod
+    def get_codec(cls) -> BaseCodec:
+        """
+        Get the codec object of this record class.
+        """
+        return get_codec(cls.codec)
+
     def serialize(self) -> str:
-        return json.dumps(dataclasses.asdict(self))
+        data = self.__dict__.get(_SERIALIZED)
+        if data is not None:
+            if data.__class__ is bytes:  # cached by deserialize_bytes
+                data = data.decode("utf-8")
+                self.__dict__[_SERIALIZED] = data
+            return data
+        if self._to_dict is None:
+            self._compile()
+        try:
+            data = self._codec.dumps(self._to_dict(self))
+        except TypeError:  # nested dataclass values
+            data_dict = dataclasses.asdict(self)
+            if self.schema_version is not None:
+                data_dict[_SCHEMA_VERSION] = self.schema_version
+            data = self._codec.dumps(data_dict)
+        self.__dict__[_SERIALIZED] = data
+        return data
 
     @classmethod
     def deserialize(
         cls,
         data: str,
     ) -> "DataClassRecord":
-        return cls(**json.loads(data))
+        if cls._from_dict is None:
+            cls._compile()
+        if cls.schema_version is None:
+            return cls._from_dict(cls._codec.loads(data), _to_raw_str(data))
+        return cls._from_versioned_dict(cls._codec.loads(data), _to_raw_str(data))
+
+    @classmethod
+    def deserialize_bytes(
+        cls,
+        data: bytes | memoryview,
+    ) -> "DataClassRecord":
+        """
+        Parse the bytes with :meth:`~unistream.codec.BaseCodec.loads_bytes`.
+        The bytes are cached as the serialized form of the record, and decoded
+        to a string only if :meth:`DataClassRecord.serialize` is called.
+        Multi-line input is not cached, see :func:`_to_raw_str`.
+        """
+        if cls._from_dict is None:
+            cls._compile()
+        raw = _to_raw(data)
+        if cls.schema_version is None:
+            return cls._from_dict(cls._codec.loads_bytes(data), raw)
+        return cls._from_versioned_dict(cls._codec.loads_bytes(data), raw)
+
+    @classmethod
+    def deserialize_header(
+        cls,
+        data: str,
+    ) -> tuple[str, str]:
+        """
+        The ``id`` and ``create_at`` are the first two fields of the serialized
+        JSON object, so they are extracted with a regular expression without
+        decoding the rest of the record.
+        """
+        match = _HEADER_PATTERN.match(data)
+        if match is None:
+            return super().deserialize_header(data)
+        record_id, create_at = match.groups()
+        if "\\" in record_id:
+            record_id = json.loads(f'"{record_id}"')
+        if "\\" in create_at:  # pragma: no cover
+            create_at = json.loads(f'"{create_at}"')
+        return record_id, create_at
+
+    @classmethod
+    def deserialize_many(
+        cls,
+        data_list: Iterable[str],
+    ) -> list["DataClassRecord"]:
+        """
+        Decode all strings with a single codec call, see
+        :meth:`~unistream.codec.BaseCodec.loads_many`, then create the records.
+        """
+        if cls._from_dict is None:
+            cls._compile()
+        if cls.schema_version is None:
+            from_dict = cls._from_dict
+        else:
+            from_dict = cls._from_versioned_dict
+        data_list = list(data_list)
+        return [
+            from_dict(kwargs, _to_raw_str(data))
+            for kwargs, data in zip(
+                cls._codec.loads_many(data_list), data_list, strict=True
+            )
+        ]
+
+    @classmethod
+    def deserialize_many_bytes(
+        cls,
+        data_list: Iterable[bytes | memoryview],
+        trusted: bool = False,
+    ) -> list["DataClassRecord"]:
+        """
+        Same as :meth:`DataClassRecord.deserialize_many`, but for UTF-8 encoded
+        bytes, see :meth:`DataClassRecord.deserialize_bytes`.
+
+        :param trusted: if True, records that have all fields are created
+            without any validation and without calling ``__post_init__``,
+            see :meth:`~unistream.abstraction.AbcRecord.deserialize_many_bytes`.
+        """
+        if cls._from_dict is None:
+            cls._compile()
+        if cls.schema_version is None:
+            if trusted:
+                from_dict = cls._from_dict_trusted
+            else:
+                from_dict = cls._from_dict
+        else:
+            if trusted:
+                from_dict = cls._from_versioned_dict_trusted
+            else:
+                from_dict = cls._from_versioned_dict
+        data_list = list(data_list)
+        return [
+            from_dict(kwargs, raw)
+            for kwargs, raw in zip(
+                cls._codec.loads_many_bytes(data_list),
+                _to_raw_many(data_list),
+                strict=True,
+            )
+        ]
+
+
+@dataclasses.dataclass(frozen=True)
+class UlidRecord(DataClassRecord):
+    """
+    A :class:`DataClassRecord` whose default ``id`` is a monotonic,
+    time-sortable ULID, see :mod:`unistream.ulid`. The default ``id`` and
+    ``create_at`` come from the same clock read, so ids sort by ``create_at``,
+    and id-keyed indexes receive sequential inserts. For example::
+
+        @dataclasses.dataclass(frozen=True)
+        class MyRecord(UlidRecord):
+            value: int = dataclasses.field(default=0)
+
+    The ``id`` and ``create_at`` are filled together in ``__post_init__``.
+    If ``id`` is given and ``create_at`` is not, ``create_at`` is the current
+    time. If ``create_at`` is given and ``id`` is not, ``id`` is a new ULID.
+    If you define ``__post_init__`` in a subclass, call
+    ``super().__post_init__()`` first.
+    """
+
+    id: str = dataclasses.field(default=None)
+    create_at: str = dataclasses.field(default=None)
+
+    def __post_init__(self):
+        if self.id is None or self.create_at is None:
+            _fill_ulid(self.__dict__)
+        super().__post_init__()
 
 
 T_DATA_CLASS_RECORD = T.TypeVar("T_DATA_CLASS_RECORD", bound=DataClassRecord)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements :class:`LazyRecord`, a record wrapper that decodes only the header
+up front and the rest of the record on first access.
+"""
+
+import typing as T
+from collections.abc import Iterable
+from datetime import datetime
+
+from ..utils import to_epoch_us
+from ..abstraction import AbcRecord, T_RECORD
+
+
+class LazyRecord(T.Generic[T_RECORD]):
+    """
+    A lazy wrapper of the serialized record. Only the ``id`` and ``create_at``
+    are decoded when it is created, see
+    :meth:`~unistream.abstraction.AbcRecord.deserialize_header`. The full record
+    is decoded on first access to any other attribute, then cached.
+
+    It is useful when most records only need their header. For example, when
+    the consumer reloads a batch from the checkpoint after a crash, the records
+    that already succeeded are skipped by looking at the ``id`` only.
+
+    Usage example::
+
+        lazy_record = LazyRecord.from_data(MyRecord, data)
+        lazy_record.id  # cheap
+        lazy_record.value  # decode the full record
+        record = lazy_record.materialize()  # get the real MyRecord object
+
+    :param record_class: the record class used to decode the record.
+    :param data: the serialized record.
+    :param id: the id of the record.
+    :param create_at: the create_at of the record.
+    """
+
+    __slots__ = ("record_class", "data", "id", "create_at", "_record")
+
+    def __init__(
+        self,
+        record_class: type[T_RECORD],
+        data: str,
+        id: str,
+        create_at: str,
+    ):
+        self.record_class = record_class
+        self.data = data
+        self.id = id
+        self.create_at = create_at
+        self._record: T_RECORD | None = None
+
+    @classmethod
+    def from_data(
+        cls,
+        record_class: type[T_RECORD],
+        data: str,
+    ) -> "LazyRecord[T_RECORD]":
+        """
+        Create a lazy record from the serialized record, only decode the header.
+        """
+        record_id, create_at = record_class.deserialize_header(data)
+        return cls(
+            record_class=record_class,
+            data=data,
+            id=record_id,
+            create_at=create_at,
+        )
+
+    @classmethod
+    def from_data_list(
+        cls,
+        record_class: type[T_RECORD],
+        data_list: Iterable[str],
+    ) -> list["LazyRecord[T_RECORD]"]:
+        """
+        Create many lazy records from the serialized records.
+        """
+        return [cls.from_data(record_class, data) for data in data_list]
+
+    @property
+    def is_materialized(self) -> bool:
+        """
+        Whether the full record is already decoded.
+        """
+        return self._record is not None
+
+    def materialize(self) -> T_RECORD:
+        """
+        Decode the full record, the result is cached.
+        """
+        if self._record is None:
+            self._record = self.record_class.deserialize(self.data)
+        return self._record
+
+    @property
+    def create_at_datetime(self) -> datetime:
+        return datetime.fromisoformat(self.create_at)
+
+    @property
+    def create_at_epoch_us(self) -> int:
+        return to_epoch_us(self.create_at_datetime)
+
+    def serialize(self) -> str:
+        """
+        Return the serialized record without decoding it.
+        """
+        return self.data
+
+    def __getattr__(self, name: str):
+        # only called when the attribute is not found in the slots
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"record_class={self.record_class.__name__}, "
+            f"id={self.id!r}, "
+            f"create_at={self.create_at!r})"
+        )
+
+
+def materialize(record: T.Union[AbcRecord, LazyRecord]) -> AbcRecord:
+    """
+    Return the real record object, decode it if it is a :class:`LazyRecord`.
+    """
+    if isinstance(record, LazyRecord):
+        return record.materialize()
+    return record
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements :class:`SlotsRecord`, a compact frozen record built on
+:mod:`dataclasses` with ``slots=True`` and positional serialization.
+"""
+
+import typing as T
+from collections.abc import Iterable
+import re
+import json
+import operator
+import dataclasses
+from datetime import datetime
+
+from ..utils import to_epoch_us
+from ..codec import BaseCodec, get_codec
+from ..record import BaseRecord
+from .dataclass import (
+    id_factory,
+    create_at_factory,
+    _to_raw_str,
+    _to_raw,
+    _to_raw_many,
+)
+
+# match the ``id`` and ``create_at`` at the beginning of the serialized record
+_HEADER_PATTERN = re.compile(
+    r'\s*\[\s*"((?:[^"\\]|\\.)*)"\s*,\s*"((?:[^"\\]|\\.)*)"'
+)
+
+
+def _make_from_tuple(
+    cls: type["SlotsRecord"],
+    trusted: bool = False,
+) -> T.Callable:
+    """
+    Generate a function that creates a record from the decoded list of field
+    values without calling ``__init__``. If the number of values doesn't match
+    the number of fields, it falls back to ``cls(*values)``, which fills in the
+    default values or raises an error.
+
+    If the ``raw`` string the values were decoded from is given, it is cached
+    as the serialized form of the record, unless the class defines a
+    ``__post_init__`` that may change the values.
+
+    If ``trusted`` is True, ``__post_init__`` is never called, the values
+    were serialized by the same class.
+    """
+    fields = dataclasses.fields(cls)
+    has_post_init = hasattr(cls, "__post_init__") and trusted is False
+    globals_ = {
+        "cls": cls,
+        "new": object.__new__,
+        "setattr": object.__setattr__,
+        "n_fields": len(fields),
+    }
+    # the slot member descriptors, cheaper than object.__setattr__
+    for ith, field in enumerate(fields):
+        globals_[f"set_{ith}"] = getattr(cls, field.name).__set__
+    lines = [
+        "def from_tuple(values, raw=None):",
+        "    if len(values) != n_fields:",
+        "        return cls(*values)",
+        "    obj = new(cls)",
+    ]
+    for ith, field in enumerate(fields):
+        lines.append(f"    set_{ith}(obj, values[{ith}])")
+    if has_post_init:
+        lines.append("    obj.__post_init__()")
+    else:
+        lines.append("    if raw is not None:")
+        lines.append("        setattr(obj, '_serialized', raw)")
+    lines.append("    return obj")
+    namespace = dict()
+    exec("\n".join(lines) + "\n", globals_, namespace)
+    return namespace["from_tuple"]
+
+
+class _SlotsRecordCache(BaseRecord):
+    """
+    Declares the slots of the cached values of :class:`SlotsRecord`, they
+    can't be declared in the dataclass itself.
+    """
+
+    __slots__ = ("_serialized", "_create_at_datetime", "_create_at_epoch_us")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SlotsRecord(_SlotsRecordCache):
+    """
+    Record built on top of `dataclasses <https://docs.python.org/3/library/dataclasses.html>`_
+    with ``slots=True``. The instances don't have a per-instance ``__dict__``,
+    so it uses much less memory than
+    :class:`~unistream.records.dataclass.DataClassRecord`, which matters
+    when a buffer or a consumer holds many records in memory.
+
+    The record is serialized as a JSON array of the field values, in the order
+    of the fields, for example ``["1", "2024-01-01T00:00:00+00:00", 0]``.
+    It's smaller than a JSON object, and it is decoded without looking up the
+    field names. New fields can only be appended at the end, with a default value.
+
+    Subclasses have to be decorated with ``slots=True`` as well::
+
+        @dataclasses.dataclass(frozen=True, slots=True)
+        class MyRecord(SlotsRecord):
+            value: int = dataclasses.field(default=0)
+
+    It works with :class:`~unistream.buffers.file_buffer.FileBuffer`,
+    :class:`~unistream.consumers.simple.SimpleConsumer` and
+    :class:`~unistream.checkpoints.simple.SimpleCheckpoint` unchanged.
+    The serialized string, ``create_at_datetime`` and ``create_at_epoch_us``
+    are cached on the record, the same as ``DataClassRecord``.
+
+    Run ``benchmarks/slots_record.py`` to compare it with ``DataClassRecord``.
+    For 1M records with one int field, a decoded ``SlotsRecord`` takes about
+    380 bytes versus about 620 bytes for a ``DataClassRecord``, the encode and
+    decode throughput are about the same.
+
+    :param codec: class level setting, the name of the JSON codec in
+        :mod:`unistream.codec`. See :class:`~unistream.records.dataclass.DataClassRecord`.
+    """
+
+    codec: T.ClassVar[str] = "json"
+
+    # per-class compiled codec objects, see :meth:`SlotsRecord._compile`
+    _codec = None
+    _to_tuple = None
+    _from_tuple = None
+    _from_tuple_trusted = None
+
+    id: str = dataclasses.field(default_factory=id_factory)
+    create_at: str = dataclasses.field(default_factory=create_at_factory)
+
+    def __init_subclass__(cls, **kwargs):
+        # the dataclass fields are not ready yet at this point,
+        # the compiled functions are generated on first use.
+        cls._codec = None
+        cls._to_tuple = None
+        cls._from_tuple = None
+        cls._from_tuple_trusted = None
+
+    @classmethod
+    def _compile(cls):
+        """
+        Resolve the codec and generate the encoder and decoder of this class.
+        """
+        cls._codec = get_codec(cls.codec)
+        names = [field.name for field in dataclasses.fields(cls)]
+        cls._to_tuple = staticmethod(operator.attrgetter(*names))
+        cls._from_tuple = staticmethod(_make_from_tuple(cls))
+        cls._from_tuple_trusted = staticmethod(_make_from_tuple(cls, trusted=True))
+
+    @classmethod
+    def get_codec(cls) -> BaseCodec:
+        """
+        Get the codec object of this record class.
+        """
+        return get_codec(cls.codec)
+
+    @property
+    def create_at_datetime(self) -> datetime:
+        try:
+            return self._create_at_datetime
+        except AttributeError:
+            create_at_datetime = datetime.fromisoformat(self.create_at)
+            object.__setattr__(self, "_create_at_datetime", create_at_datetime)
+            return create_at_datetime
+
+    @property
+    def create_at_epoch_us(self) -> int:
+        try:
+            return self._create_at_epoch_us
+        except AttributeError:
+            create_at_epoch_us = to_epoch_us(self.create_at_datetime)
+            object.__setattr__(self, "_create_at_epoch_us", create_at_epoch_us)
+            return create_at_epoch_us
+
+    def serialize(self) -> str:
+        try:
+            data = self._serialized
+        except AttributeError:
+            pass
+        else:
+            if data.__class__ is bytes:  # cached by deserialize_bytes
+                data = data.decode("utf-8")
+                object.__setattr__(self, "_serialized", data)
+            return data
+        if self._to_tuple is None:
+            self._compile()
+        data = self._codec.dumps(self._to_tuple(self))
+        object.__setattr__(self, "_serialized", data)
+        return data
+
+    @classmethod
+    def deserialize(
+        cls,
+        data: str,
+    ) -> "SlotsRecord":
+        if cls._from_tuple is None:
+            cls._compile()
+        return cls._from_tuple(cls._codec.loads(data), _to_raw_str(data))
+
+    @classmethod
+    def deserialize_many(
+        cls,
+        data_list: Iterable[str],
+    ) -> list["SlotsRecord"]:
+        """
+        Decode all strings with a single codec call, see
+        :meth:`~unistream.codec.BaseCodec.loads_many`, then create the records.
+        """
+        if cls._from_tuple is None:
+            cls._compile()
+        from_tuple = cls._from_tuple
+        data_list = list(data_list)
+        return [
+            from_tuple(values, _to_raw_str(data))
+            for values, data in zip(
+                cls._codec.loads_many(data_list), data_list, strict=True
+            )
+        ]
+
+    @classmethod
+    def deserialize_bytes(
+        cls,
+        data: bytes | memoryview,
+    ) -> "SlotsRecord":
+        """
+        See :meth:`~unistream.records.dataclass.DataClassRecord.deserialize_bytes`.
+        """
+        if cls._from_tuple is None:
+            cls._compile()
+        raw = _to_raw(data)
+        return cls._from_tuple(cls._codec.loads_bytes(data), raw)
+
+    @classmethod
+    def deserialize_many_bytes(
+        cls,
+        data_list: Iterable[bytes | memoryview],
+        trusted: bool = False,
+    ) -> list["SlotsRecord"]:
+        """
+        See :meth:`~unistream.records.dataclass.DataClassRecord.deserialize_many_bytes`.
+        """
+        if cls._from_tuple is None:
+            cls._compile()
+        if trusted:
+            from_tuple = cls._from_tuple_trusted
+        else:
+            from_tuple = cls._from_tuple
+        data_list = list(data_list)
+        return [
+            from_tuple(values, raw)
+            for values, raw in zip(
+                cls._codec.loads_many_bytes(data_list),
+                _to_raw_many(data_list),
+                strict=True,
+            )
+        ]
+
+    @classmethod
+    def deserialize_header(
+        cls,
+        data: str,
+    ) -> tuple[str, str]:
+        """
+        The ``id`` and ``create_at`` are the first two values of the serialized
+        JSON array, so they are extracted with a regular expression without
+        decoding the rest of the record.
+        """
+        match = _HEADER_PATTERN.match(data)
+        if match is None:  # pragma: no cover
+            return BaseRecord.deserialize_header.__func__(cls, data)
+        record_id, create_at = match.groups()
+        if "\\" in record_id:
+            record_id = json.loads(f'"{record_id}"')
+        if "\\" in create_at:  # pragma: no cover
+            create_at = json.loads(f'"{create_at}"')
+        return record_id, create_at
+
+
+T_SLOTS_RECORD = T.TypeVar("T_SLOTS_RECORD", bound=SlotsRecord)
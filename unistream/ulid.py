@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Implements a monotonic, lexicographically time-sortable id generator in the
+`ULID <https://github.com/ulid/spec>`_ format.
+
+A ULID is a 26 characters Crockford's base32 string, a 48 bits millisecond
+timestamp followed by 80 random bits. Ids generated later sort after the ids
+generated earlier, even within the same millisecond, because the random part
+is incremented instead of regenerated. So id-keyed indexes (the checkpoint
+``batch`` dict, dedup stores, SQLite indexes, ...) receive sequential inserts,
+and a time range is a key range.
+
+Usage example::
+
+    @dataclasses.dataclass(frozen=True)
+    class MyRecord(UlidRecord):
+        value: int = dataclasses.field(default=0)
+
+The ``id`` and ``create_at`` of ``MyRecord()`` come from the same clock read,
+see :class:`~unistream.records.dataclass.UlidRecord`.
+"""
+
+import os
+import time
+import threading
+
+from .utils import epoch_us_to_iso
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# all two characters combinations, index is a 10 bits integer
+_PAIRS = [a + b for a in _CROCKFORD for b in _CROCKFORD]
+# ``int(x, 32)`` uses the 0-9A-V digits, map the Crockford's alphabet to them
+_FROM_CROCKFORD = str.maketrans(_CROCKFORD, "0123456789ABCDEFGHIJKLMNOPQRSTUV")
+
+_MAX_40_BITS = (1 << 40) - 1
+
+
+def _encode_40_bits(value: int) -> str:
+    """
+    Encode a 40 bits integer to 8 Crockford's base32 characters.
+    """
+    return (
+        _PAIRS[value >> 30]
+        + _PAIRS[(value >> 20) & 1023]
+        + _PAIRS[(value >> 10) & 1023]
+        + _PAIRS[value & 1023]
+    )
+
+
+def _encode_48_bits(value: int) -> str:
+    """
+    Encode a 48 bits integer to 10 Crockford's base32 characters.
+    """
+    return _PAIRS[value >> 40] + _encode_40_bits(value & _MAX_40_BITS)
+
+
+def encode_ulid(epoch_ms: int, randomness: int) -> str:
+    """
+    Encode a 48 bits millisecond timestamp and 80 random bits to a 26 characters
+    Crockford's base32 string.
+    """
+    return (
+        _encode_48_bits(epoch_ms)
+        + _encode_40_bits(randomness >> 40)
+        + _encode_40_bits(randomness & _MAX_40_BITS)
+    )
+
+
+def decode_ulid_epoch_ms(ulid: str) -> int:
+    """
+    Get the millisecond timestamp since epoch of a ULID.
+    """
+    return int(ulid[:10].translate(_FROM_CROCKFORD), 32)
+
+
+class UlidGenerator:
+    """
+    Thread safe, monotonic ULID generator.
+
+    :meth:`UlidGenerator.new` reads the clock once and returns both the ULID
+    and the timestamp in microseconds, so the ``create_at`` of a record matches
+    its ``id``.
+
+    Within the same millisecond, only the low 40 random bits are incremented,
+    so the first 18 characters are encoded once per millisecond. If the clock
+    goes backward, the ULID keeps the last millisecond, and so does the
+    returned timestamp.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_epoch_ms = -1
+        self._last_epoch_us = -1
+        self._high = 0  # the high 40 random bits
+        self._low = 0  # the low 40 random bits
+        self._prefix = ""  # the encoded timestamp and high random bits
+
+    def _reset(self, epoch_ms: int, high: int, low: int):
+        self._last_epoch_ms = epoch_ms
+        self._high = high
+        self._low = low
+        self._prefix = _encode_48_bits(epoch_ms) + _encode_40_bits(high)
+
+    def new(self) -> tuple[str, int]:
+        """
+        Generate a new ULID.
+
+        :return: the ULID and the timestamp in microseconds since epoch.
+        """
+        epoch_us = time.time_ns() // 1000
+        epoch_ms = epoch_us // 1000
+        with self._lock:
+            if epoch_ms > self._last_epoch_ms:
+                randomness = int.from_bytes(os.urandom(10), "big")
+                self._reset(epoch_ms, randomness >> 40, randomness & _MAX_40_BITS)
+            # same millisecond, or the clock goes backward, keep the order
+            elif self._low < _MAX_40_BITS:
+                self._low += 1
+            elif self._high < _MAX_40_BITS:  # pragma: no cover
+                self._reset(self._last_epoch_ms, self._high + 1, 0)
+            else:  # pragma: no cover
+                self._reset(self._last_epoch_ms + 1, 0, 0)
+            ulid = self._prefix + _encode_40_bits(self._low)
+            if epoch_ms != self._last_epoch_ms:
+                # the ULID doesn't use the clock read, keep the timestamp in
+                # the millisecond of the ULID, and never before the last one
+                epoch_us = max(self._last_epoch_us, self._last_epoch_ms * 1000)
+            self._last_epoch_us = epoch_us
+        return ulid, epoch_us
+
+
+_generator = UlidGenerator()
+
+
+def new_ulid() -> tuple[str, str]:
+    """
+    Generate a new ULID and the matching ISO format ``create_at``.
+    """
+    ulid, epoch_us = _generator.new()
+    return ulid, epoch_us_to_iso(epoch_us)
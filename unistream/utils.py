@@ -1,10 +1,57 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timedelta, timezone
 
 EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 EPOCH_STR = EPOCH.isoformat()
 
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
 
 def get_utc_now() -> datetime:
     return datetime.now(tz=timezone.utc)
+
+
+def get_n_bytes(data: str) -> int:
+    """
+    Return the size of the UTF-8 encoded string in bytes.
+    """
+    if data.isascii():
+        return len(data)
+    return len(data.encode("utf-8"))
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """
+    Convert a timezone aware datetime to integer microseconds since epoch.
+    """
+    return (dt - EPOCH) // _ONE_MICROSECOND
+
+
+def get_utc_now_epoch_us() -> int:
+    """
+    Return the current time as integer microseconds since epoch.
+    """
+    return time.time_ns() // 1000
+
+
+# (seconds since epoch, formatted "%Y-%m-%dT%H:%M:%S" of it)
+_second_prefix_cache: tuple[int, str] = (-1, "")
+
+
+def epoch_us_to_iso(epoch_us: int) -> str:
+    """
+    Format the integer microseconds since epoch to the UTC ISO8601 string,
+    the same as ``datetime.isoformat()``. The formatted date and time part
+    of the last second is cached, so it is cheaper than creating a datetime.
+    """
+    global _second_prefix_cache
+    seconds, microseconds = divmod(epoch_us, 1000000)
+    cached_seconds, prefix = _second_prefix_cache
+    if seconds != cached_seconds:
+        prefix = (EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S")
+        _second_prefix_cache = (seconds, prefix)
+    if microseconds:
+        return f"{prefix}.{microseconds:06d}+00:00"
+    return f"{prefix}+00:00"